@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Brand, Product, Order
+from .models import Brand, Product, OrderHeader, Order, DailySkuSales, StockMovement, StockSnapshot, Job, ForecastRun
 
 @admin.register(Brand)
 class BrandAdmin(admin.ModelAdmin):
@@ -14,9 +14,59 @@ class ProductAdmin(admin.ModelAdmin):
     search_fields = ("name",)
     ordering = ("name",)
 
+class OrderLineInline(admin.TabularInline):
+    model = Order
+    fields = ("product", "quantity", "total_price")
+    readonly_fields = fields
+    extra = 0
+    can_delete = False
+
+    def has_add_permission(self, request, obj=None):
+        return False
+
+@admin.register(OrderHeader)
+class OrderHeaderAdmin(admin.ModelAdmin):
+    list_display = ("id", "user", "line_count", "total_price", "created_at")
+    search_fields = ("user__username",)
+    ordering = ("-created_at",)
+    inlines = [OrderLineInline]
+
 @admin.register(Order)
 class OrderAdmin(admin.ModelAdmin):
-    list_display = ("id", "user", "product", "quantity", "total_price", "created_at")
+    list_display = ("id", "header", "user", "product", "quantity", "total_price", "created_at")
     list_filter = ("product", "user")
     search_fields = ("product__name", "user__username")
-    ordering = ("-created_at",)
\ No newline at end of file
+    ordering = ("-created_at",)
+
+@admin.register(DailySkuSales)
+class DailySkuSalesAdmin(admin.ModelAdmin):
+    list_display = ("id", "product", "day", "qty", "revenue", "order_count")
+    list_filter = ("day",)
+    search_fields = ("product__name",)
+    ordering = ("-day",)
+
+@admin.register(StockMovement)
+class StockMovementAdmin(admin.ModelAdmin):
+    list_display = ("id", "product", "delta", "reason", "ref_id", "created_at")
+    list_filter = ("reason",)
+    search_fields = ("product__name",)
+    ordering = ("-created_at",)
+
+@admin.register(StockSnapshot)
+class StockSnapshotAdmin(admin.ModelAdmin):
+    list_display = ("id", "product", "taken_at", "stock")
+    search_fields = ("product__name",)
+    ordering = ("-taken_at",)
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = ("id", "kind", "status", "attempts", "created_at", "finished_at")
+    list_filter = ("status", "kind")
+    ordering = ("-id",)
+
+@admin.register(ForecastRun)
+class ForecastRunAdmin(admin.ModelAdmin):
+    list_display = ("id", "kind", "window_days", "horizon_days", "fingerprint", "duration_ms", "generated_at")
+    list_filter = ("kind",)
+    exclude = ("payload",)
+    ordering = ("-generated_at",)
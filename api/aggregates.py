@@ -0,0 +1,126 @@
+from collections import namedtuple
+from decimal import Decimal
+
+from django.db import connections, router
+from django.utils.timezone import localdate
+
+from .models import Brand, DailySkuSales, Product
+from .rollups import window_start
+
+
+# ======================
+# SKU SALES WINDOWS (one scan for all stock analytics)
+# ======================
+# inventory_insights, demand_forecast and ai_decision_summary all want the
+# same per-SKU numbers over overlapping windows. Instead of one GROUP BY per
+# window, a single pass over the daily rollup splits the rows with
+# conditional aggregates:
+#
+#   SUM(CASE WHEN day >= window_since THEN qty END)            -> total_qty
+#   SUM(CASE WHEN day >= today - 6 THEN qty END)               -> recent_qty
+#   SUM(CASE WHEN today - 13 <= day < today - 6 THEN qty END)  -> prev_qty
+#
+# (window_start(n) = today - (n - 1): every window is exactly n days,
+# today included)
+#
+# Results are memoized on the request, so several consumers in one request
+# share the scan.
+
+CENT = Decimal("0.01")
+
+SkuWindow = namedtuple(
+    "SkuWindow",
+    [
+        "product_id", "name", "brand", "stock", "price",
+        "total_qty", "revenue", "order_count",  # over the whole window
+        "recent_qty", "prev_qty",  # last 7 days / the 7 days before that
+    ],
+)
+
+
+def _table(connection, model):
+    return connection.ops.quote_name(model._meta.db_table)
+
+
+def _money(value):
+    # SQLite hands back decimals as float/int, Postgres as Decimal
+    if value is None:
+        return Decimal(0)
+    if not isinstance(value, Decimal):
+        value = Decimal(str(value))
+    return value.quantize(CENT)
+
+
+def load_sku_windows(window_days, today=None):
+    """
+    -> [SkuWindow] for every SKU that sold in the last `window_days`,
+    ordered by product id.
+    """
+    # same database the ORM would read the rollup from (the replica inside
+    # analytics views, see api/routers.py)
+    connection = connections[router.db_for_read(DailySkuSales)]
+    window_since = window_start(window_days, today)
+    recent_since = window_start(7, today)
+    prev_since = window_start(14, today)
+
+    # Raw SQL so the rollup is grouped by product_id alone and joined to
+    # product/brand afterwards. The ORM version (values(...).annotate(
+    # Sum(..., filter=Q(...)))) has to GROUP BY every product/brand column
+    # and SQLite then plans it as a nested loop starting from api_brand:
+    # about twice as slow on a 300k-order dataset.
+    sql = f"""
+        SELECT s.product_id, p.name, b.name, p.stock, p.price,
+               s.total_qty, s.revenue, s.order_count, s.recent_qty, s.prev_qty
+        FROM (
+            SELECT product_id,
+                   SUM(CASE WHEN day >= %s THEN qty END) AS total_qty,
+                   SUM(CASE WHEN day >= %s THEN revenue END) AS revenue,
+                   SUM(CASE WHEN day >= %s THEN order_count END) AS order_count,
+                   SUM(CASE WHEN day >= %s THEN qty ELSE 0 END) AS recent_qty,
+                   SUM(CASE WHEN day >= %s AND day < %s THEN qty ELSE 0 END) AS prev_qty
+            FROM {_table(connection, DailySkuSales)}
+            WHERE day >= %s
+            GROUP BY product_id
+        ) s
+        JOIN {_table(connection, Product)} p ON p.id = s.product_id
+        LEFT JOIN {_table(connection, Brand)} b ON b.id = p.brand_id
+        WHERE s.total_qty IS NOT NULL
+        ORDER BY s.product_id
+    """
+    day = connection.ops.adapt_datefield_value
+    params = [day(d) for d in (
+        window_since, window_since, window_since, recent_since,
+        prev_since, recent_since, min(window_since, prev_since),
+    )]
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        rows = cursor.fetchall()
+
+    return [
+        SkuWindow(pid, name, brand, stock or 0, _money(price), total_qty, _money(revenue),
+                  order_count or 0, recent_qty or 0, prev_qty or 0)
+        for pid, name, brand, stock, price, total_qty, revenue, order_count, recent_qty, prev_qty in rows
+    ]
+
+
+def sku_windows(window_days, request=None, today=None):
+    """
+    load_sku_windows(), memoized per request and parameter set.
+    """
+    if request is None:
+        return load_sku_windows(window_days, today)
+
+    request = getattr(request, "_request", request)  # DRF Request -> HttpRequest
+    memo = request.__dict__.setdefault("_sku_windows", {})
+    key = (window_days, today or localdate())
+    if key not in memo:
+        memo[key] = load_sku_windows(window_days, today)
+    return memo[key]
+
+
+def recommended_restock(window, window_days, horizon_days):
+    # Units needed so stock covers `horizon_days` at the window's sales rate
+    daily_rate = window.total_qty / window_days
+    if daily_rate <= 0:
+        return 0
+    return max(0, round(horizon_days * daily_rate - window.stock))
@@ -0,0 +1,192 @@
+import asyncio
+import time
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth import get_user_model
+from django.core import signing
+from django.db import close_old_connections
+from django.http import HttpResponse, StreamingHttpResponse
+from django.views.decorators.http import require_GET
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+
+from .events import hub
+from .forecasting import decision_summary_payload, decision_summary_queries
+from .metrics import QueryTimer, timing_queries
+from .renderers import FastJSONRenderer
+from .routers import replica_context
+
+
+# ======================
+# ASYNC ANALYTICS VIEWS
+# ======================
+# ai_decision_summary runs its independent queries at the same time, so the
+# response takes about as long as the slowest query instead of the sum of
+# all of them. Served through config/asgi.py (uvicorn
+# config.asgi:application), where the middleware stack is async end to end;
+# under WSGI it still works, Django just runs it in its own event loop.
+# (demand_forecast and inventory_insights answer from precomputed
+# snapshots, api/jobs.py, so they stay plain DRF views.)
+#
+# Why not plain `await qs.acount()`: Django's async ORM hands every query to
+# one shared thread (thread_sensitive=True), so awaiting several of them
+# with gather() still runs them one after another. Each query here gets its
+# own worker thread -> its own DB connection, released afterwards like a
+# request's would be (close_old_connections / CONN_MAX_AGE).
+# Different connections also mean different snapshots: a write landing
+# mid-request can show up in one number and not another, which is fine for
+# a dashboard.
+
+
+def _in_own_thread(query, request):
+    timer = QueryTimer()
+
+    def run():
+        try:
+            with timing_queries(timer):
+                return query()
+        finally:
+            close_old_connections()
+
+    # let the profiling middleware count SQL that runs off its thread
+    marks = getattr(request, "_profiling", None)
+    if marks is not None:
+        marks.setdefault("offthread_timers", []).append(timer)
+
+    return sync_to_async(run, thread_sensitive=False)()
+
+
+async def gather_queries(queries, request=None):
+    """
+    {name: zero-arg callable} -> {name: result}, all queries in flight at once.
+    """
+    names = list(queries)
+    results = await asyncio.gather(*(_in_own_thread(queries[n], request) for n in names))
+    return dict(zip(names, results))
+
+
+def _json(data, status=200):
+    return HttpResponse(
+        FastJSONRenderer().render(data), status=status, content_type="application/json"
+    )
+
+
+@sync_to_async
+def _authenticate(request):
+    # Same authentication classes as the DRF views (JWT by default)
+    drf_request = Request(
+        request, authenticators=[auth() for auth in api_settings.DEFAULT_AUTHENTICATION_CLASSES]
+    )
+    try:
+        user = drf_request.user
+    except AuthenticationFailed as exc:
+        return None, exc.detail
+    if not user or not user.is_authenticated:
+        return None, "Authentication credentials were not provided."
+    return user, None
+
+
+def _render_timed(request, data):
+    # Mirror the DRF views: JSON encoding counts as render time
+    t0 = time.perf_counter()
+    response = _json(data)
+    marks = getattr(request, "_profiling", None)
+    if marks is not None:
+        marks["view_end"] = t0
+        marks["render_end"] = time.perf_counter()
+    return response
+
+
+@require_GET
+async def ai_decision_summary(request):
+    """
+    Short summary aimed at managers — something readable,
+    not a wall of raw numbers.
+    """
+    user, error = await _authenticate(request)
+    if user is None:
+        return _json({"detail": error}, status=401)
+
+    # Fixed window for now; easy to expose later if needed
+    window_days = 30
+    horizon_days = 30
+
+    # the worker threads copy this context: the queries read from the replica
+    with replica_context():
+        results = await gather_queries(decision_summary_queries(window_days), request)
+    return _render_timed(request, decision_summary_payload(results, window_days, horizon_days))
+
+
+# ======================
+# LIVE CHANGE FEED (server-sent events)
+# ======================
+# One long-lived response per dashboard, fed from api/events.py. Needs ASGI:
+# under WSGI Django collects an async stream into a list before sending it.
+# EventSource can't set headers, and an access token in the URL would end
+# up in every access log. The page trades its JWT for a short-lived signed
+# ticket (POST /api/events/ticket/) and connects with ?ticket= instead.
+
+HEARTBEAT_SECONDS = 15
+
+TICKET_SALT = "api.events.ticket"
+TICKET_MAX_AGE = 30  # seconds to (re)connect with one ticket
+
+
+def make_event_ticket(user):
+    return signing.dumps(user.pk, salt=TICKET_SALT)
+
+
+@sync_to_async
+def _ticket_user(ticket):
+    try:
+        pk = signing.loads(ticket, salt=TICKET_SALT, max_age=TICKET_MAX_AGE)
+    except signing.BadSignature:  # expired tickets included
+        return None, "Invalid or expired ticket."
+    user = get_user_model().objects.filter(pk=pk, is_active=True).first()
+    if user is None:
+        return None, "Invalid or expired ticket."
+    return user, None
+
+
+async def _event_frames(last_id):
+    sub, replay = hub.subscribe(last_id)
+    try:
+        yield b"retry: 3000\n\n"
+        if replay is None:
+            yield b"event: resync\ndata: {}\n\n"
+        else:
+            for event in replay:
+                yield event.frame
+
+        while True:
+            try:
+                event = await asyncio.wait_for(sub.get(), HEARTBEAT_SECONDS)
+            except asyncio.TimeoutError:
+                # keeps proxies from closing an idle connection
+                yield b": ping\n\n"
+                continue
+            yield b"event: resync\ndata: {}\n\n" if event is None else event.frame
+    finally:
+        hub.unsubscribe(sub)
+
+
+@require_GET
+async def event_stream(request):
+    ticket = request.GET.get("ticket")
+    if ticket:
+        user, error = await _ticket_user(ticket)
+    else:
+        user, error = await _authenticate(request)
+    if user is None:
+        return _json({"detail": error}, status=401)
+
+    try:
+        last_id = int(request.headers.get("Last-Event-ID", ""))
+    except ValueError:
+        last_id = None
+
+    response = StreamingHttpResponse(_event_frames(last_id), content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"  # nginx: don't buffer the stream
+    return response
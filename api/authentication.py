@@ -0,0 +1,124 @@
+import copy
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+from .metrics import registry
+
+
+# ======================
+# CACHED JWT AUTHENTICATION
+# ======================
+# simplejwt's JWTAuthentication does SELECT ... FROM auth_user WHERE id = ?
+# on every request. The token is already verified by its signature, so the
+# row is the only thing left to look up, and it rarely changes: keep the
+# resolved users in a bounded LRU with a TTL, per process.
+#
+# User save/delete signals evict the entry (api/signals.py), so edits,
+# password changes and deactivations take effect on the next request in
+# this process. Other processes, and writes that skip signals
+# (QuerySet.update), catch up within AUTH_USER_CACHE_TTL seconds.
+
+CACHE_SIZE = getattr(settings, "AUTH_USER_CACHE_SIZE", 10000)
+CACHE_TTL = getattr(settings, "AUTH_USER_CACHE_TTL", 60)
+
+
+class UserCache:
+    def __init__(self, max_size=CACHE_SIZE, ttl=CACHE_TTL):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._users = OrderedDict()  # user id -> (expires, user)
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    # Keys are str: the id claim may be an int or a string depending on the
+    # simplejwt version, signals hand us the pk
+    def get(self, user_id):
+        user_id = str(user_id)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._users.get(user_id)
+            if entry is None or entry[0] <= now:
+                if entry is not None:
+                    del self._users[user_id]
+                self.misses += 1
+                return None
+            self._users.move_to_end(user_id)
+            self.hits += 1
+            user = entry[1]
+        # every request gets its own copy: views may set attributes on
+        # request.user or save() it
+        return copy.copy(user)
+
+    def put(self, user_id, user):
+        if self.ttl <= 0 or self.max_size <= 0:
+            return
+        user_id = str(user_id)
+        with self._lock:
+            self._users[user_id] = (time.monotonic() + self.ttl, copy.copy(user))
+            self._users.move_to_end(user_id)
+            while len(self._users) > self.max_size:
+                self._users.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, user_id):
+        with self._lock:
+            self._users.pop(str(user_id), None)
+
+    def clear(self):
+        with self._lock:
+            self._users.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    def __len__(self):
+        return len(self._users)
+
+
+user_cache = UserCache()
+
+registry.add_counter(
+    "auth_user_cache_hits_total", "JWT requests whose user came from the cache.",
+    lambda: user_cache.hits,
+)
+registry.add_counter(
+    "auth_user_cache_misses_total", "JWT requests that loaded the user from the database.",
+    lambda: user_cache.misses,
+)
+registry.add_counter(
+    "auth_user_cache_evictions_total", "Cached users dropped to stay under AUTH_USER_CACHE_SIZE.",
+    lambda: user_cache.evictions,
+)
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+        user = user_cache.get(user_id)
+        if user is None:
+            # DB lookup + the active / revoked checks
+            user = super().get_user(validated_token)
+            user_cache.put(user.pk, user)
+            return user
+
+        # Same checks as simplejwt, against the cached row
+        if not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+        if api_settings.CHECK_REVOKE_TOKEN:
+            if validated_token.get(api_settings.REVOKE_TOKEN_CLAIM) != get_md5_hash_password(user.password):
+                raise AuthenticationFailed(
+                    _("The user's password has been changed."), code="password_changed"
+                )
+        return user
@@ -0,0 +1,155 @@
+import hashlib
+import time
+from functools import wraps
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.db.models.query import QuerySet
+from django.utils.http import parse_etags
+from rest_framework.response import Response
+
+from .renderers import FastJSONRenderer
+
+
+# ======================
+# RESPONSE CACHE (dashboard analytics)
+# ======================
+# Cached responses are keyed by a "data version" that gets bumped whenever
+# orders/products/brands change (see api/signals.py). Nothing is ever
+# deleted: a bump simply makes the old keys unreachable and they expire.
+#
+# - strong ETag per cached payload, If-None-Match -> 304
+# - single flight: on a miss only one worker recomputes, the rest wait for
+#   its result (needs a shared cache, e.g. Redis, to work across processes)
+
+CACHE_TIMEOUT = getattr(settings, "ANALYTICS_CACHE_TIMEOUT", 300)
+
+# how long a recompute may hold the lock, and how long others wait for it
+LOCK_TIMEOUT = 30
+WAIT_TIMEOUT = 10
+POLL_INTERVAL = 0.05
+
+KEY_PREFIX = "stx"
+
+
+def _version_key(scope):
+    return f"{KEY_PREFIX}:version:{scope}"
+
+
+def get_data_version(scope="analytics"):
+    version = cache.get(_version_key(scope))
+    if version is None:
+        # Start from a timestamp rather than 1: if the key ever gets evicted
+        # we must not land back on a version that already has cached entries.
+        cache.add(_version_key(scope), int(time.time() * 1000), timeout=None)
+        version = cache.get(_version_key(scope))
+    return version
+
+
+def _incr_version(scope):
+    try:
+        cache.incr(_version_key(scope))
+    except ValueError:
+        cache.add(_version_key(scope), int(time.time() * 1000), timeout=None)
+
+
+def bump_data_version(scope="analytics"):
+    _incr_version(scope)
+    # Inside a transaction, bump again once it commits: a request that read
+    # the old rows in between must not leave its result under the new version.
+    if connection.in_atomic_block:
+        transaction.on_commit(lambda: _incr_version(scope))
+
+
+def _params_key(request):
+    params = sorted(request.query_params.lists())
+    if not params:
+        return "-"
+    return hashlib.sha1(urlencode(params, doseq=True).encode()).hexdigest()
+
+
+def make_etag(data):
+    body = FastJSONRenderer().render(data)
+    return '"%s"' % hashlib.sha1(body).hexdigest()
+
+
+def etag_matches(request, etag):
+    header = request.headers.get("If-None-Match")
+    if not header:
+        return False
+    tags = parse_etags(header)
+    return "*" in tags or etag in tags
+
+
+def _compute(view, request, args, kwargs):
+    # -> (etag, data) for cacheable responses, or the response itself
+    response = view(request, *args, **kwargs)
+    if response.status_code != 200 or not hasattr(response, "data"):
+        return response
+
+    data = response.data
+    if isinstance(data, QuerySet):
+        data = list(data)
+    return (make_etag(data), data)
+
+
+def _single_flight(key, compute, timeout):
+    lock_key = f"{key}:lock"
+
+    if cache.add(lock_key, 1, LOCK_TIMEOUT):
+        try:
+            entry = compute()
+            if isinstance(entry, tuple):
+                cache.set(key, entry, timeout)
+            return entry
+        finally:
+            cache.delete(lock_key)
+
+    # Someone else is already on it — wait for their result
+    deadline = time.monotonic() + WAIT_TIMEOUT
+    while time.monotonic() < deadline:
+        time.sleep(POLL_INTERVAL)
+        entry = cache.get(key)
+        if entry is not None:
+            return entry
+        if cache.get(lock_key) is None:
+            break
+
+    # Leader gave up or was too slow; don't keep the client waiting forever
+    return compute()
+
+
+def cached_response(name, timeout=None, scope="analytics"):
+    """
+    Cache a DRF function view's 200 responses until the data version moves.
+    Put it *under* @api_view so auth/permissions still run on every request.
+    """
+    timeout = CACHE_TIMEOUT if timeout is None else timeout
+
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            version = get_data_version(scope)
+            key = f"{KEY_PREFIX}:resp:{name}:{version}:{_params_key(request)}"
+
+            entry = cache.get(key)
+            if entry is None:
+                entry = _single_flight(
+                    key, lambda: _compute(view, request, args, kwargs), timeout
+                )
+                if not isinstance(entry, tuple):
+                    return entry
+
+            etag, data = entry
+            # no-cache = browsers keep the copy but revalidate every time,
+            # which is exactly what the ETag is for
+            headers = {"ETag": etag, "Cache-Control": "no-cache"}
+            if etag_matches(request, etag):
+                return Response(status=304, headers=headers)
+            return Response(data, headers=headers)
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,162 @@
+import base64
+import binascii
+import hashlib
+import heapq
+import json
+import threading
+import time
+from bisect import bisect_right
+from collections import namedtuple
+from decimal import ROUND_HALF_UP, Decimal
+
+from django.utils.timezone import now
+
+from .caching import get_data_version
+from .models import Product
+
+
+# ======================
+# CUSTOMER CATALOG (precomputed per discount tier)
+# ======================
+# There are only three loyalty tiers, so instead of walking every product for
+# every customer on every request we build the priced catalog once per tier
+# and keep it in process memory until a product/brand write bumps the
+# "catalog" data version (see api/signals.py). A page is then a version
+# lookup + a bisect + a slice.
+
+CATALOG_SCOPE = "catalog"
+
+# discount % by customer age (days since sign-up), checked top to bottom
+DISCOUNT_TIERS = ((90, 10), (30, 5), (-1, 0))
+
+# Safety net for writes we never hear about (other processes without a shared
+# cache, raw SQL loads): rebuild at least this often.
+MAX_AGE = 60
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 500
+
+CENT = Decimal("0.01")
+
+# rows: the output dicts, keys: matching (name, id) sort keys
+CatalogView = namedtuple("CatalogView", ["rows", "keys"])
+
+_lock = threading.Lock()
+_snapshots = {}  # discount % -> CatalogSnapshot
+
+
+def discount_for(user):
+    age_days = (now() - user.date_joined).days
+    for min_age, percent in DISCOUNT_TIERS:
+        if age_days > min_age:
+            return percent
+    return 0
+
+
+class CatalogSnapshot:
+    def __init__(self, version, discount_percent, base_rows):
+        self.version = version
+        self.discount_percent = discount_percent
+        self.built_at = time.monotonic()
+
+        factor = (Decimal(100) - discount_percent) / Decimal(100)
+        rows, keys, by_brand = [], [], {}
+        # Content hash for the ETag: a MAX_AGE rebuild can pick up writes
+        # that never bumped the version, and it is the same in every process
+        content = hashlib.sha1()
+        for pid, name, brand_id, brand_name, price, stock in base_rows:
+            content.update(f"{pid}|{name}|{brand_id}|{brand_name}|{price}|{stock}\n".encode())
+            row = {
+                "id": pid,
+                "name": name,
+                "brand": brand_name or "Unknown",
+                "brand_id": brand_id,
+                "price": float(price),
+                # Decimal math so 19.99 at 5% is always 18.99, never 18.989999
+                "effective_price": float((price * factor).quantize(CENT, ROUND_HALF_UP)),
+                "discount_percent": discount_percent,
+                "stock": stock,
+            }
+            key = (name, pid)
+            rows.append(row)
+            keys.append(key)
+            view = by_brand.setdefault(brand_id, ([], []))
+            view[0].append(row)
+            view[1].append(key)
+
+        self.digest = content.hexdigest()[:16]
+        self.all = CatalogView(rows, keys)
+        self.by_brand = {bid: CatalogView(*v) for bid, v in by_brand.items()}
+
+    def is_current(self, version):
+        return self.version == version and time.monotonic() - self.built_at < MAX_AGE
+
+    def view(self, brand_ids=None):
+        if not brand_ids:
+            return self.all
+
+        views = [self.by_brand[b] for b in brand_ids if b in self.by_brand]
+        if len(views) == 1:
+            return views[0]
+        # Each brand list is already sorted, so merging keeps the order
+        merged = list(heapq.merge(*(zip(v.keys, v.rows) for v in views), key=lambda kv: kv[0]))
+        return CatalogView([r for _, r in merged], [k for k, _ in merged])
+
+
+def _load_base_rows():
+    rows = list(
+        Product.objects.values_list("id", "name", "brand_id", "brand__name", "price", "stock")
+    )
+    # Sort in Python so the order always agrees with bisect (DB collations vary)
+    rows.sort(key=lambda r: (r[1], r[0]))
+    return rows
+
+
+def get_catalog(discount_percent):
+    version = get_data_version(CATALOG_SCOPE)
+    cached = _snapshots.get(discount_percent)
+    if cached and cached.is_current(version):
+        return cached
+
+    with _lock:
+        # Another thread may have rebuilt while we waited
+        cached = _snapshots.get(discount_percent)
+        if cached and cached.is_current(version):
+            return cached
+
+        # One query prices every tier, so rebuild them all together
+        base_rows = _load_base_rows()
+        for _, percent in DISCOUNT_TIERS:
+            _snapshots[percent] = CatalogSnapshot(version, percent, base_rows)
+        return _snapshots[discount_percent]
+
+
+# --- cursors: opaque base64 of the last (name, id) on the page ---
+
+def encode_cursor(key):
+    raw = json.dumps(list(key), separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor):
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        name, pid = json.loads(base64.urlsafe_b64decode(padded))
+        return (str(name), int(pid))
+    except (binascii.Error, ValueError, TypeError):
+        raise ValueError("Invalid cursor")
+
+
+def catalog_page(snapshot, brand_ids=None, cursor=None, page_size=DEFAULT_PAGE_SIZE):
+    view = snapshot.view(brand_ids)
+    start = bisect_right(view.keys, decode_cursor(cursor)) if cursor else 0
+    end = start + page_size
+
+    results = view.rows[start:end]
+    next_cursor = encode_cursor(view.keys[end - 1]) if end < len(view.rows) else None
+    return {
+        "count": len(view.rows),
+        "discount_percent": snapshot.discount_percent,
+        "next": next_cursor,
+        "results": results,
+    }
@@ -0,0 +1,201 @@
+import asyncio
+import itertools
+import json
+import threading
+from collections import deque, namedtuple
+
+from django.db import transaction
+
+
+# ======================
+# LIVE CHANGE FEED
+# ======================
+# Write paths publish compact deltas here and every open dashboard gets them
+# over one server-sent events stream (/api/events/, see async_views.py):
+#   order      a new order (id, product, quantity, total, created_at)
+#   stock      a product's stock after a change
+#   low_stock  a product crossed its reorder point (low: true/false)
+#   resync     too much changed at once (e.g. reorder points recomputed):
+#              clients reload instead of applying deltas
+#
+# Events are published on commit, so rolled-back carts never show up, and
+# encoded once: N open dashboards cost N queue puts, not N queries.
+#
+# The hub lives in process memory. Writes are only seen by streams served
+# by the same process, so run the feed on a single ASGI worker (the
+# dashboards reconnect and resync if it restarts).
+
+# Events kept for reconnecting clients (Last-Event-ID)
+BACKLOG = 500
+
+# Per-client buffer; a client that falls this far behind gets a "resync"
+# event instead of the missed deltas
+QUEUE_SIZE = 1000
+
+
+class Event:
+    __slots__ = ("id", "kind", "frame")
+
+    def __init__(self, id, kind, data):
+        self.id = id
+        self.kind = kind
+        payload = json.dumps(data, separators=(",", ":"), default=str)
+        self.frame = f"id: {id}\nevent: {kind}\ndata: {payload}\n\n".encode()
+
+
+class Subscription:
+    def __init__(self, loop, queue_size):
+        self.loop = loop
+        self.queue = asyncio.Queue(maxsize=queue_size)
+        self.overflowed = False
+
+    def push(self, event):
+        # called from any thread; the queue belongs to the stream's loop
+        self.loop.call_soon_threadsafe(self._put, event)
+
+    def _put(self, event):
+        if self.overflowed:
+            return
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.overflowed = True
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(None)  # -> resync
+
+    async def get(self):
+        event = await self.queue.get()
+        if event is None:
+            self.overflowed = False
+        return event
+
+
+class EventHub:
+    def __init__(self, backlog=BACKLOG, queue_size=QUEUE_SIZE):
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self._last_id = 0
+        self._recent = deque(maxlen=backlog)
+        self._subscribers = set()
+        self.queue_size = queue_size
+
+    def has_subscribers(self):
+        return bool(self._subscribers)
+
+    def skip(self):
+        # Nobody is listening, so nothing gets encoded; burn an id so a
+        # client reconnecting later can tell it missed something
+        with self._lock:
+            self._last_id = next(self._ids)
+
+    def publish(self, kind, data):
+        with self._lock:
+            self._last_id = next(self._ids)
+            event = Event(self._last_id, kind, data)
+            self._recent.append(event)
+            subscribers = list(self._subscribers)
+        for sub in subscribers:
+            try:
+                sub.push(event)
+            except RuntimeError:
+                # the stream's event loop is gone
+                self.unsubscribe(sub)
+        return event
+
+    def subscribe(self, last_id=None):
+        """
+        Register the calling event loop's stream. Returns (subscription,
+        replay) where replay is the backlog after `last_id`, or None if the
+        client missed events that can't be replayed and has to resync.
+        """
+        sub = Subscription(asyncio.get_running_loop(), self.queue_size)
+        with self._lock:
+            self._subscribers.add(sub)
+            replay = [e for e in self._recent if last_id is not None and e.id > last_id]
+            missed = None if last_id is None else self._last_id - last_id
+
+        if missed is None:
+            return sub, []
+        # ids are consecutive, so a short replay means skipped or evicted
+        # events (or a restarted process whose ids start over)
+        if missed < 0 or len(replay) != missed:
+            return sub, None
+        return sub, replay
+
+    def unsubscribe(self, sub):
+        with self._lock:
+            self._subscribers.discard(sub)
+
+    def reset(self):
+        with self._lock:
+            self._ids = itertools.count(1)
+            self._last_id = 0
+            self._recent.clear()
+            self._subscribers.clear()
+
+
+hub = EventHub()
+
+
+def _publish_on_commit(events):
+    if events:
+        transaction.on_commit(lambda: [hub.publish(kind, data) for kind, data in events])
+
+
+# Stock and reorder point of one product, before or after a write
+Level = namedtuple("Level", ["stock", "reorder_point"])
+
+
+def is_low(level):
+    return level is not None and level.stock <= level.reorder_point
+
+
+def publish_orders(header, lines):
+    # One event per order (cart), like the order counts on the dashboard
+    if not hub.has_subscribers():
+        hub.skip()
+        return
+    _publish_on_commit([
+        ("order", {
+            "order_id": header.id,
+            "line_count": header.line_count,
+            "total_price": header.total_price,
+            "created_at": header.created_at.isoformat(),
+            "lines": [
+                {
+                    "id": o.id,
+                    "product_id": o.product_id,
+                    "quantity": o.quantity,
+                    "total_price": o.total_price,
+                }
+                for o in lines
+            ],
+        })
+    ])
+
+
+def publish_stock(changes):
+    """
+    {product_id: (Level before, Level after)} -> stock events, plus a
+    low_stock event for every product that crossed its reorder point. A
+    `before` of None means a new product.
+    """
+    if not hub.has_subscribers():
+        hub.skip()
+        return
+    events = []
+    for pid, (before, after) in sorted(changes.items()):
+        if before == after:
+            continue
+        events.append(("stock", {"product_id": pid, **after._asdict()}))
+        if is_low(before) != is_low(after):
+            events.append(("low_stock", {"product_id": pid, **after._asdict(), "low": is_low(after)}))
+    _publish_on_commit(events)
+
+
+def publish_resync():
+    if not hub.has_subscribers():
+        hub.skip()
+        return
+    _publish_on_commit([("resync", {})])
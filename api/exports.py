@@ -0,0 +1,177 @@
+import csv
+import io
+import json
+import zlib
+from datetime import datetime, time
+from decimal import Decimal
+
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from rest_framework.renderers import BaseRenderer
+
+from .models import Order, Product
+
+
+# ======================
+# STREAMING EXPORTS
+# ======================
+# Full-table exports without pagination. Rows are read in keyset chunks
+# (id > last_id ORDER BY id LIMIT n) so only one chunk is ever in memory and
+# no long-lived cursor is held open, and each chunk is encoded and handed to
+# StreamingHttpResponse straight away.
+
+CHUNK_SIZE = 5000
+
+ORDER_COLUMNS = [
+    ("id", "id"),
+    ("order_id", "header_id"),
+    ("created_at", "created_at"),
+    ("user_id", "user_id"),
+    ("username", "user__username"),
+    ("product_id", "product_id"),
+    ("product", "product__name"),
+    ("brand", "product__brand__name"),
+    ("quantity", "quantity"),
+    ("total_price", "total_price"),
+]
+
+PRODUCT_COLUMNS = [
+    ("id", "id"),
+    ("name", "name"),
+    ("brand_id", "brand_id"),
+    ("brand", "brand__name"),
+    ("price", "price"),
+    ("stock", "stock"),
+    ("created_at", "created_at"),
+]
+
+
+# Renderers only exist so DRF's ?format= negotiation knows csv/ndjson.
+# The export body is streamed by the view; these just render error dicts.
+class _ExportRenderer(BaseRenderer):
+    charset = None
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return json.dumps(data).encode()
+
+
+class CSVRenderer(_ExportRenderer):
+    media_type = "text/csv"
+    format = "csv"
+
+
+class NDJSONRenderer(_ExportRenderer):
+    media_type = "application/x-ndjson"
+    format = "ndjson"
+
+
+def _parse_bound(value, end=False):
+    # Accepts 2025-01-31 or a full ISO datetime; dates cover the whole day
+    dt = parse_datetime(value)
+    if dt is None:
+        d = parse_date(value)
+        if d is None:
+            raise ValueError(f"Invalid date: {value}")
+        dt = datetime.combine(d, time.max if end else time.min)
+    if timezone.is_naive(dt):
+        dt = timezone.make_aware(dt)
+    return dt
+
+
+def _int_list(value):
+    return [int(v) for v in value.split(",") if v.strip()]
+
+
+def filter_orders(params):
+    """
+    Apply the export filters (start, end, user, product, brand) from a
+    query-param dict. Raises ValueError on bad input.
+    """
+    qs = Order.objects.all()
+    if params.get("start"):
+        qs = qs.filter(created_at__gte=_parse_bound(params["start"]))
+    if params.get("end"):
+        qs = qs.filter(created_at__lte=_parse_bound(params["end"], end=True))
+    if params.get("user"):
+        qs = qs.filter(user_id__in=_int_list(params["user"]))
+    if params.get("product"):
+        qs = qs.filter(product_id__in=_int_list(params["product"]))
+    if params.get("brand"):
+        qs = qs.filter(product__brand_id__in=_int_list(params["brand"]))
+    return qs
+
+
+def filter_products(params):
+    qs = Product.objects.all()
+    if params.get("brand"):
+        qs = qs.filter(brand_id__in=_int_list(params["brand"]))
+    return qs
+
+
+def iter_rows(queryset, fields, chunk_size=None):
+    # Keyset walk over the primary key; "id" must be the first field
+    chunk_size = chunk_size or CHUNK_SIZE
+    last_id = 0
+    while True:
+        chunk = list(
+            queryset.filter(id__gt=last_id)
+            .order_by("id")
+            .values_list(*fields)[:chunk_size]
+        )
+        if not chunk:
+            return
+        yield chunk
+        last_id = chunk[-1][0]
+        if len(chunk) < chunk_size:
+            return
+
+
+def _plain(value):
+    if isinstance(value, Decimal):
+        return str(value)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def _csv_chunks(header, chunks):
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+
+    writer.writerow(header)
+    yield buf.getvalue().encode()
+
+    for chunk in chunks:
+        buf.seek(0)
+        buf.truncate()
+        writer.writerows(map(_plain, row) for row in chunk)
+        yield buf.getvalue().encode()
+
+
+def _ndjson_chunks(header, chunks):
+    for chunk in chunks:
+        yield "".join(
+            json.dumps(dict(zip(header, map(_plain, row))), separators=(",", ":")) + "\n"
+            for row in chunk
+        ).encode()
+
+
+def _gzip(pieces):
+    # wbits=31 -> gzip container, so the output is a regular .gz file
+    z = zlib.compressobj(6, zlib.DEFLATED, 31)
+    for piece in pieces:
+        out = z.compress(piece)
+        if out:
+            yield out
+    yield z.flush()
+
+
+def stream_export(queryset, columns, fmt="csv", gzip=False, chunk_size=None):
+    """
+    -> iterator of bytes for a StreamingHttpResponse.
+    """
+    header = [name for name, _ in columns]
+    chunks = iter_rows(queryset, [field for _, field in columns], chunk_size)
+    encode = _csv_chunks if fmt == "csv" else _ndjson_chunks
+    body = encode(header, chunks)
+    return _gzip(body) if gzip else body
@@ -0,0 +1,321 @@
+from collections import namedtuple
+from datetime import datetime, time
+
+import numpy as np
+from django.utils.timezone import make_aware, now
+
+from .aggregates import recommended_restock, sku_windows
+from .models import OrderHeader, Product
+from .rollups import window_start
+
+
+# ======================
+# DEMAND FORECAST ENGINE
+# ======================
+# Same heuristic the forecast page has always used, but computed column-wise:
+# every SKU's rate / trend / forecast / days-to-OOS / risk in one NumPy pass
+# instead of a Python loop over dicts.
+#
+#   daily_rate   = window units / window days
+#   trend        = (last 7d - previous 7d) / previous 7d, clipped to [-0.8, 1.5]
+#                  (0.5 when demand appears out of nowhere, 0 when there is none)
+#   forecast_qty = round(daily_rate * horizon * (1 + 0.5 * trend)), >= 0
+#   days_to_oos  = stock / daily_rate (0 if already out, None if not selling)
+#   risk         = high (<= 7 days), medium (<= 30), low, or none
+
+TREND_MIN = -0.8
+TREND_MAX = 1.5
+NEW_DEMAND_TREND = 0.5
+
+HIGH_RISK_DAYS = 7
+MEDIUM_RISK_DAYS = 30
+
+# index into this with the risk codes returned by compute_forecast()
+RISK_LABELS = ("none", "high", "medium", "low")
+
+# Raw inputs, one entry per SKU that sold something in the window
+ForecastColumns = namedtuple(
+    "ForecastColumns",
+    ["product_id", "name", "brand", "stock", "total_qty", "recent_qty", "prev_qty"],
+)
+
+# Computed metrics (NumPy arrays, aligned with ForecastColumns)
+ForecastMetrics = namedtuple(
+    "ForecastMetrics",
+    ["daily_rate", "trend", "forecast_qty", "days_to_oos", "risk"],
+)
+
+
+def assemble_forecast_columns(windows):
+    # [SkuWindow] -> column arrays. None when nothing sold in the window.
+    if not windows:
+        return None
+
+    return ForecastColumns(
+        product_id=np.fromiter((w.product_id for w in windows), dtype=np.int64, count=len(windows)),
+        name=[w.name for w in windows],
+        brand=[w.brand or "Unknown" for w in windows],
+        stock=np.fromiter((w.stock for w in windows), dtype=np.int64, count=len(windows)),
+        total_qty=np.fromiter((w.total_qty for w in windows), dtype=np.int64, count=len(windows)),
+        recent_qty=np.fromiter((w.recent_qty for w in windows), dtype=np.float64, count=len(windows)),
+        prev_qty=np.fromiter((w.prev_qty for w in windows), dtype=np.float64, count=len(windows)),
+    )
+
+
+def load_forecast_columns(window_days, today=None, request=None):
+    """
+    Window, last-7-day and previous-7-day totals per SKU (one rollup scan,
+    see api/aggregates.py) as column arrays. None when nothing sold.
+    """
+    return assemble_forecast_columns(sku_windows(window_days, request, today))
+
+
+def compute_forecast(cols, window_days, horizon_days):
+    # Every metric for every SKU, no per-row Python
+    daily_rate = cols.total_qty / float(window_days)
+
+    recent, prev = cols.recent_qty, cols.prev_qty
+    raw_trend = np.divide(recent - prev, prev, out=np.zeros_like(prev), where=prev > 0)
+    raw_trend = np.where((prev <= 0) & (recent > 0), NEW_DEMAND_TREND, raw_trend)
+    trend = np.clip(raw_trend, TREND_MIN, TREND_MAX)
+
+    # np.rint rounds half to even, same as Python's round()
+    forecast_qty = np.maximum(
+        0, np.rint(daily_rate * horizon_days * (1 + 0.5 * trend))
+    ).astype(np.int64)
+
+    selling = daily_rate > 0
+    stock = cols.stock.astype(np.float64)
+    days_to_oos = np.full(len(daily_rate), np.nan)
+    np.divide(stock, daily_rate, out=days_to_oos, where=selling)
+    days_to_oos[selling & (stock <= 0)] = 0.0
+
+    risk = np.select(
+        [~selling, days_to_oos <= HIGH_RISK_DAYS, days_to_oos <= MEDIUM_RISK_DAYS],
+        [0, 1, 2],
+        default=3,
+    )
+
+    return ForecastMetrics(daily_rate, trend, forecast_qty, days_to_oos, risk)
+
+
+def build_forecast(window_days, horizon_days, now_ts=None, request=None):
+    """
+    Full demand_forecast payload. The view is just a wrapper around this.
+    """
+    cols = load_forecast_columns(window_days, request=request)
+    return forecast_payload(cols, Product.objects.count(), window_days, horizon_days, now_ts)
+
+
+def forecast_payload(cols, total_skus, window_days, horizon_days, now_ts=None):
+    now_ts = now_ts or now()
+    if cols is None:
+        return {
+            "window_days": window_days,
+            "horizon_days": horizon_days,
+            "generated_at": now_ts,
+            "summary": {
+                "total_skus": total_skus,
+                "tracked_skus": 0,
+                "avg_daily_units": 0.0,
+                "high_risk": 0,
+                "medium_risk": 0,
+            },
+            "items": [],
+        }
+
+    m = compute_forecast(cols, window_days, horizon_days)
+
+    # Python's round() for the displayed decimals keeps the output identical
+    # to the old per-row code (np.round can differ on exact .5 ties).
+    days_rounded = [None if d != d else round(d, 1) for d in m.days_to_oos.tolist()]
+
+    # Most urgent first; SKUs that don't sell go last, ties keep query order
+    sort_key = np.array([np.inf if d is None else d for d in days_rounded])
+    order = np.argsort(sort_key, kind="stable").tolist()
+
+    daily_rate = m.daily_rate.tolist()
+    trend = m.trend.tolist()
+    forecast_qty = m.forecast_qty.tolist()
+    stock = cols.stock.tolist()
+    product_id = cols.product_id.tolist()
+    risk = m.risk.tolist()
+
+    items = [
+        {
+            "product_id": product_id[i],
+            "name": cols.name[i],
+            "brand": cols.brand[i],
+            "stock": stock[i],
+            "daily_rate": round(daily_rate[i], 2),
+            "trend": round(trend[i], 2),
+            "forecast_qty": forecast_qty[i],
+            "days_to_oos": days_rounded[i],
+            "risk": RISK_LABELS[risk[i]],
+        }
+        for i in order
+    ]
+
+    # cumsum adds left to right, so the total matches a running += exactly
+    total_daily_units = float(np.cumsum(m.daily_rate)[-1])
+
+    return {
+        "window_days": window_days,
+        "horizon_days": horizon_days,
+        "generated_at": now_ts,
+        "summary": {
+            "total_skus": total_skus,
+            "tracked_skus": len(items),
+            "avg_daily_units": round(total_daily_units, 1),
+            "high_risk": int(np.count_nonzero(m.risk == 1)),
+            "medium_risk": int(np.count_nonzero(m.risk == 2)),
+        },
+        "items": items,
+    }
+
+
+# ======================
+# INVENTORY INSIGHTS (inventory_insights)
+# ======================
+def build_insights(window_days, horizon_days, now_ts=None, request=None):
+    """
+    Every SKU that sold in the window, the one about to run out first
+    first. The view cuts the list to ?limit=.
+    """
+    items = []
+
+    # Per-SKU window totals: one scan over the daily rollup (api/aggregates.py)
+    for w in sku_windows(window_days, request):
+        stock = w.stock
+        daily_rate = w.total_qty / window_days
+
+        if daily_rate > 0:
+            days_to_oos = stock / daily_rate if stock > 0 else 0
+        else:
+            days_to_oos = None
+
+        items.append({
+            "product_id": w.product_id,
+            "name": w.name,
+            "brand": w.brand,
+            "stock": stock,
+            "price": float(w.price),
+            "daily_rate": round(daily_rate, 2),
+            "days_to_oos": round(days_to_oos, 1) if days_to_oos else None,
+            "recommended_restock": recommended_restock(w, window_days, horizon_days),
+        })
+
+    # Sort by "who will run out first"
+    items.sort(key=lambda x: (x["days_to_oos"] is None, x["days_to_oos"] or 99999))
+
+    return {
+        "window_days": window_days,
+        "horizon_days": horizon_days,
+        "generated_at": now_ts or now(),
+        "summary": {
+            "total_skus": Product.objects.count(),
+            "tracked_skus": len(items),
+        },
+        "items": items,
+    }
+
+
+# ======================
+# DECISION SUMMARY (ai_decision_summary)
+# ======================
+def decision_summary_queries(window_days, request=None):
+    # The independent reads behind the summary, as zero-arg callables
+    # ({name: callable}); the async view runs them concurrently
+    return {
+        "products": Product.objects.count,
+        "brands": lambda: Product.objects.values("brand_id").distinct().count(),
+        "windows": lambda: sku_windows(window_days, request),
+        # orders are carts (headers), like the dashboard counts them; the
+        # rollup's order_count counts lines
+        "orders": lambda: OrderHeader.objects.filter(
+            created_at__gte=make_aware(datetime.combine(window_start(window_days), time.min))
+        ).count(),
+    }
+
+
+def decision_summary_payload(results, window_days, horizon_days):
+    # results: {name: value} for the names in decision_summary_queries()
+    products_count = results["products"]
+    brands_count = results["brands"]
+    windows = results["windows"]
+    orders_count = results["orders"]
+
+    at_risk_7 = 0
+    at_risk_30 = 0
+    total_recommended = 0
+    pressure_brands = set()
+
+    # Loop SKUs and build high-level insights
+    for w in windows:
+        stock = w.stock
+        total_qty = w.total_qty
+
+        if window_days == 0:
+            continue
+
+        daily_rate = total_qty / float(window_days)
+        if daily_rate <= 0:
+            continue
+
+        days_to_oos = stock / daily_rate if stock > 0 else 0
+        recommended = max(0, int(round(horizon_days * daily_rate - stock)))
+
+        if days_to_oos <= HIGH_RISK_DAYS:
+            at_risk_7 += 1
+        if days_to_oos <= MEDIUM_RISK_DAYS:
+            at_risk_30 += 1
+
+        if recommended > 0:
+            total_recommended += recommended
+            brand_name = w.brand or "Unknown"
+            pressure_brands.add(brand_name)
+
+    # Turn the info into short bullet points
+    bullets = []
+
+    bullets.append(
+        f"{products_count} products active across {brands_count} brands – "
+        f"{orders_count} orders placed in the last {window_days} days."
+    )
+
+    if at_risk_7 > 0:
+        bullets.append(
+            f"{at_risk_7} SKUs may run out within a week "
+            f"({at_risk_30} within 30 days)."
+        )
+    else:
+        bullets.append(
+            "No SKUs expected to run out within the next 7 days."
+        )
+
+    if total_recommended > 0:
+        bullets.append(
+            f"Suggested replenishment for the next {horizon_days} days: "
+            f"around {total_recommended} total units."
+        )
+
+    if pressure_brands:
+        top_brands = ", ".join(sorted(pressure_brands)[:3])
+        bullets.append(
+            f"Supply may tighten for: {top_brands}."
+        )
+
+    return {
+        "window_days": window_days,
+        "horizon_days": horizon_days,
+        "bullets": bullets,
+        "meta": {
+            "products": products_count,
+            "brands": brands_count,
+            "orders_last_window": orders_count,
+            "at_risk_7": at_risk_7,
+            "at_risk_30": at_risk_30,
+            "recommended_total": total_recommended,
+            "pressure_brands": sorted(pressure_brands),
+        },
+    }
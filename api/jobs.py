@@ -0,0 +1,295 @@
+import time
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import F, Max
+from django.utils.timezone import now
+
+from .forecasting import build_forecast, build_insights
+from .models import ForecastRun, Job, Order, StockMovement
+from .routers import replica_context
+
+
+# ======================
+# BACKGROUND JOBS + FORECAST SNAPSHOTS
+# ======================
+# demand_forecast and inventory_insights scan the whole sales rollup, which
+# gets slow on long windows and big catalogs. Instead of computing them in
+# the request, `manage.py run_jobs` keeps ForecastRun snapshots fresh and the
+# views serve the latest one:
+#
+#   - a snapshot is recomputed when the data it was built from changed
+#     (data_fingerprint) or it is older than SNAPSHOT_REFRESH_SECONDS
+#   - a request that finds a stale snapshot still gets it (marked stale)
+#     and queues a recompute; the very first request for a parameter set
+#     computes inline
+#   - without a worker (nothing picked the queued recompute up within
+#     SNAPSHOT_WORKER_GRACE_SECONDS), or once a snapshot is older than
+#     MAX_AGE, the request recomputes inline instead of serving it
+#   - ?fresh=1 queues a recompute and returns the job id to poll; when no
+#     worker has claimed a job lately it runs the job in the request and
+#     returns it already done
+#
+# The fingerprint is read from the database rather than the cache's data
+# version (api/caching.py): with the default local-memory cache the worker
+# process would never see the web processes' bumps.
+
+REFRESH_SECONDS = getattr(settings, "SNAPSHOT_REFRESH_SECONDS", 900)
+
+# A queued recompute nobody claimed for this long means no worker is running
+WORKER_GRACE = timedelta(seconds=getattr(settings, "SNAPSHOT_WORKER_GRACE_SECONDS", 60))
+
+# Never served, stale or not: windows are relative to today
+MAX_AGE = timedelta(seconds=4 * REFRESH_SECONDS)
+
+# A running worker claims at least the periodic refresh every
+# REFRESH_SECONDS; no claim in twice that means there is none
+WORKER_SEEN = timedelta(seconds=2 * REFRESH_SECONDS)
+
+# Parameter sets kept warm even before anyone asked for them
+DEFAULT_TARGETS = [
+    (ForecastRun.FORECAST, 30, 30),
+    (ForecastRun.INSIGHTS, 30, 30),
+]
+# Other parameter sets are refreshed while they keep being requested
+ACTIVE_FOR = timedelta(days=1)
+
+# Runs kept per parameter set
+KEEP_RUNS = 5
+
+# A running job whose worker died is retried after this long, at most
+# MAX_ATTEMPTS times in total
+STUCK_AFTER = timedelta(minutes=15)
+MAX_ATTEMPTS = 3
+
+# Finished jobs are deleted after this long
+KEEP_JOBS = timedelta(days=7)
+
+BUILDERS = {
+    ForecastRun.FORECAST: build_forecast,
+    ForecastRun.INSIGHTS: build_insights,
+}
+
+
+def data_fingerprint():
+    """
+    Changes whenever the inputs of a forecast do: every sale adds an order,
+    every stock change (orders, adjustments, restocks, new products) adds a
+    ledger movement. Two index lookups, no scans.
+    """
+    order = Order.objects.aggregate(m=Max("id"))["m"] or 0
+    movement = StockMovement.objects.aggregate(m=Max("id"))["m"] or 0
+    return f"{order}:{movement}"
+
+
+# --- Snapshots ---
+
+def latest_run(kind, window_days, horizon_days):
+    return (
+        ForecastRun.objects
+        .filter(kind=kind, window_days=window_days, horizon_days=horizon_days)
+        .order_by("-generated_at")
+        .first()
+    )
+
+
+def compute_snapshot(kind, window_days, horizon_days):
+    # Reads go to the replica when there is one: this is reporting load
+    with replica_context():
+        fingerprint = data_fingerprint()
+        t0 = time.perf_counter()
+        payload = BUILDERS[kind](window_days, horizon_days)
+        duration_ms = round((time.perf_counter() - t0) * 1000)
+
+    run = ForecastRun.objects.create(
+        kind=kind,
+        window_days=window_days,
+        horizon_days=horizon_days,
+        fingerprint=fingerprint,
+        generated_at=payload.pop("generated_at"),
+        duration_ms=duration_ms,
+        payload=payload,
+    )
+
+    old = list(
+        ForecastRun.objects
+        .filter(kind=kind, window_days=window_days, horizon_days=horizon_days)
+        .order_by("-generated_at")
+        .values_list("id", flat=True)[KEEP_RUNS:]
+    )
+    if old:
+        ForecastRun.objects.filter(id__in=old).delete()
+    return run
+
+
+def get_snapshot(kind, window_days, horizon_days):
+    """
+    -> (run, stale). A stale run (data changed, or older than
+    REFRESH_SECONDS) is returned as is and a recompute queued. It is
+    computed here instead when there is no run yet, the run is older than
+    MAX_AGE, or the queued recompute has waited past WORKER_GRACE.
+    """
+    at = now()
+    run = latest_run(kind, window_days, horizon_days)
+    if run is None:
+        return compute_snapshot(kind, window_days, horizon_days), False
+
+    age = at - run.generated_at
+    stale = run.fingerprint != data_fingerprint() or age > timedelta(seconds=REFRESH_SECONDS)
+    if not stale:
+        return run, False
+
+    params = {"window_days": window_days, "horizon_days": horizon_days}
+    job = enqueue(kind, params)
+    if age > MAX_AGE or (job.status == Job.QUEUED and at - job.created_at > WORKER_GRACE):
+        fresh = compute_snapshot(kind, window_days, horizon_days)
+        _finish_inline(job, fresh, at)
+        return fresh, False
+    return run, True
+
+
+def fresh_snapshot_job(kind, window_days, horizon_days):
+    """
+    Queue a recompute (?fresh=1) and return its job. Without a worker the
+    job is run here, so the caller gets it back done instead of polling a
+    job nobody will pick up.
+    """
+    job = enqueue(kind, {"window_days": window_days, "horizon_days": horizon_days})
+    if job.status == Job.QUEUED and not worker_running():
+        at = now()
+        _finish_inline(job, compute_snapshot(kind, window_days, horizon_days), at)
+        job.refresh_from_db()
+    return job
+
+
+def _finish_inline(job, run, at):
+    # the recompute is done: don't leave it for a worker that may come back
+    Job.objects.filter(pk=job.pk, status=Job.QUEUED).update(
+        status=Job.DONE, attempts=F("attempts") + 1, started_at=at, finished_at=now(),
+        result={"run_id": run.id, "generated_at": run.generated_at.isoformat(), "inline": True},
+    )
+
+
+def worker_running(at=None):
+    # jobs finished inline carry result["inline"]; only real claims count
+    at = at or now()
+    return (
+        Job.objects.filter(started_at__gte=at - WORKER_SEEN)
+        .exclude(result__inline=True)
+        .exists()
+    )
+
+
+def snapshot_payload(run, stale=False):
+    return {
+        **run.payload,
+        "generated_at": run.generated_at,
+        "snapshot": {"id": run.id, "stale": stale, "duration_ms": run.duration_ms},
+    }
+
+
+def schedule_refreshes(at=None):
+    """
+    Queue a recompute for every kept-warm parameter set whose latest run is
+    missing, stale or older than REFRESH_SECONDS. Returns the queued jobs.
+    """
+    at = at or now()
+    targets = set(DEFAULT_TARGETS)
+    targets.update(
+        ForecastRun.objects.filter(generated_at__gte=at - ACTIVE_FOR)
+        .values_list("kind", "window_days", "horizon_days")
+        .distinct()
+    )
+    with replica_context():
+        fingerprint = data_fingerprint()
+
+    jobs = []
+    for kind, window_days, horizon_days in sorted(targets):
+        run = latest_run(kind, window_days, horizon_days)
+        if (
+            run is None
+            or run.fingerprint != fingerprint
+            or run.generated_at <= at - timedelta(seconds=REFRESH_SECONDS)
+        ):
+            jobs.append(enqueue(kind, {"window_days": window_days, "horizon_days": horizon_days}))
+    return jobs
+
+
+def _snapshot_job(job):
+    run = compute_snapshot(job.kind, job.params["window_days"], job.params["horizon_days"])
+    return {"run_id": run.id, "generated_at": run.generated_at.isoformat()}
+
+
+# kind -> callable(job) returning the job's JSON result
+HANDLERS = {
+    ForecastRun.FORECAST: _snapshot_job,
+    ForecastRun.INSIGHTS: _snapshot_job,
+}
+
+
+# --- Queue ---
+
+def enqueue(kind, params=None):
+    """
+    Queue a job, or return the one already waiting with the same kind and
+    params (a burst of ?fresh=1 clicks is one recompute).
+    """
+    if kind not in HANDLERS:
+        raise ValueError(f"Unknown job kind: {kind}")
+    params = dict(sorted((params or {}).items()))
+    waiting = Job.objects.filter(kind=kind, status=Job.QUEUED, params=params).order_by("id").first()
+    if waiting is not None:
+        return waiting
+    return Job.objects.create(kind=kind, params=params)
+
+
+def claim_next():
+    # Oldest queued job, or None. The conditional UPDATE is the lock: if
+    # another worker got there first it matches nothing and we try again.
+    while True:
+        job = Job.objects.filter(status=Job.QUEUED).order_by("id").first()
+        if job is None:
+            return None
+        started = now()
+        claimed = Job.objects.filter(pk=job.pk, status=Job.QUEUED).update(
+            status=Job.RUNNING, started_at=started, attempts=F("attempts") + 1,
+        )
+        if claimed:
+            job.status, job.started_at, job.attempts = Job.RUNNING, started, job.attempts + 1
+            return job
+
+
+def run_job(job):
+    """
+    Run a claimed job and record the outcome. Returns the traceback on
+    failure (the job only keeps the error message), else None.
+    """
+    try:
+        result = HANDLERS[job.kind](job)
+    except Exception as exc:
+        job.status, job.error, job.result = Job.FAILED, f"{type(exc).__name__}: {exc}", None
+        failure = traceback.format_exc()
+    else:
+        job.status, job.error, job.result = Job.DONE, "", result
+        failure = None
+    job.finished_at = now()
+    job.save(update_fields=["status", "error", "result", "finished_at"])
+    return failure
+
+
+def requeue_stuck(at=None):
+    # Jobs left running by a worker that died: retry, or give up
+    at = at or now()
+    stuck = Job.objects.filter(status=Job.RUNNING, started_at__lt=at - STUCK_AFTER)
+    retried = stuck.filter(attempts__lt=MAX_ATTEMPTS).update(status=Job.QUEUED)
+    stuck.update(status=Job.FAILED, error="Worker stopped before finishing", finished_at=at)
+    return retried
+
+
+def prune_jobs(at=None):
+    at = at or now()
+    deleted, _ = Job.objects.filter(
+        status__in=[Job.DONE, Job.FAILED], finished_at__lt=at - KEEP_JOBS
+    ).delete()
+    return deleted
@@ -0,0 +1,164 @@
+from datetime import datetime, time, timedelta
+
+from django.db.models import Max, OuterRef, Subquery, Sum
+from django.db.models.functions import TruncDate
+from django.utils.dateparse import parse_date, parse_datetime
+from django.utils.timezone import is_naive, make_aware, now
+
+from .models import Product, StockMovement, StockSnapshot
+
+
+# ======================
+# STOCK LEDGER
+# ======================
+# Product.stock is the current value (O(1) to read, updated in place).
+# Every write path also appends a StockMovement in the same transaction:
+#   orders          place_order()         one bulk INSERT, no extra reads
+#   adjustments     apply_stock_deltas()  one bulk INSERT per call
+#                   (rows are locked first to log the clamped delta)
+#   product edits   post_save signal      uses the stock loaded with the row
+#
+# `manage.py snapshot_stock` periodically writes StockSnapshot rows, so
+# stock at time T = nearest snapshot <= T + the movements in between, and a
+# lookup only ever reads one snapshot interval of the ledger.
+
+# Snapshots are taken this far in the past, so a transaction that started
+# before the snapshot time has committed its movements by then
+SETTLE = timedelta(seconds=60)
+
+# Snapshots older than this are thinned to the last one per product per day
+COMPACT_AFTER_DAYS = 30
+
+READ_CHUNK = 500
+BATCH_SIZE = 1000
+
+
+def record_movements(movements):
+    # [StockMovement] (unsaved) -> one INSERT per BATCH_SIZE rows
+    movements = [m for m in movements if m.delta]
+    if movements:
+        StockMovement.objects.bulk_create(movements, batch_size=BATCH_SIZE)
+    return len(movements)
+
+
+def _chunks(ids, size=READ_CHUNK):
+    ids = list(ids)
+    for i in range(0, len(ids), size):
+        yield ids[i:i + size]
+
+
+def stock_levels_at(product_ids, at):
+    """
+    {product_id: stock at `at`} from the nearest snapshot plus the
+    movements after it. Products with no history at all come back as 0.
+    """
+    levels = {}
+    for chunk in _chunks(product_ids):
+        nearest = (
+            StockSnapshot.objects.filter(product_id=OuterRef("product_id"), taken_at__lte=at)
+            .order_by("-taken_at")
+            .values("taken_at")[:1]
+        )
+        snapshots = StockSnapshot.objects.filter(
+            product_id__in=chunk, taken_at=Subquery(nearest)
+        ).values_list("product_id", "taken_at", "stock")
+
+        # Snapshots are taken for many products at once, so grouping by
+        # snapshot time keeps this to a handful of range queries
+        since = {}
+        for pid in chunk:
+            levels[pid] = 0
+            since[pid] = None
+        for pid, taken_at, stock in snapshots:
+            levels[pid] = stock
+            since[pid] = taken_at
+
+        groups = {}
+        for pid, taken_at in since.items():
+            groups.setdefault(taken_at, []).append(pid)
+        for taken_at, pids in groups.items():
+            tail = StockMovement.objects.filter(product_id__in=pids, created_at__lte=at)
+            if taken_at is not None:
+                tail = tail.filter(created_at__gt=taken_at)
+            for pid, delta in tail.values_list("product_id").annotate(d=Sum("delta")).order_by():
+                levels[pid] += delta
+    return levels
+
+
+def parse_at(value):
+    # "2025-01-31" (end of that day) or a full ISO datetime; None if invalid
+    at = parse_datetime(value)
+    if at is None:
+        d = parse_date(value)
+        if d is None:
+            return None
+        at = datetime.combine(d, time.max)
+    if is_naive(at):
+        at = make_aware(at)
+    return at
+
+
+def stock_at(product_id, at):
+    return stock_levels_at([product_id], at)[product_id]
+
+
+def take_snapshots(at=None):
+    """
+    Snapshot every product whose stock moved since the last snapshot (all
+    products on the first run). Returns the number of rows written.
+
+    The value is Product.stock minus the movements after `at`, i.e. it is
+    anchored to the live column rather than chained from the previous
+    snapshot, so a change made outside the ledger (raw SQL, a restore)
+    stops skewing history at the next snapshot.
+    """
+    at = at or now() - SETTLE
+    watermark = StockSnapshot.objects.aggregate(m=Max("taken_at"))["m"]
+    if watermark is not None and at <= watermark:
+        return 0
+
+    if watermark is None:
+        changed = Product.objects.order_by("id").values_list("id", flat=True)
+    else:
+        changed = (
+            StockMovement.objects.filter(created_at__gt=watermark, created_at__lte=at)
+            .order_by("product_id")
+            .values_list("product_id", flat=True)
+            .distinct()
+        )
+
+    written = 0
+    for chunk in _chunks(changed):
+        stock = dict(Product.objects.filter(id__in=chunk).values_list("id", "stock"))
+        later = dict(
+            StockMovement.objects.filter(product_id__in=chunk, created_at__gt=at)
+            .values_list("product_id")
+            .annotate(d=Sum("delta"))
+            .order_by()
+        )
+        StockSnapshot.objects.bulk_create(
+            [
+                StockSnapshot(product_id=pid, taken_at=at, stock=current - later.get(pid, 0))
+                for pid, current in stock.items()
+            ],
+            batch_size=BATCH_SIZE,
+        )
+        written += len(stock)
+    return written
+
+
+def compact_snapshots(older_than_days=COMPACT_AFTER_DAYS):
+    """
+    Keep only the last snapshot per product per day once snapshots are
+    older than `older_than_days`. Returns the number of rows deleted.
+    """
+    old = StockSnapshot.objects.filter(taken_at__lt=now() - timedelta(days=older_than_days))
+    # snapshots are written in time order, so the highest id is the latest
+    keep = (
+        old.annotate(day=TruncDate("taken_at"))
+        .values("product_id", "day")
+        .annotate(last=Max("id"))
+        .values("last")
+    )
+    deleted, _ = old.exclude(id__in=keep).delete()
+    return deleted
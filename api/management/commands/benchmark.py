@@ -0,0 +1,316 @@
+import itertools
+import json
+import platform
+import re
+import statistics
+import time
+import tracemalloc
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import setup_test_environment, teardown_test_environment
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from api import urls as api_urls
+from api.metrics import QueryTimer
+from api.models import Brand, ForecastRun, Job, Order, Product
+from api.renderers import FastJSONRenderer
+from api.seeding import seed_database
+
+
+# ======================
+# ENDPOINT BENCHMARK
+# ======================
+# Seeds a throwaway test database, hits every route in api/urls.py through
+# the full Django stack and records per route:
+#   wall time, p50/p95/mean latency, SQL query count, SQL time, peak memory
+# and with --encoding, the time to encode the response body with DRF's
+# stdlib JSONRenderer vs api.renderers.FastJSONRenderer
+# Results go to JSON; --baseline compares against a previous run and fails
+# (non-zero exit) when a route got slower / chattier than --threshold allows.
+#
+#   python manage.py benchmark --products 10000 --orders 5000000 --db-name bench.sqlite3 --keepdb
+#   python manage.py benchmark --baseline bench/baseline.json
+#   python manage.py benchmark --encoding --routes demand_forecast,customer_catalog
+
+BENCH_PASSWORD = "bench-pass-123"
+
+# Routes that only accept POST; body built per call
+POST_BODIES = {
+    "product-adjust-stock": lambda ctx: {"amount": 0},
+    "product-bulk-adjust-stock": lambda ctx: {
+        "adjustments": [{"product_id": ctx["pks"][Product], "delta": 0}],
+    },
+    "product-auto-restock": lambda ctx: {"dry_run": True},
+    "register": lambda ctx: {"username": f"bench-new-{next(ctx['counter'])}", "password": BENCH_PASSWORD},
+    "login": lambda ctx: {"username": ctx["user"].username, "password": BENCH_PASSWORD},
+    "token_refresh": lambda ctx: {"refresh": ctx["refresh"]},
+    "event_ticket": lambda ctx: {},
+}
+
+# Detail routes: which model to take the pk from (route name up to the
+# first "-", so "product-stock-at" -> product)
+DETAIL_MODELS = {"product": Product, "brand": Brand, "order": Order, "job_detail": Job}
+
+# Never finish by design (server-sent events), so there is no latency to take
+SKIP_ROUTES = {"event_stream"}
+
+# <pk>, <int:pk>, (?P<pk>...)
+PK_PATTERN = re.compile(r"<(\w+:)?pk>")
+
+# Differences below this are noise, whatever the ratio says
+NOISE_FLOOR_MS = 2.0
+
+
+def iter_routes(patterns=None, prefix=""):
+    # (name, needs_pk) for every named route, skipping DRF's .json suffix twins
+    seen = set()
+    for p in patterns if patterns is not None else api_urls.urlpatterns:
+        if hasattr(p, "url_patterns"):
+            for route in iter_routes(p.url_patterns, prefix + str(p.pattern)):
+                if route[0] not in seen:
+                    seen.add(route[0])
+                    yield route
+            continue
+        pattern = str(p.pattern)
+        if not p.name or "format" in pattern or p.name in seen or p.name in SKIP_ROUTES:
+            continue
+        seen.add(p.name)
+        yield p.name, bool(PK_PATTERN.search(pattern))
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    k = (len(ordered) - 1) * pct / 100.0
+    lo, hi = int(k), min(int(k) + 1, len(ordered) - 1)
+    return ordered[lo] + (ordered[hi] - ordered[lo]) * (k - lo)
+
+
+class Command(BaseCommand):
+    help = "Benchmark every API route against a seeded test database."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--products", type=int, default=1000)
+        parser.add_argument("--orders", type=int, default=50000)
+        parser.add_argument("--users", type=int, default=50)
+        parser.add_argument("--days", type=int, default=365)
+        parser.add_argument("--seed", type=int, default=1234)
+        parser.add_argument("--iterations", type=int, default=20)
+        parser.add_argument("--warmup", type=int, default=2)
+        parser.add_argument("--cold", action="store_true",
+                            help="Clear the cache before every request (measures misses).")
+        parser.add_argument("--routes", help="Comma separated route names to run (default: all).")
+        parser.add_argument("--output", default="bench_output.json")
+        parser.add_argument("--baseline", help="Compare against this JSON file.")
+        parser.add_argument("--threshold", type=float, default=0.25,
+                            help="Allowed relative p95 slowdown before failing (0.25 = 25%%).")
+        parser.add_argument("--update-baseline", action="store_true",
+                            help="Write this run to --baseline instead of comparing.")
+        parser.add_argument("--db-name",
+                            help="Test database file (SQLite). Default: in memory.")
+        parser.add_argument("--keepdb", action="store_true",
+                            help="Reuse an existing seeded test database.")
+        parser.add_argument("--encoding", action="store_true",
+                            help="Also time JSON encoding of each body: stdlib vs orjson renderer.")
+
+    # --- setup / teardown of the throwaway database ---
+
+    def _create_db(self, options):
+        # None = in memory (the test settings otherwise point at a file)
+        settings.DATABASES["default"].setdefault("TEST", {})["NAME"] = options["db_name"]
+        setup_test_environment(debug=False)
+        return connection.creation.create_test_db(
+            verbosity=0, autoclobber=True, keepdb=options["keepdb"]
+        )
+
+    def _destroy_db(self, old_name, options):
+        connection.creation.destroy_test_db(old_name, verbosity=0, keepdb=options["keepdb"])
+        teardown_test_environment()
+
+    # --- measuring ---
+
+    def _request(self, client, name, needs_pk, ctx):
+        kwargs = {}
+        if needs_pk:
+            model = DETAIL_MODELS[name.split("-")[0]]
+            kwargs["pk"] = ctx["pks"][model]
+        url = reverse(name, kwargs=kwargs)
+        if name in POST_BODIES:
+            return client.post(url, POST_BODIES[name](ctx), format="json")
+        return client.get(url)
+
+    def _consume(self, response):
+        if response.get("Content-Type", "").startswith("text/event-stream"):
+            raise CommandError("Event streams can't be benchmarked (they never end)")
+        if response.streaming:
+            for _ in response.streaming_content:
+                pass
+
+    def _measure(self, client, name, needs_pk, ctx, options):
+        for _ in range(options["warmup"]):
+            self._consume(self._request(client, name, needs_pk, ctx))
+
+        latencies, queries, sql_ms = [], [], []
+        status = None
+        started = time.perf_counter()
+        for _ in range(options["iterations"]):
+            if options["cold"]:
+                cache.clear()
+            timer = QueryTimer()
+            with connection.execute_wrapper(timer):
+                t0 = time.perf_counter()
+                response = self._request(client, name, needs_pk, ctx)
+                self._consume(response)
+                latencies.append((time.perf_counter() - t0) * 1000)
+            status = response.status_code
+            queries.append(timer.count)
+            sql_ms.append(timer.seconds * 1000)
+        wall_ms = (time.perf_counter() - started) * 1000
+
+        # One extra pass under tracemalloc (it slows things down, so it is
+        # kept out of the latency numbers)
+        if options["cold"]:
+            cache.clear()
+        tracemalloc.start()
+        self._consume(self._request(client, name, needs_pk, ctx))
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        return {
+            "status": status,
+            "iterations": options["iterations"],
+            "wall_ms": round(wall_ms, 3),
+            "mean_ms": round(statistics.fmean(latencies), 3),
+            "p50_ms": round(percentile(latencies, 50), 3),
+            "p95_ms": round(percentile(latencies, 95), 3),
+            "queries": max(queries),
+            "sql_ms": round(statistics.fmean(sql_ms), 3),
+            "peak_kb": round(peak / 1024, 1),
+        } | (
+            self._encoding(response, options["iterations"])
+            if options["encoding"] and getattr(response, "data", None) is not None
+            else {}
+        )
+
+    def _encoding(self, response, iterations):
+        # Same data through both renderers, outside the request
+        data = response.data
+        timings = {}
+        for key, renderer in (("json_ms", JSONRenderer()), ("fast_json_ms", FastJSONRenderer())):
+            t0 = time.perf_counter()
+            for _ in range(iterations):
+                body = renderer.render(data)
+            timings[key] = round((time.perf_counter() - t0) * 1000 / iterations, 3)
+        timings["body_kb"] = round(len(body) / 1024, 1)
+        return timings
+
+    # --- baseline comparison ---
+
+    def compare(self, results, baseline, threshold):
+        regressions = []
+        for name, cur in results["routes"].items():
+            old = baseline.get("routes", {}).get(name)
+            if not old:
+                continue
+            limit = old["p95_ms"] * (1 + threshold)
+            if cur["p95_ms"] > limit and cur["p95_ms"] - old["p95_ms"] > NOISE_FLOOR_MS:
+                regressions.append(
+                    f"{name}: p95 {old['p95_ms']:.1f}ms -> {cur['p95_ms']:.1f}ms"
+                )
+            if cur["queries"] > old["queries"]:
+                regressions.append(
+                    f"{name}: queries {old['queries']} -> {cur['queries']}"
+                )
+        return regressions
+
+    def handle(self, *args, **options):
+        wanted = set(filter(None, (options["routes"] or "").split(",")))
+        routes = [r for r in iter_routes() if not wanted or r[0] in wanted]
+        if not routes:
+            raise CommandError("No routes matched --routes")
+
+        old_name = self._create_db(options)
+        try:
+            if not Product.objects.exists():
+                self.stdout.write(
+                    f"Seeding {options['products']} products / {options['orders']} orders ..."
+                )
+                t0 = time.perf_counter()
+                seed_database(
+                    products=options["products"], orders=options["orders"],
+                    users=options["users"], days=options["days"], seed=options["seed"],
+                    user_prefix="bench", log=lambda msg: None,
+                )
+                self.stdout.write(f"  seeded in {time.perf_counter() - t0:.1f}s")
+
+            user = User.objects.filter(username__startswith="bench").order_by("id").first()
+            user.set_password(BENCH_PASSWORD)
+            user.save()
+            refresh = RefreshToken.for_user(user)
+            if not Job.objects.exists():
+                # something for job_detail to show
+                Job.objects.create(kind=ForecastRun.FORECAST, params={"window_days": 30, "horizon_days": 30})
+
+            client = APIClient()
+            client.credentials(HTTP_AUTHORIZATION=f"Bearer {refresh.access_token}")
+            ctx = {
+                "user": user,
+                "refresh": str(refresh),
+                "counter": itertools.count(),
+                "pks": {m: m.objects.order_by("id").values_list("id", flat=True).first()
+                        for m in DETAIL_MODELS.values()},
+            }
+
+            results = {
+                "meta": {
+                    "products": Product.objects.count(),
+                    "orders": Order.objects.count(),
+                    "iterations": options["iterations"],
+                    "cold_cache": options["cold"],
+                    "python": platform.python_version(),
+                    "database": connection.vendor,
+                    "timestamp": timezone.now().isoformat(),
+                },
+                "routes": {},
+            }
+            for name, needs_pk in routes:
+                stats = self._measure(client, name, needs_pk, ctx, options)
+                results["routes"][name] = stats
+                self.stdout.write(
+                    f"{name:28} {stats['status']}  p50 {stats['p50_ms']:8.2f}ms  "
+                    f"p95 {stats['p95_ms']:8.2f}ms  q {stats['queries']:3}  "
+                    f"sql {stats['sql_ms']:8.2f}ms  peak {stats['peak_kb']:9.1f}KB"
+                )
+                if "json_ms" in stats:
+                    self.stdout.write(
+                        f"{'':28}      json {stats['json_ms']:8.2f}ms  "
+                        f"orjson {stats['fast_json_ms']:8.2f}ms  body {stats['body_kb']:9.1f}KB"
+                    )
+        finally:
+            self._destroy_db(old_name, options)
+
+        Path(options["output"]).write_text(json.dumps(results, indent=2))
+        self.stdout.write(f"Results written to {options['output']}")
+
+        if not options["baseline"]:
+            return
+        baseline_path = Path(options["baseline"])
+        if options["update_baseline"] or not baseline_path.exists():
+            baseline_path.write_text(json.dumps(results, indent=2))
+            self.stdout.write(f"Baseline written to {baseline_path}")
+            return
+
+        regressions = self.compare(results, json.loads(baseline_path.read_text()), options["threshold"])
+        if regressions:
+            raise CommandError("Performance regressions:\n  " + "\n  ".join(regressions))
+        self.stdout.write(self.style.SUCCESS("No regressions against baseline"))
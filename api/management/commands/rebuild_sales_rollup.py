@@ -0,0 +1,26 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from api.rollups import rebuild_daily_sales
+
+
+class Command(BaseCommand):
+    help = "Rebuild the DailySkuSales rollup from the raw order table."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--since",
+            help="Only rebuild days on/after this date (YYYY-MM-DD). Default: everything.",
+        )
+
+    def handle(self, *args, **options):
+        since = options.get("since")
+        if since:
+            try:
+                since = date.fromisoformat(since)
+            except ValueError:
+                raise CommandError("--since must be a date like 2025-01-31")
+
+        written = rebuild_daily_sales(since=since)
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt sales rollup: {written} rows"))
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from api.search import rebuild_search_index
+
+
+class Command(BaseCommand):
+    help = "Rebuild the FTS5 product/brand search index from the product and brand tables."
+
+    def handle(self, *args, **options):
+        rebuilt = rebuild_search_index()
+        if not rebuilt:
+            self.stdout.write("No search index on this database (SQLite only), nothing to do")
+            return
+        for table, rows in rebuilt.items():
+            self.stdout.write(self.style.SUCCESS(f"Rebuilt {table}: {rows} rows"))
@@ -0,0 +1,65 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from api.jobs import (
+    REFRESH_SECONDS,
+    claim_next,
+    prune_jobs,
+    requeue_stuck,
+    run_job,
+    schedule_refreshes,
+)
+
+
+class Command(BaseCommand):
+    help = "Work the background job queue and keep forecast/insight snapshots fresh."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--poll", type=float, default=2.0,
+            help="Seconds to sleep when the queue is empty (default 2).",
+        )
+        parser.add_argument(
+            "--schedule-every", type=float, default=30.0,
+            help="Seconds between checks for stale snapshots (default 30; "
+                 f"snapshots are also redone every {REFRESH_SECONDS}s regardless).",
+        )
+        parser.add_argument(
+            "--once", action="store_true",
+            help="Schedule, drain the queue and exit (for cron or tests).",
+        )
+
+    def handle(self, *args, **options):
+        next_schedule = 0.0
+        while True:
+            if time.monotonic() >= next_schedule:
+                requeue_stuck()
+                prune_jobs()
+                queued = schedule_refreshes()
+                if queued:
+                    self.stdout.write(f"Queued {len(queued)} snapshot refreshes")
+                next_schedule = time.monotonic() + options["schedule_every"]
+
+            ran = self._drain()
+            if options["once"]:
+                self.stdout.write(self.style.SUCCESS(f"Ran {ran} jobs"))
+                return
+            # the worker lives for days: same connection hygiene as a request
+            close_old_connections()
+            if not ran:
+                time.sleep(options["poll"])
+
+    def _drain(self):
+        ran = 0
+        while True:
+            job = claim_next()
+            if job is None:
+                return ran
+            failure = run_job(job)
+            ran += 1
+            if failure:
+                self.stderr.write(f"Job #{job.id} ({job.kind}) failed\n{failure}")
+            else:
+                self.stdout.write(f"Job #{job.id} ({job.kind}) done: {job.result}")
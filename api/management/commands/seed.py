@@ -0,0 +1,64 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from api.models import Product
+from api.seeding import DEFAULT_END_DATE, flush, seed_database
+
+
+class Command(BaseCommand):
+    help = "Fill the database with a deterministic demo/benchmark dataset."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--products", type=int, default=1500)
+        parser.add_argument("--orders", type=int, default=20000)
+        parser.add_argument("--users", type=int, default=5)
+        parser.add_argument("--days", type=int, default=365,
+                            help="Spread order history over this many days.")
+        parser.add_argument("--seed", type=int, default=None,
+                            help="Same seed + same counts + same --end-date = same rows "
+                                 "(default: seed 42, history up to now).")
+        parser.add_argument("--end-date", type=date.fromisoformat, default=None,
+                            help="Last day of order history, YYYY-MM-DD (default: "
+                                 f"{DEFAULT_END_DATE} with --seed, otherwise today).")
+        parser.add_argument("--chunk-size", type=int, default=50000,
+                            help="Orders generated/inserted per batch (bounds memory).")
+        parser.add_argument("--workers", type=int, default=0,
+                            help="Generate order chunks in N worker processes.")
+        parser.add_argument("--flush", action="store_true",
+                            help="Delete existing brands/products/orders/non-admin users first.")
+        parser.add_argument("--no-tune", action="store_true",
+                            help="Keep SQLite pragmas and Order indexes as they are during the load.")
+
+    def handle(self, *args, **options):
+        for name in ("products", "users", "chunk_size"):
+            if options[name] < 1:
+                raise CommandError(f"--{name.replace('_', '-')} must be at least 1")
+        if options["orders"] < 0 or options["days"] < 1:
+            raise CommandError("--orders must be >= 0 and --days >= 1")
+
+        if options["flush"]:
+            flush()
+        elif Product.objects.exists():
+            raise CommandError("Database already has data; pass --flush to replace it.")
+
+        end_date = options["end_date"]
+        if end_date is None and options["seed"] is not None:
+            end_date = DEFAULT_END_DATE
+
+        timings = seed_database(
+            products=options["products"],
+            orders=options["orders"],
+            users=options["users"],
+            days=options["days"],
+            seed=42 if options["seed"] is None else options["seed"],
+            end_date=end_date,
+            chunk_size=options["chunk_size"],
+            workers=options["workers"],
+            tune=not options["no_tune"],
+            log=self.stdout.write,
+        )
+        self.stdout.write(self.style.SUCCESS(
+            "Seeded in {total_s:.1f}s (catalog {catalog_s:.1f}s, orders {orders_s:.1f}s, "
+            "rollup/analyze {derived_s:.1f}s)".format(**timings)
+        ))
@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from api.ledger import COMPACT_AFTER_DAYS, compact_snapshots, take_snapshots
+
+
+class Command(BaseCommand):
+    help = "Snapshot stock for products that moved since the last run, then thin out old snapshots."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--compact-days", type=int, default=COMPACT_AFTER_DAYS,
+            help=f"Keep one snapshot per product per day past this age (default {COMPACT_AFTER_DAYS}).",
+        )
+        parser.add_argument("--no-compact", action="store_true", help="Skip the compaction step.")
+
+    def handle(self, *args, **options):
+        written = take_snapshots()
+        self.stdout.write(self.style.SUCCESS(f"Wrote {written} stock snapshots"))
+
+        if not options["no_compact"]:
+            deleted = compact_snapshots(options["compact_days"])
+            self.stdout.write(self.style.SUCCESS(f"Compacted {deleted} old snapshots"))
@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from api.routers import REPLICA, sync_sqlite_replica
+
+
+class Command(BaseCommand):
+    help = "Copy the default SQLite database into the local replica file (REPLICA_DB_NAME)."
+
+    def handle(self, *args, **options):
+        if REPLICA not in connections.settings:
+            raise CommandError("No replica configured, set REPLICA_DB_NAME")
+        replica = connections[REPLICA]
+        if replica.vendor != "sqlite":
+            raise CommandError("Only SQLite replicas are synced here; use the database's own replication")
+        # don't copy under our own open connection to the file
+        replica.close()
+        try:
+            pages = sync_sqlite_replica(replica.settings_dict["NAME"])
+        except ValueError as exc:
+            raise CommandError(str(exc))
+        self.stdout.write(self.style.SUCCESS(f"Copied {pages} pages to {replica.settings_dict['NAME']}"))
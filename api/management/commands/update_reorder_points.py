@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from api.stock import (
+    DEFAULT_LEAD_DAYS,
+    DEFAULT_SAFETY_DAYS,
+    reorder_points_from_sales,
+    set_reorder_points,
+)
+
+
+class Command(BaseCommand):
+    help = "Derive each selling product's reorder point from its recent daily sales rate."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--window", type=int, default=30, help="Sales window in days (default 30).")
+        parser.add_argument("--lead-days", type=int, default=DEFAULT_LEAD_DAYS,
+                            help=f"Supplier lead time in days (default {DEFAULT_LEAD_DAYS}).")
+        parser.add_argument("--safety-days", type=int, default=DEFAULT_SAFETY_DAYS,
+                            help=f"Extra days of cover (default {DEFAULT_SAFETY_DAYS}).")
+        parser.add_argument("--dry-run", action="store_true", help="Only print how many would change.")
+
+    def handle(self, *args, **options):
+        if options["window"] < 1 or options["lead_days"] < 0 or options["safety_days"] < 0:
+            raise CommandError("--window must be >= 1, --lead-days/--safety-days >= 0")
+
+        points = reorder_points_from_sales(options["window"], options["lead_days"], options["safety_days"])
+        if options["dry_run"]:
+            self.stdout.write(f"{len(points)} selling products would get a derived reorder point")
+            return
+        updated = set_reorder_points(points)
+        self.stdout.write(self.style.SUCCESS(
+            f"Updated reorder points for {updated} of {len(points)} selling products"
+        ))
@@ -0,0 +1,163 @@
+import threading
+import time
+from bisect import bisect_left
+from contextlib import ExitStack, contextmanager
+
+from django.db import connections
+
+
+# ======================
+# REQUEST METRICS
+# ======================
+# In-process histograms filled by api.middleware.ProfilingMiddleware and
+# served at /api/metrics/ in Prometheus text format. Routes are labelled by
+# their url name from api/urls.py (demand_forecast, product-list, ...).
+#
+# Every process keeps its own numbers: with several gunicorn workers each
+# scrape sees one worker, which Prometheus handles fine when every worker
+# is scraped (or run the app with a single worker per container).
+
+PREFIX = "staxtrade"
+
+# seconds; roughly 1ms .. 10s
+DURATION_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 250)
+
+# name -> (help, buckets)
+HISTOGRAMS = {
+    "request_duration_seconds": ("Total time spent in Django per request.", DURATION_BUCKETS),
+    "request_view_seconds": ("Time spent in the view (includes its SQL).", DURATION_BUCKETS),
+    "request_render_seconds": ("Time spent rendering/serializing the response body.", DURATION_BUCKETS),
+    "request_db_seconds": ("Time spent executing SQL per request.", DURATION_BUCKETS),
+    "request_db_queries": ("SQL queries executed per request.", QUERY_BUCKETS),
+}
+
+
+class QueryTimer:
+    # execute_wrapper that counts queries and times them with perf_counter
+    # (connection.queries only keeps millisecond resolution)
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        t0 = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.seconds += time.perf_counter() - t0
+            self.count += 1
+
+
+@contextmanager
+def timing_queries(timer):
+    # every database alias, so replica reads (api/routers.py) are counted too
+    with ExitStack() as stack:
+        for conn in connections.all():
+            stack.enter_context(conn.execute_wrapper(timer))
+        yield timer
+
+
+class Histogram:
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # last slot: above every bucket
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class Registry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._data = {}  # (metric, route, method) -> Histogram
+        self._responses = {}  # (route, method, status) -> count
+        self._counters = []  # (name, help, read): values kept by their owner
+
+    def observe_request(self, route, method, status, values):
+        """
+        values: {metric name: number} for the names in HISTOGRAMS
+        """
+        with self._lock:
+            for name, value in values.items():
+                key = (name, route, method)
+                hist = self._data.get(key)
+                if hist is None:
+                    hist = self._data[key] = Histogram(HISTOGRAMS[name][1])
+                hist.observe(value)
+            key = (route, method, status)
+            self._responses[key] = self._responses.get(key, 0) + 1
+
+    def add_counter(self, name, help_text, read):
+        """
+        Expose a counter some other module keeps (e.g. the auth user cache);
+        `read()` returns its current value at scrape time.
+        """
+        with self._lock:
+            self._counters.append((name, help_text, read))
+
+    def reset(self):
+        with self._lock:
+            self._data.clear()
+            self._responses.clear()
+
+    def render(self):
+        """
+        -> Prometheus text exposition format (version 0.0.4)
+        """
+        with self._lock:
+            data = sorted(
+                (k, (list(h.counts), h.sum, h.count, h.buckets)) for k, h in self._data.items()
+            )
+            responses = sorted(self._responses.items())
+            counters = list(self._counters)
+
+        lines = []
+        by_metric = {}
+        for (name, route, method), snapshot in data:
+            by_metric.setdefault(name, []).append((route, method, snapshot))
+
+        for name, (help_text, _) in HISTOGRAMS.items():
+            full = f"{PREFIX}_{name}"
+            lines.append(f"# HELP {full} {help_text}")
+            lines.append(f"# TYPE {full} histogram")
+            for route, method, (counts, total, count, buckets) in by_metric.get(name, []):
+                labels = f'route="{_escape(route)}",method="{method}"'
+                running = 0
+                for bound, n in zip(buckets, counts):
+                    running += n
+                    lines.append(f'{full}_bucket{{{labels},le="{_fmt(bound)}"}} {running}')
+                lines.append(f'{full}_bucket{{{labels},le="+Inf"}} {count}')
+                lines.append(f"{full}_sum{{{labels}}} {_fmt(total)}")
+                lines.append(f"{full}_count{{{labels}}} {count}")
+
+        full = f"{PREFIX}_requests_total"
+        lines.append(f"# HELP {full} Requests handled, by route and status code.")
+        lines.append(f"# TYPE {full} counter")
+        for (route, method, status), n in responses:
+            lines.append(f'{full}{{route="{_escape(route)}",method="{method}",status="{status}"}} {n}')
+
+        for name, help_text, read in counters:
+            full = f"{PREFIX}_{name}"
+            lines.append(f"# HELP {full} {help_text}")
+            lines.append(f"# TYPE {full} counter")
+            lines.append(f"{full} {_fmt(read())}")
+
+        return "\n".join(lines) + "\n"
+
+
+def _fmt(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def _escape(value):
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+registry = Registry()
@@ -0,0 +1,131 @@
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.utils.decorators import sync_and_async_middleware
+from whitenoise.middleware import WhiteNoiseMiddleware
+
+from .metrics import QueryTimer, registry, timing_queries
+
+
+# ======================
+# REQUEST PROFILING
+# ======================
+# Splits every request into
+#   db      SQL time + query count (execute_wrapper on every connection)
+#   view    process_view -> view returned (includes its SQL)
+#   render  DRF renderer / template rendering after the view returned
+#   total   whole trip through the middleware stack below this one
+# and reports it as a Server-Timing header (visible in the browser devtools
+# network tab) and in the per-route histograms behind /api/metrics/.
+#
+# Streaming responses are timed until the response object is returned, not
+# until the last chunk is sent.
+#
+# Both middlewares here work sync and async: under ASGI one sync-only
+# middleware would push every async view back through async_to_sync.
+
+UNMATCHED_ROUTE = "unmatched"
+
+
+@sync_and_async_middleware
+class ProfilingMiddleware:
+    def __init__(self, get_response):
+        if not getattr(settings, "REQUEST_PROFILING", True):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        marks = request._profiling = {}
+        timer = QueryTimer()
+        start = time.perf_counter()
+        with timing_queries(timer):
+            response = self.get_response(request)
+        return self._finish(request, response, marks, timer, start)
+
+    async def __acall__(self, request):
+        marks = request._profiling = {}
+        timer = QueryTimer()
+        start = time.perf_counter()
+        with timing_queries(timer):
+            response = await self.get_response(request)
+        return self._finish(request, response, marks, timer, start)
+
+    def _finish(self, request, response, marks, timer, start):
+        end = time.perf_counter()
+
+        # async views run their queries on worker threads (api/async_views.py)
+        for extra in marks.get("offthread_timers", ()):
+            timer.count += extra.count
+            timer.seconds += extra.seconds
+
+        # No view_start: the URL didn't resolve (or a middleware answered)
+        view_start = marks.get("view_start", end)
+        view_end = marks.get("view_end", end)
+        render_end = marks.get("render_end", view_end)
+        timings = {
+            "request_duration_seconds": end - start,
+            "request_view_seconds": view_end - view_start,
+            "request_render_seconds": render_end - view_end,
+            "request_db_seconds": timer.seconds,
+            "request_db_queries": timer.count,
+        }
+
+        match = request.resolver_match
+        route = (match.url_name if match else None) or UNMATCHED_ROUTE
+        registry.observe_request(route, request.method, response.status_code, timings)
+
+        response["Server-Timing"] = ", ".join([
+            f'db;dur={timer.seconds * 1000:.2f};desc="{timer.count} queries"',
+            f"view;dur={timings['request_view_seconds'] * 1000:.2f}",
+            f"render;dur={timings['request_render_seconds'] * 1000:.2f}",
+            f"total;dur={timings['request_duration_seconds'] * 1000:.2f}",
+        ])
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request._profiling["view_start"] = time.perf_counter()
+
+    def process_template_response(self, request, response):
+        # DRF's Response is a SimpleTemplateResponse: the view has returned
+        # but nothing is rendered yet, so this is where view time stops.
+        marks = request._profiling
+        marks["view_end"] = time.perf_counter()
+        response.add_post_render_callback(
+            lambda r: marks.__setitem__("render_end", time.perf_counter())
+        )
+        return response
+
+
+# ======================
+# STATIC FILES (WhiteNoise, async capable)
+# ======================
+# WhiteNoise's own middleware is sync only. Looking a path up is a dict
+# lookup (a filesystem check with WHITENOISE_AUTOREFRESH), so the async
+# path does the same and only awaits the rest of the stack.
+
+@sync_and_async_middleware
+class StaticFilesMiddleware(WhiteNoiseMiddleware):
+    def __init__(self, get_response=None, settings=settings):
+        super().__init__(get_response, settings)
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        return super().__call__(request)
+
+    async def __acall__(self, request):
+        if self.autorefresh:
+            static_file = self.find_file(request.path_info)
+        else:
+            static_file = self.files.get(request.path_info)
+        if static_file is not None:
+            return self.serve(static_file, request)
+        return await self.get_response(request)
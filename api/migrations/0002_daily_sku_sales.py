@@ -0,0 +1,49 @@
+# Generated by Django 5.2.8 on 2026-10-17 03:31
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, Sum
+from django.db.models.functions import TruncDate
+
+
+def backfill_rollup(apps, schema_editor):
+    # Fold the existing order history into the new rollup table
+    Order = apps.get_model('api', 'Order')
+    DailySkuSales = apps.get_model('api', 'DailySkuSales')
+
+    rows = (
+        Order.objects.annotate(day=TruncDate('created_at'))
+        .values('product_id', 'day')
+        .annotate(qty=Sum('quantity'), revenue=Sum('total_price'), order_count=Count('id'))
+        .order_by()
+    )
+    DailySkuSales.objects.bulk_create(
+        (DailySkuSales(**row) for row in rows.iterator(chunk_size=1000)),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailySkuSales',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('qty', models.PositiveIntegerField(default=0)),
+                ('revenue', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('order_count', models.PositiveIntegerField(default=0)),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_sales', to='api.product')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['day', 'product'], name='daily_sku_sales_day_idx')],
+                'constraints': [models.UniqueConstraint(fields=('product', 'day'), name='uniq_daily_sku_sales')],
+            },
+        ),
+        migrations.RunPython(backfill_rollup, migrations.RunPython.noop),
+    ]
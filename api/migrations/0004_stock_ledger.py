@@ -0,0 +1,61 @@
+# Generated by Django 5.2.8 on 2026-10-17 04:01
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def open_ledger(apps, schema_editor):
+    # The ledger starts now: one "initial" movement per product carrying its
+    # current stock, so ledger totals match Product.stock from day one
+    Product = apps.get_model('api', 'Product')
+    StockMovement = apps.get_model('api', 'StockMovement')
+
+    now = timezone.now()
+    rows = Product.objects.filter(stock__gt=0).values_list('id', 'stock')
+    StockMovement.objects.bulk_create(
+        (
+            StockMovement(product_id=pid, delta=stock, reason='initial', created_at=now)
+            for pid, stock in rows.iterator(chunk_size=1000)
+        ),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0003_hot_query_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StockMovement',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('delta', models.IntegerField()),
+                ('reason', models.CharField(choices=[('initial', 'Initial stock'), ('order', 'Order placed'), ('adjust', 'Stock adjustment'), ('restock', 'Auto restock'), ('edit', 'Product edited')], max_length=16)),
+                ('ref_id', models.BigIntegerField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('product', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='stock_movements', to='api.product')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['product', 'created_at'], name='stock_move_product_at_idx'), models.Index(fields=['created_at'], name='stock_move_created_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='StockSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('taken_at', models.DateTimeField()),
+                ('stock', models.IntegerField()),
+                ('product', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='stock_snapshots', to='api.product')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['taken_at'], name='stock_snapshot_taken_idx')],
+                'constraints': [models.UniqueConstraint(fields=('product', 'taken_at'), name='uniq_stock_snapshot')],
+            },
+        ),
+        migrations.RunPython(open_ledger, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,95 @@
+from django.db import migrations
+
+
+# SQLite FTS5 indexes for product / brand search (see api/search.py).
+# Triggers keep them in sync with every write, including bulk_create,
+# update() and raw SQL. Other databases keep the plain LIKE search.
+
+CREATE = [
+    # rowid = api_product.id
+    """
+    CREATE VIRTUAL TABLE api_product_fts USING fts5(
+        name, brand, prefix='2 3', tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE TRIGGER api_product_fts_ai AFTER INSERT ON api_product BEGIN
+        INSERT OR REPLACE INTO api_product_fts (rowid, name, brand)
+        VALUES (new.id, new.name, COALESCE((SELECT name FROM api_brand WHERE id = new.brand_id), ''));
+    END
+    """,
+    """
+    CREATE TRIGGER api_product_fts_au AFTER UPDATE OF name, brand_id ON api_product BEGIN
+        DELETE FROM api_product_fts WHERE rowid = old.id;
+        INSERT INTO api_product_fts (rowid, name, brand)
+        VALUES (new.id, new.name, COALESCE((SELECT name FROM api_brand WHERE id = new.brand_id), ''));
+    END
+    """,
+    """
+    CREATE TRIGGER api_product_fts_ad AFTER DELETE ON api_product BEGIN
+        DELETE FROM api_product_fts WHERE rowid = old.id;
+    END
+    """,
+    # rowid = api_brand.id
+    """
+    CREATE VIRTUAL TABLE api_brand_fts USING fts5(
+        name, prefix='2 3', tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE TRIGGER api_brand_fts_ai AFTER INSERT ON api_brand BEGIN
+        INSERT OR REPLACE INTO api_brand_fts (rowid, name) VALUES (new.id, new.name);
+    END
+    """,
+    """
+    CREATE TRIGGER api_brand_fts_au AFTER UPDATE OF name ON api_brand BEGIN
+        UPDATE api_brand_fts SET name = new.name WHERE rowid = old.id;
+        UPDATE api_product_fts SET brand = new.name
+        WHERE rowid IN (SELECT id FROM api_product WHERE brand_id = new.id);
+    END
+    """,
+    """
+    CREATE TRIGGER api_brand_fts_ad AFTER DELETE ON api_brand BEGIN
+        DELETE FROM api_brand_fts WHERE rowid = old.id;
+    END
+    """,
+    # existing rows
+    """
+    INSERT INTO api_product_fts (rowid, name, brand)
+    SELECT p.id, p.name, COALESCE(b.name, '')
+    FROM api_product p LEFT JOIN api_brand b ON b.id = p.brand_id
+    """,
+    "INSERT INTO api_brand_fts (rowid, name) SELECT id, name FROM api_brand",
+]
+
+DROP = [
+    "DROP TRIGGER IF EXISTS api_brand_fts_ad",
+    "DROP TRIGGER IF EXISTS api_brand_fts_au",
+    "DROP TRIGGER IF EXISTS api_brand_fts_ai",
+    "DROP TABLE IF EXISTS api_brand_fts",
+    "DROP TRIGGER IF EXISTS api_product_fts_ad",
+    "DROP TRIGGER IF EXISTS api_product_fts_au",
+    "DROP TRIGGER IF EXISTS api_product_fts_ai",
+    "DROP TABLE IF EXISTS api_product_fts",
+]
+
+
+def _run(statements):
+    def run(apps, schema_editor):
+        if schema_editor.connection.vendor != 'sqlite':
+            return
+        with schema_editor.connection.cursor() as cursor:
+            for sql in statements:
+                cursor.execute(sql)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0004_stock_ledger'),
+    ]
+
+    operations = [
+        migrations.RunPython(_run(CREATE), _run(DROP)),
+    ]
@@ -0,0 +1,88 @@
+# Generated by Django 5.2.8 on 2026-10-17 04:12
+
+import django.db.models.expressions
+from django.db import migrations, models
+
+
+# AddField rebuilds api_product on SQLite (new table, copy, drop, rename),
+# which fails while the FTS triggers from 0005 reference it. Drop them
+# for the rebuild and put them back afterwards; ids are kept, so the
+# index itself stays valid.
+#
+# The trigger SQL is copied from 0005 rather than imported from
+# api/search.py, so later changes there can't change what this migration
+# does.
+
+TRIGGERS = {
+    'api_product_fts_ai': """
+        CREATE TRIGGER IF NOT EXISTS api_product_fts_ai AFTER INSERT ON api_product BEGIN
+            INSERT OR REPLACE INTO api_product_fts (rowid, name, brand)
+            VALUES (new.id, new.name, COALESCE((SELECT name FROM api_brand WHERE id = new.brand_id), ''));
+        END
+    """,
+    'api_product_fts_au': """
+        CREATE TRIGGER IF NOT EXISTS api_product_fts_au AFTER UPDATE OF name, brand_id ON api_product BEGIN
+            DELETE FROM api_product_fts WHERE rowid = old.id;
+            INSERT INTO api_product_fts (rowid, name, brand)
+            VALUES (new.id, new.name, COALESCE((SELECT name FROM api_brand WHERE id = new.brand_id), ''));
+        END
+    """,
+    'api_product_fts_ad': """
+        CREATE TRIGGER IF NOT EXISTS api_product_fts_ad AFTER DELETE ON api_product BEGIN
+            DELETE FROM api_product_fts WHERE rowid = old.id;
+        END
+    """,
+    'api_brand_fts_ai': """
+        CREATE TRIGGER IF NOT EXISTS api_brand_fts_ai AFTER INSERT ON api_brand BEGIN
+            INSERT OR REPLACE INTO api_brand_fts (rowid, name) VALUES (new.id, new.name);
+        END
+    """,
+    'api_brand_fts_au': """
+        CREATE TRIGGER IF NOT EXISTS api_brand_fts_au AFTER UPDATE OF name ON api_brand BEGIN
+            UPDATE api_brand_fts SET name = new.name WHERE rowid = old.id;
+            UPDATE api_product_fts SET brand = new.name
+            WHERE rowid IN (SELECT id FROM api_product WHERE brand_id = new.id);
+        END
+    """,
+    'api_brand_fts_ad': """
+        CREATE TRIGGER IF NOT EXISTS api_brand_fts_ad AFTER DELETE ON api_brand BEGIN
+            DELETE FROM api_brand_fts WHERE rowid = old.id;
+        END
+    """,
+}
+
+def drop_search_triggers(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    with schema_editor.connection.cursor() as cursor:
+        for name in TRIGGERS:
+            cursor.execute(f'DROP TRIGGER IF EXISTS {name}')
+
+
+def create_search_triggers(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    with schema_editor.connection.cursor() as cursor:
+        for sql in TRIGGERS.values():
+            cursor.execute(sql)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0005_search_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(drop_search_triggers, create_search_triggers),
+        migrations.AddField(
+            model_name='product',
+            name='reorder_point',
+            field=models.PositiveIntegerField(default=5),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(models.OrderBy(django.db.models.expressions.CombinedExpression(models.F('reorder_point'), '-', models.F('stock')), descending=True), models.F('id'), condition=models.Q(('stock__lte', models.F('reorder_point'))), name='product_below_reorder_idx'),
+        ),
+        migrations.RunPython(create_search_triggers, drop_search_triggers),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 5.2.8 on 2026-10-17 04:27
+
+import django.core.serializers.json
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0006_reorder_points'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ForecastRun',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('forecast', 'Demand forecast'), ('insights', 'Inventory insights')], max_length=16)),
+                ('window_days', models.PositiveIntegerField()),
+                ('horizon_days', models.PositiveIntegerField()),
+                ('fingerprint', models.CharField(max_length=64)),
+                ('generated_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('duration_ms', models.PositiveIntegerField(default=0)),
+                ('payload', models.JSONField(encoder=django.core.serializers.json.DjangoJSONEncoder)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['kind', 'window_days', 'horizon_days', '-generated_at'], name='forecast_run_latest_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='Job',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(max_length=32)),
+                ('params', models.JSONField(default=dict)),
+                ('status', models.CharField(choices=[('queued', 'Queued'), ('running', 'Running'), ('done', 'Done'), ('failed', 'Failed')], default='queued', max_length=16)),
+                ('attempts', models.PositiveSmallIntegerField(default=0)),
+                ('result', models.JSONField(blank=True, null=True)),
+                ('error', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['status', 'kind', 'id'], name='job_status_kind_idx')],
+            },
+        ),
+    ]
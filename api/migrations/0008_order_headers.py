@@ -0,0 +1,116 @@
+# Generated by Django 5.2.8 on 2026-10-17 04:32
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from datetime import timedelta
+
+from django.core.management.color import no_style
+from django.db import migrations, models
+
+
+# Existing rows were one product each; a cart placed through checkout went
+# in as one INSERT, so its rows share the user, have consecutive ids and
+# timestamps a few microseconds apart. Such runs (same user, next id,
+# within CART_WINDOW of the first line) become one order, every other row
+# a one-line order.
+#
+# Each header takes the id of its first line, so most of the work is two
+# set-based statements: point every line at itself, then build the headers
+# by grouping on header_id. Only the lines of multi-line carts are updated
+# one cart at a time. Old lines keep their own timestamps (the rollup is
+# bucketed on them); the header gets the first one.
+CART_WINDOW = timedelta(seconds=1)
+READ_CHUNK = 20000
+UPDATE_CHUNK = 500
+
+
+def _carts(Order):
+    # -> [[line ids]] for carts of more than one line
+    carts, cart = [], []
+    start = None
+    rows = Order.objects.order_by("user_id", "id").values_list("id", "user_id", "created_at")
+    for line_id, user_id, created_at in rows.iterator(chunk_size=READ_CHUNK):
+        if (
+            cart
+            and line_id == cart[-1] + 1
+            and user_id == start[0]
+            and created_at - start[1] < CART_WINDOW
+        ):
+            cart.append(line_id)
+            continue
+        if len(cart) > 1:
+            carts.append(cart)
+        cart, start = [line_id], (user_id, created_at)
+    if len(cart) > 1:
+        carts.append(cart)
+    return carts
+
+
+def attach_headers(apps, schema_editor):
+    Order = apps.get_model("api", "Order")
+    OrderHeader = apps.get_model("api", "OrderHeader")
+    connection = schema_editor.connection
+    order = connection.ops.quote_name(Order._meta.db_table)
+    header = connection.ops.quote_name(OrderHeader._meta.db_table)
+
+    carts = _carts(Order)
+    with connection.cursor() as cursor:
+        cursor.execute(f"UPDATE {order} SET header_id = id")
+        for cart in carts:
+            rest = cart[1:]
+            for i in range(0, len(rest), UPDATE_CHUNK):
+                chunk = rest[i:i + UPDATE_CHUNK]
+                cursor.execute(
+                    f"UPDATE {order} SET header_id = %s WHERE id IN ({', '.join(['%s'] * len(chunk))})",
+                    [cart[0], *chunk],
+                )
+        cursor.execute(f"""
+            INSERT INTO {header} (id, user_id, created_at, line_count, total_price)
+            SELECT header_id, MIN(user_id), MIN(created_at), COUNT(*), SUM(total_price)
+            FROM {order}
+            GROUP BY header_id
+        """)
+        # explicit ids: move the header sequence past them (Postgres)
+        for sql in connection.ops.sequence_reset_sql(no_style(), [OrderHeader]):
+            cursor.execute(sql)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0007_jobs_forecast_runs'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='order',
+            name='created_at',
+            field=models.DateTimeField(default=django.utils.timezone.now, editable=False),
+        ),
+        migrations.CreateModel(
+            name='OrderHeader',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now, editable=False)),
+                ('line_count', models.PositiveIntegerField(default=0)),
+                ('total_price', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('user', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='order_headers', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='order',
+            name='header',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='lines', to='api.orderheader'),
+        ),
+        migrations.AddIndex(
+            model_name='orderheader',
+            index=models.Index(fields=['user', '-created_at'], name='order_header_user_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='orderheader',
+            index=models.Index(fields=['created_at'], name='order_header_created_idx'),
+        ),
+        migrations.RunPython(attach_headers, migrations.RunPython.noop),
+    ]
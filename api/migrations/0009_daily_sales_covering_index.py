@@ -0,0 +1,21 @@
+# Generated by Django 5.2.8 on 2026-10-17 04:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0008_order_headers'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='dailyskusales',
+            name='daily_sku_sales_day_idx',
+        ),
+        migrations.AddIndex(
+            model_name='dailyskusales',
+            index=models.Index(fields=['day', 'product', 'qty', 'revenue', 'order_count'], name='daily_sku_sales_day_idx'),
+        ),
+    ]
@@ -1,5 +1,7 @@
 from django.db import models
+from django.core.serializers.json import DjangoJSONEncoder
 from django.contrib.auth.models import User
+from django.utils import timezone
 
 
 # Brand table
@@ -13,6 +15,10 @@ class Brand(models.Model):
         return self.name
 
 
+# Default reorder point for new products (the old global low-stock cut-off)
+DEFAULT_REORDER_POINT = 5
+
+
 # Product table
 # Each product belongs to a brand and has a price + stock.
 # Keeping stock directly on the product is fine for a single warehouse setup.
@@ -26,22 +32,276 @@ class Product(models.Model):
     )
     price = models.DecimalField(max_digits=10, decimal_places=2)
     stock = models.PositiveIntegerField(default=0)
+    # Low stock = stock <= reorder_point. Set by hand or derived from the
+    # sales rate (manage.py update_reorder_points)
+    reorder_point = models.PositiveIntegerField(default=DEFAULT_REORDER_POINT)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['stock'], name='product_stock_idx'),
+            # Low-stock list: partial index over the flagged rows only,
+            # already in shortfall order, so it grows with the number of
+            # SKUs below their reorder point, not with the catalog
+            models.Index(
+                (models.F('reorder_point') - models.F('stock')).desc(),
+                models.F('id'),
+                name='product_below_reorder_idx',
+                condition=models.Q(stock__lte=models.F('reorder_point')),
+            ),
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember what we loaded so a save() can log the difference to the
+        # stock ledger / live feed without reading the row again (api/signals.py)
+        instance._loaded_stock = instance.__dict__.get('stock')
+        instance._loaded_reorder_point = instance.__dict__.get('reorder_point')
+        return instance
+
     def __str__(self):
         return self.name
 
 
-# Order table
-# A very simple order model: one product per order.
-# This keeps the API easy to work with for now.
-# Can be expanded into multi line orders in the future if needed.
+# Order header
+# One checkout: who placed it, when, and its totals. The lines are Order
+# rows (header.lines). line_count / total_price are kept in step by
+# api/ordering.py and the Order signals, so order history and order counts
+# never have to regroup lines.
+class OrderHeader(models.Model):
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='order_headers',
+        db_index=False,  # covered by the (user, created_at) index
+    )
+    created_at = models.DateTimeField(default=timezone.now, editable=False)
+    line_count = models.PositiveIntegerField(default=0)
+    total_price = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+
+    class Meta:
+        indexes = [
+            # a customer's order history, newest first
+            models.Index(fields=['user', '-created_at'], name='order_header_user_idx'),
+            # orders per day
+            models.Index(fields=['created_at'], name='order_header_created_idx'),
+        ]
+
+    def __str__(self):
+        return f"Order #{self.pk} ({self.line_count} lines)"
+
+
+# Order line table
+# One product of an order: an Order row is a line of its OrderHeader. The
+# model keeps its name (and ids, which the stock ledger and the live feed
+# refer to). user and created_at are copied from the header on purpose:
+# the analytics indexes below cover them, so sales aggregates never join.
+# A line saved on its own gets a one-line header (api/signals.py); other
+# bulk_create paths attach theirs with api.seeding.attach_headers().
 class Order(models.Model):
-    user = models.ForeignKey(User, on_delete=models.CASCADE)
-    product = models.ForeignKey(Product, on_delete=models.CASCADE)
+    # FK lookups are served by the composite indexes below (same leading
+    # column), so the default single-column FK indexes are skipped.
+    header = models.ForeignKey(
+        OrderHeader,
+        on_delete=models.CASCADE,
+        related_name='lines',
+        null=True,
+        blank=True,
+    )
+    user = models.ForeignKey(User, on_delete=models.CASCADE, db_index=False)
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, db_index=False)
     quantity = models.PositiveIntegerField()
     total_price = models.DecimalField(max_digits=10, decimal_places=2)
-    created_at = models.DateTimeField(auto_now_add=True)
+    # the header's time for every line of a checkout (auto_now_add would
+    # stamp each line of a bulk_create separately)
+    created_at = models.DateTimeField(default=timezone.now, editable=False)
+
+    class Meta:
+        indexes = [
+            # date-range analytics grouped by product; quantity/total_price
+            # ride along so range aggregates never touch the table itself
+            models.Index(
+                fields=['created_at', 'product', 'quantity', 'total_price'],
+                name='order_created_product_idx',
+            ),
+            # per-product totals (top sellers, brand revenue), covering too
+            models.Index(
+                fields=['product', 'quantity', 'total_price'],
+                name='order_product_sales_idx',
+            ),
+            # a customer's order history, newest first
+            models.Index(fields=['user', '-created_at'], name='order_user_created_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.user.username} - {self.product.name}"
+
+
+# Daily sales rollup
+# One row per (product, day) with the units, revenue and number of orders
+# for that day. The analytics endpoints read from here instead of re-scanning
+# the raw order table, so their cost grows with SKUs x days, not order count.
+# Kept up to date from api/rollups.py (signals + bulk helpers), and can be
+# rebuilt from scratch with `manage.py rebuild_sales_rollup`.
+class DailySkuSales(models.Model):
+    product = models.ForeignKey(
+        Product,
+        on_delete=models.CASCADE,
+        related_name='daily_sales'
+    )
+    day = models.DateField()
+    qty = models.PositiveIntegerField(default=0)
+    revenue = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    order_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['product', 'day'], name='uniq_daily_sku_sales'),
+        ]
+        indexes = [
+            # day-range reads (forecast windows, time series) never touch
+            # the table: the summed columns ride along
+            models.Index(
+                fields=['day', 'product', 'qty', 'revenue', 'order_count'],
+                name='daily_sku_sales_day_idx',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.product_id} @ {self.day}: {self.qty}"
+
+
+# Stock ledger
+# Append-only log of every stock change (orders, adjustments, restocks,
+# manual edits). Product.stock stays the O(1) current value; the ledger is
+# what lets us answer "what was stock on date X" (see api/ledger.py).
+class StockMovement(models.Model):
+    INITIAL = 'initial'
+    ORDER = 'order'
+    ADJUST = 'adjust'
+    RESTOCK = 'restock'
+    EDIT = 'edit'
+    REASONS = [
+        (INITIAL, 'Initial stock'),
+        (ORDER, 'Order placed'),
+        (ADJUST, 'Stock adjustment'),
+        (RESTOCK, 'Auto restock'),
+        (EDIT, 'Product edited'),
+    ]
+
+    product = models.ForeignKey(
+        Product,
+        on_delete=models.CASCADE,
+        related_name='stock_movements',
+        db_index=False,  # covered by the (product, created_at) index
+    )
+    delta = models.IntegerField()
+    reason = models.CharField(max_length=16, choices=REASONS)
+    # id of the order behind an ORDER movement (plain column, orders can go)
+    ref_id = models.BigIntegerField(null=True, blank=True)
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['product', 'created_at'], name='stock_move_product_at_idx'),
+            # snapshots: "everything after the last snapshot time"
+            models.Index(fields=['created_at'], name='stock_move_created_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.product_id} {self.delta:+d} ({self.reason})"
+
+
+# Stock snapshots
+# Stock per product at a point in time, written periodically by
+# `manage.py snapshot_stock`. Stock at time T = nearest snapshot <= T plus
+# the movements between the two, so lookups never replay the whole ledger.
+class StockSnapshot(models.Model):
+    product = models.ForeignKey(
+        Product,
+        on_delete=models.CASCADE,
+        related_name='stock_snapshots',
+        db_index=False,  # covered by the unique (product, taken_at)
+    )
+    taken_at = models.DateTimeField()
+    stock = models.IntegerField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['product', 'taken_at'], name='uniq_stock_snapshot'),
+        ]
+        indexes = [
+            models.Index(fields=['taken_at'], name='stock_snapshot_taken_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.product_id} @ {self.taken_at}: {self.stock}"
+
+
+# Background jobs
+# Minimal database-backed queue worked by `manage.py run_jobs` (see
+# api/jobs.py). A worker claims the oldest queued job by flipping its status
+# with a conditional UPDATE, so several workers never run the same job.
+class Job(models.Model):
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+    STATUSES = [
+        (QUEUED, 'Queued'),
+        (RUNNING, 'Running'),
+        (DONE, 'Done'),
+        (FAILED, 'Failed'),
+    ]
+
+    kind = models.CharField(max_length=32)
+    params = models.JSONField(default=dict)
+    status = models.CharField(max_length=16, choices=STATUSES, default=QUEUED)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    result = models.JSONField(null=True, blank=True)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(default=timezone.now)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            # "oldest queued job" + dedupe lookups
+            models.Index(fields=['status', 'kind', 'id'], name='job_status_kind_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} #{self.pk} ({self.status})"
+
+
+# Forecast / insight snapshots
+# Precomputed demand_forecast and inventory_insights payloads, one row per
+# computation. `fingerprint` is the data the run was computed from (see
+# api/jobs.py), so a newer run only has to be made when it changes.
+class ForecastRun(models.Model):
+    FORECAST = 'forecast'
+    INSIGHTS = 'insights'
+    KINDS = [
+        (FORECAST, 'Demand forecast'),
+        (INSIGHTS, 'Inventory insights'),
+    ]
+
+    kind = models.CharField(max_length=16, choices=KINDS)
+    window_days = models.PositiveIntegerField()
+    horizon_days = models.PositiveIntegerField()
+    fingerprint = models.CharField(max_length=64)
+    generated_at = models.DateTimeField(default=timezone.now)
+    duration_ms = models.PositiveIntegerField(default=0)
+    payload = models.JSONField(encoder=DjangoJSONEncoder)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=['kind', 'window_days', 'horizon_days', '-generated_at'],
+                name='forecast_run_latest_idx',
+            ),
+        ]
 
     def __str__(self):
-        return f"{self.user.username} - {self.product.name}"
\ No newline at end of file
+        return f"{self.kind} {self.window_days}/{self.horizon_days}d @ {self.generated_at}"
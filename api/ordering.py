@@ -0,0 +1,134 @@
+from functools import reduce
+from operator import or_
+
+from django.db import models, transaction
+from django.db.models import Case, F, Q, When
+from django.utils import timezone
+
+from .caching import bump_data_version
+from .catalog import CATALOG_SCOPE
+from .events import Level, hub, publish_orders, publish_stock
+from .ledger import record_movements
+from .models import Order, OrderHeader, Product, StockMovement
+from .rollups import record_orders
+
+
+# ======================
+# ORDER PLACEMENT
+# ======================
+# A cart is placed as one unit: either every line goes through or nothing
+# does. The query count is flat no matter how many lines the cart has:
+#   1 SELECT for the products, 1 conditional UPDATE for the stock
+#   (per STOCK_CHUNK products), 1 INSERT for the order header, 1 INSERT for
+#   all its lines, 1 INSERT for the stock ledger, plus the rollup.
+
+# Products per stock UPDATE (each one binds 4 params, SQLite allows 999)
+STOCK_CHUNK = 200
+
+
+class InsufficientStock(Exception):
+    def __init__(self, product_ids):
+        self.product_ids = sorted(product_ids)
+        super().__init__(f"Insufficient stock for products {self.product_ids}")
+
+
+def parse_cart_lines(lines):
+    # [{product_id, quantity}, ...] -> [(pid, qty), ...]
+    # Malformed lines and non-positive quantities are skipped.
+    parsed = []
+    for item in lines:
+        try:
+            pid = int(item.get("product_id"))
+            qty = int(item.get("quantity"))
+        except (AttributeError, TypeError, ValueError):
+            continue
+        if qty > 0:
+            parsed.append((pid, qty))
+    return parsed
+
+
+def _decrement_stock(needed):
+    # Conditional, set-based decrement: a row only matches if it still has
+    # enough stock, so two concurrent checkouts can't both sell the last unit.
+    updated = 0
+    items = list(needed.items())
+    for i in range(0, len(items), STOCK_CHUNK):
+        chunk = items[i:i + STOCK_CHUNK]
+        updated += Product.objects.filter(
+            reduce(or_, (Q(id=pid, stock__gte=qty) for pid, qty in chunk))
+        ).update(
+            stock=Case(
+                *[When(id=pid, then=F("stock") - qty) for pid, qty in chunk],
+                output_field=models.PositiveIntegerField(),
+            )
+        )
+    return updated
+
+
+@transaction.atomic
+def place_order(user, lines):
+    """
+    Place every (product_id, quantity) line for `user` in one transaction.
+    Unknown products are skipped; if any product can't cover the requested
+    quantity the whole cart is rolled back with InsufficientStock.
+    Returns the created Order lines (with ids); their header is
+    orders[0].header.
+    """
+    products = Product.objects.in_bulk({pid for pid, _ in lines})
+    lines = [(pid, qty) for pid, qty in lines if pid in products]
+    if not lines:
+        return []
+
+    # Same product can show up on several lines; stock is checked on the total
+    needed = {}
+    for pid, qty in lines:
+        needed[pid] = needed.get(pid, 0) + qty
+
+    if _decrement_stock(needed) != len(needed):
+        # Find out who was short, then let the atomic block roll back
+        stock_now = dict(
+            Product.objects.filter(id__in=needed).values_list("id", "stock")
+        )
+        short = [pid for pid, qty in needed.items() if stock_now.get(pid, 0) < qty]
+        raise InsufficientStock(short)
+
+    header = OrderHeader.objects.create(
+        user=user,
+        created_at=timezone.now(),
+        line_count=len(lines),
+        total_price=sum(products[pid].price * qty for pid, qty in lines),
+    )
+    orders = Order.objects.bulk_create([
+        Order(
+            header=header,
+            user=user,
+            product=products[pid],
+            quantity=qty,
+            total_price=products[pid].price * qty,
+            created_at=header.created_at,
+        )
+        for pid, qty in lines
+    ])
+
+    # bulk_create / update() skip signals, so do their work here
+    record_orders(orders)
+    record_movements([
+        StockMovement(
+            product_id=o.product_id, delta=-o.quantity, reason=StockMovement.ORDER,
+            ref_id=o.id, created_at=o.created_at,
+        )
+        for o in orders
+    ])
+    bump_data_version()
+    bump_data_version(CATALOG_SCOPE)  # stock changed
+
+    publish_orders(header, orders)
+    if hub.has_subscribers():
+        # Only the live feed needs the new stock; the rows are still locked
+        # by the UPDATE, so before = after + what this cart took
+        after = Product.objects.filter(id__in=needed).values_list("id", "stock", "reorder_point")
+        publish_stock({
+            pid: (Level(stock + needed[pid], point), Level(stock, point))
+            for pid, stock, point in after
+        })
+    return orders
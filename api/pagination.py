@@ -0,0 +1,129 @@
+from django.db import connections
+from django.db.models import Max
+from rest_framework.pagination import BasePagination, CursorPagination, PageNumberPagination
+from rest_framework.response import Response
+
+
+# ======================
+# PAGINATION
+# ======================
+# Page numbers stay the default (the Products page uses them), but deep
+# pages pay for OFFSET + COUNT(*). Passing ?cursor=... or ?pagination=keyset
+# switches to keyset pagination: WHERE id < last_seen ORDER BY -id, so page
+# 5,000 costs the same as page 1, and no COUNT(*) unless asked for.
+#
+#   ?page_size=N          items per page (capped at max_page_size)
+#   ?count=exact          add an exact total (one COUNT(*))
+#   ?count=estimate       add a cheap estimate instead (see estimate_count)
+
+
+def estimate_count(queryset):
+    """
+    Rough row count without scanning the table. Only meaningful for
+    unfiltered querysets; returns None when it can't do better than COUNT(*).
+    """
+    if queryset.query.where:
+        return None
+
+    model = queryset.model
+    connection = connections[queryset.db]
+    if connection.vendor == "postgresql":
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT reltuples::bigint FROM pg_class WHERE relname = %s",
+                [model._meta.db_table],
+            )
+            row = cursor.fetchone()
+        if row and row[0] >= 0:
+            return row[0]
+
+    # Auto-increment ids: MAX(id) is an index lookup, overcounts by deletions
+    return queryset.aggregate(n=Max("pk"))["n"] or 0
+
+
+class KeysetPagination(CursorPagination):
+    ordering = "-id"
+    page_size_query_param = "page_size"
+    max_page_size = 1000
+    count_query_param = "count"
+
+    def get_ordering(self, request, queryset, view):
+        ordering = list(super().get_ordering(request, queryset, view))
+        # Sorting by a non-unique field (name/price/stock): break ties on id
+        # so the order between pages is stable.
+        if not any(f.lstrip("-") in ("id", "pk") for f in ordering):
+            ordering.append("-id" if ordering[0].startswith("-") else "id")
+        return tuple(ordering)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        mode = request.query_params.get(self.count_query_param)
+        self.count = None
+        self.count_mode = None
+        if mode == "exact":
+            self.count, self.count_mode = queryset.count(), "exact"
+        elif mode == "estimate":
+            self.count = estimate_count(queryset)
+            self.count_mode = "estimate" if self.count is not None else None
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        body = {
+            "next": self.get_next_link(),
+            "previous": self.get_previous_link(),
+            "results": data,
+        }
+        if self.count_mode:
+            body["count"] = self.count
+            body["count_mode"] = self.count_mode
+        return Response(body)
+
+
+class LowStockPagination(PageNumberPagination):
+    # low_stock view: most urgent first, so the first page is what matters
+    page_size = 50
+    page_size_query_param = "page_size"
+    max_page_size = 500
+
+
+class OrderHistoryPagination(PageNumberPagination):
+    # customer_orders: one page of orders, each with all its lines
+    page_size = 20
+    page_size_query_param = "page_size"
+    max_page_size = 100
+
+
+class PageOrKeysetPagination(BasePagination):
+    """
+    Page numbers by default, keyset when the client asks for it.
+    """
+    keyset_class = KeysetPagination
+    page_number_class = PageNumberPagination
+
+    def __init__(self):
+        self.keyset = self.keyset_class()
+        self.page_number = self.page_number_class()
+        self.active = self.page_number
+
+    def use_keyset(self, request):
+        params = request.query_params
+        return self.keyset.cursor_query_param in params or params.get("pagination") == "keyset"
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.active = self.keyset if self.use_keyset(request) else self.page_number
+        return self.active.paginate_queryset(queryset, request, view)
+
+    @property
+    def display_page_controls(self):
+        return getattr(self.active, "display_page_controls", False)
+
+    def get_paginated_response(self, data):
+        return self.active.get_paginated_response(data)
+
+    def get_paginated_response_schema(self, schema):
+        return self.page_number.get_paginated_response_schema(schema)
+
+    def to_html(self):
+        return self.active.to_html()
+
+    def get_results(self, data):
+        return data["results"]
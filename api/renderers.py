@@ -0,0 +1,107 @@
+import datetime
+import decimal
+import uuid
+
+from django.db.models.query import QuerySet
+from django.utils.encoding import force_str
+from django.utils.functional import Promise
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+try:
+    import orjson
+except ImportError:  # optional: the stdlib renderer/parser are used instead
+    orjson = None
+
+
+# ======================
+# FAST JSON (orjson renderer + parser)
+# ======================
+# DRF's JSONRenderer goes through the stdlib json module and its Python-level
+# encoder for every Decimal and datetime, which adds up on the big payloads
+# (forecast items, the customer catalog, chart series). These render the
+# same JSON with orjson:
+#
+#   - datetimes come out as DRF writes them (isoformat, UTC as "Z"), Decimal
+#     as a number, querysets / generators as lists, lazy strings as text
+#   - U+2028 / U+2029 are escaped like DRF does
+#   - anything orjson can't do (indent requested by the browsable API, ints
+#     over 64 bits, types it doesn't know) falls back to JSONRenderer
+#
+# The bytes are not always the same. Floats in exponent notation have no
+# "+" and no zero padding (1e16, 1e-7 where DRF writes 1e+16, 1e-07): the
+# same numbers to any JSON parser. NaN and Infinity become null, where DRF
+# raises ValueError. Payloads built from Decimals, ints, plain floats and
+# datetimes come out identical.
+#
+# Without orjson installed both classes behave exactly like DRF's.
+
+OPTIONS = (
+    orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY if orjson else 0
+)
+
+
+def _default(obj):
+    # Same conversions as rest_framework.utils.encoders.JSONEncoder for the
+    # types orjson doesn't handle itself
+    if isinstance(obj, decimal.Decimal):
+        return float(obj)
+    if isinstance(obj, Promise):
+        return force_str(obj)
+    if isinstance(obj, datetime.timedelta):
+        return str(obj.total_seconds())
+    if isinstance(obj, uuid.UUID):
+        return str(obj)
+    if isinstance(obj, QuerySet):
+        return list(obj)
+    if isinstance(obj, bytes):
+        return obj.decode()
+    if hasattr(obj, "tolist"):
+        return obj.tolist()
+    if hasattr(obj, "__getitem__"):
+        try:
+            return dict(obj)
+        except (TypeError, ValueError):
+            return list(obj)
+    if hasattr(obj, "__iter__"):
+        return list(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dumps(data):
+    """
+    Encode `data` like DRF's JSONRenderer (compact). Raises TypeError for
+    what orjson can't encode; callers fall back to the stdlib.
+    """
+    ret = orjson.dumps(data, default=_default, option=OPTIONS)
+    # line separators are valid JSON but not valid JavaScript
+    if b"\xe2\x80\xa8" in ret or b"\xe2\x80\xa9" in ret:
+        ret = ret.replace(b"\xe2\x80\xa8", b"\\u2028").replace(b"\xe2\x80\xa9", b"\\u2029")
+    return ret
+
+
+class FastJSONRenderer(JSONRenderer):
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        if orjson is None or self.get_indent(accepted_media_type, renderer_context or {}):
+            return super().render(data, accepted_media_type, renderer_context)
+        try:
+            return dumps(data)
+        except TypeError:
+            # orjson.JSONEncodeError is a TypeError
+            return super().render(data, accepted_media_type, renderer_context)
+
+
+class FastJSONParser(JSONParser):
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get("encoding", "utf-8")
+        if orjson is None or encoding.lower().replace("_", "-") not in ("utf-8", "utf8"):
+            return super().parse(stream, media_type, parser_context)
+        try:
+            # orjson rejects NaN / Infinity, like DRF's strict parsing
+            return orjson.loads(stream.read())
+        except orjson.JSONDecodeError as exc:
+            raise ParseError(f"JSON parse error - {exc}")
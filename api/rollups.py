@@ -0,0 +1,199 @@
+from collections import namedtuple
+from datetime import timedelta
+from decimal import Decimal
+from functools import reduce
+from operator import or_
+
+from django.db import connections, models, router, transaction
+from django.db.models import Case, Count, F, Q, Sum, Value, When
+from django.db.models.functions import Greatest, TruncDate
+from django.utils import timezone
+
+from .models import DailySkuSales, Order
+
+
+# ======================
+# DAILY SALES ROLLUP
+# ======================
+# Everything that writes orders goes through here so DailySkuSales stays in
+# step with the raw table:
+# - single saves/deletes are picked up by the signals in api/signals.py
+# - bulk paths (checkout, seeding, backfills) call record_orders() directly,
+#   because bulk_create / queryset.update don't fire signals
+# - rebuild_daily_sales() recomputes everything from scratch (management cmd)
+
+# Minimal view of an order line; lets callers pass Order instances or plain
+# tuples (e.g. the "before" values of an updated order).
+SaleLine = namedtuple("SaleLine", ["product_id", "created_at", "quantity", "total_price"])
+
+# bulk_create/bulk_update batch size when (re)writing rollup rows
+BATCH_SIZE = 1000
+
+# buckets per upsert (5 params a bucket) and per relative UPDATE (11 params
+# a bucket); SQLite allows 999
+UPSERT_CHUNK = 150
+TAKE_CHUNK = 80
+
+
+def order_day(created_at):
+    # Bucket by the project's local calendar day (UTC by default)
+    if timezone.is_aware(created_at):
+        return timezone.localdate(created_at)
+    return created_at.date()
+
+
+def window_start(days, today=None):
+    # First rollup day included in a "last N days" window: today and the
+    # N - 1 days before it
+    today = today or timezone.localdate()
+    return today - timedelta(days=days - 1)
+
+
+def _as_line(order):
+    if isinstance(order, SaleLine):
+        return order
+    return SaleLine(order.product_id, order.created_at, order.quantity, order.total_price)
+
+
+def _bucket_deltas(orders, sign):
+    # (product_id, day) -> [qty, revenue, order_count]
+    deltas = {}
+    for order in orders:
+        line = _as_line(order)
+        key = (line.product_id, order_day(line.created_at))
+        d = deltas.setdefault(key, [0, Decimal("0"), 0])
+        d[0] += sign * line.quantity
+        # instances built in Python may still hold a float/str price
+        d[1] += sign * Decimal(str(line.total_price))
+        d[2] += sign
+    return deltas
+
+
+def _add_buckets(connection, deltas):
+    # New sales: one upsert per chunk. The database adds to whatever row is
+    # there when the statement runs, so concurrent checkouts can't lose each
+    # other's increments or both INSERT the same new bucket.
+    table = connection.ops.quote_name(DailySkuSales._meta.db_table)
+    items = list(deltas.items())
+    with connection.cursor() as cursor:
+        for i in range(0, len(items), UPSERT_CHUNK):
+            chunk = items[i:i + UPSERT_CHUNK]
+            params = []
+            for (pid, day), (qty, revenue, count) in chunk:
+                params += [
+                    pid,
+                    connection.ops.adapt_datefield_value(day),
+                    qty,
+                    connection.ops.adapt_decimalfield_value(revenue, 14, 2),
+                    count,
+                ]
+            cursor.execute(
+                f"""
+                INSERT INTO {table} (product_id, day, qty, revenue, order_count)
+                VALUES {", ".join(["(%s, %s, %s, %s, %s)"] * len(chunk))}
+                ON CONFLICT (product_id, day) DO UPDATE SET
+                    qty = {table}.qty + excluded.qty,
+                    revenue = {table}.revenue + excluded.revenue,
+                    order_count = {table}.order_count + excluded.order_count
+                """,
+                params,
+            )
+
+
+def _take_buckets(deltas):
+    # Deleted / changed orders: relative UPDATEs clamped at 0, then drop
+    # the buckets that have no orders left
+    items = list(deltas.items())
+    for i in range(0, len(items), TAKE_CHUNK):
+        chunk = items[i:i + TAKE_CHUNK]
+        keys = reduce(or_, (Q(product_id=pid, day=day) for (pid, day), _ in chunk))
+
+        def column(name, pos, field):
+            return Greatest(
+                Case(
+                    *[When(product_id=pid, day=day, then=F(name) + d[pos]) for (pid, day), d in chunk],
+                    output_field=field,
+                ),
+                Value(0),
+            )
+
+        DailySkuSales.objects.filter(keys).update(
+            qty=column("qty", 0, models.IntegerField()),
+            revenue=column("revenue", 1, models.DecimalField(max_digits=14, decimal_places=2)),
+            order_count=column("order_count", 2, models.IntegerField()),
+        )
+        DailySkuSales.objects.filter(keys, order_count=0).delete()
+
+
+def record_orders(orders, sign=1):
+    """
+    Fold a batch of orders into the rollup (sign=-1 to take them back out).
+    Costs a constant number of queries per batch, not per order, and never
+    reads the rows it changes: every change is relative to what the
+    database holds.
+    """
+    deltas = _bucket_deltas(orders, sign)
+    if not deltas:
+        return
+
+    with transaction.atomic():
+        added = {key: d for key, d in deltas.items() if d[2] > 0}
+        if added:
+            _add_buckets(connections[router.db_for_write(DailySkuSales)], added)
+        taken = {key: d for key, d in deltas.items() if d[2] <= 0}
+        if taken:
+            _take_buckets(taken)
+
+
+def rebuild_daily_sales(since=None):
+    """
+    Recompute the rollup from the raw order table.
+    Only days >= `since` are touched when it is given.
+    Returns the number of rollup rows written.
+    """
+    orders = Order.objects.all()
+    rollup = DailySkuSales.objects.all()
+    if since is not None:
+        rollup = rollup.filter(day__gte=since)
+        orders = orders.filter(created_at__date__gte=since)
+
+    rows = (
+        orders.annotate(day=TruncDate("created_at"))
+        .values("product_id", "day")
+        .annotate(
+            qty=Sum("quantity"),
+            revenue=Sum("total_price"),
+            order_count=Count("id"),
+        )
+        .order_by()
+    )
+
+    written = 0
+    with transaction.atomic():
+        rollup.delete()
+
+        batch = []
+        for row in rows.iterator(chunk_size=BATCH_SIZE):
+            batch.append(DailySkuSales(**row))
+            if len(batch) >= BATCH_SIZE:
+                DailySkuSales.objects.bulk_create(batch)
+                written += len(batch)
+                batch = []
+        if batch:
+            DailySkuSales.objects.bulk_create(batch)
+            written += len(batch)
+
+    return written
+
+
+def sales_in_window(since, until=None):
+    # Rollup rows for [since, until) — the building block for the analytics views
+    qs = DailySkuSales.objects.filter(day__gte=since)
+    if until is not None:
+        qs = qs.filter(day__lt=until)
+    return qs
+
+
+def total_orders_since(since):
+    return sales_in_window(since).aggregate(n=Sum("order_count"))["n"] or 0
+
@@ -0,0 +1,127 @@
+import asyncio
+import sqlite3
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+
+from django.db import DEFAULT_DB_ALIAS, connections
+
+
+# ======================
+# READ REPLICA ROUTING
+# ======================
+# Analytics views (dashboard charts, insights, forecast, AI summary,
+# exports) read from the "replica" database when settings.DATABASES has
+# one; everything else, and every write, stays on "default".
+#
+# Routing is opt-in per view (@replica_reads) rather than per model: the
+# same Order rows are read by customer_orders right after placing one, and
+# a lagging replica would hide the new order there. Inside a replica view
+# the first write pins the rest of that request back to default, so a view
+# never reads past its own write.
+#
+# Without a replica (or when it is the same database as default, which is
+# what the test runner's MIRROR does) reads go to default as before.
+#
+# Job and ForecastRun always read from default, even inside a replica
+# view: the views write them themselves (snapshots, queued recomputes), and
+# behind a lagging replica they would never find the rows they just made.
+
+REPLICA = "replica"
+
+DEFAULT_ONLY = {"api.job", "api.forecastrun"}
+
+
+class _ReadState:
+    __slots__ = ("pinned",)
+
+    def __init__(self):
+        self.pinned = False
+
+
+_state = ContextVar("stx_replica_reads", default=None)
+
+
+def replica_available():
+    if REPLICA not in connections.settings:
+        return False
+    replica = connections[REPLICA].settings_dict
+    return replica["NAME"] != connections[DEFAULT_DB_ALIAS].settings_dict["NAME"]
+
+
+def reading_replica():
+    # True while the current request's reads are routed to the replica
+    state = _state.get()
+    return state is not None and not state.pinned and replica_available()
+
+
+@contextmanager
+def replica_context():
+    token = _state.set(_ReadState())
+    try:
+        yield
+    finally:
+        _state.reset(token)
+
+
+def replica_reads(view):
+    """
+    Route the view's reads to the replica. Works for sync and async views;
+    put it under @api_view so authentication still reads from default.
+    """
+    if asyncio.iscoroutinefunction(view):
+        @wraps(view)
+        async def async_wrapper(*args, **kwargs):
+            # sync_to_async copies the context, so worker threads see it
+            with replica_context():
+                return await view(*args, **kwargs)
+        return async_wrapper
+
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        with replica_context():
+            return view(*args, **kwargs)
+    return wrapper
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        if model._meta.label_lower in DEFAULT_ONLY:
+            return DEFAULT_DB_ALIAS
+        if reading_replica():
+            return REPLICA
+        return None
+
+    def db_for_write(self, model, **hints):
+        state = _state.get()
+        if state is not None:
+            state.pinned = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # same rows on both sides
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # the replica is a copy of default (python manage.py sync_replica
+        # for SQLite, replication elsewhere), never migrated on its own
+        return db != REPLICA
+
+
+def sync_sqlite_replica(path, using=DEFAULT_DB_ALIAS, pages=1024):
+    """
+    Copy an SQLite database into the file at `path` with SQLite's online
+    backup (consistent snapshot, writers are only blocked per batch of
+    `pages`). Stands in for replication when trying the replica locally.
+    Returns the number of pages copied.
+    """
+    source = connections[using]
+    if source.vendor != "sqlite":
+        raise ValueError("sync_sqlite_replica only copies SQLite databases")
+    source.ensure_connection()
+    target = sqlite3.connect(path)
+    try:
+        source.connection.backup(target, pages=pages)
+        return target.execute("PRAGMA page_count").fetchone()[0]
+    finally:
+        target.close()
@@ -0,0 +1,204 @@
+import re
+
+from django.db import connections, transaction
+from rest_framework import filters
+
+from .models import Brand, Product
+
+
+# ======================
+# FULL-TEXT SEARCH (SQLite FTS5)
+# ======================
+# SearchFilter turns ?search=red shoe into
+#   name LIKE '%red%' OR brand.name LIKE '%red%' ... (per term)
+# which scans every product on every keystroke. On SQLite the same query
+# goes to an FTS5 index instead (migration 0005, kept in sync by triggers):
+#
+#   ?search=red sho   ->   MATCH '"red"* "sho"*'
+#
+# Every term is a prefix match and must hit the name or the brand name.
+# Results come back best match first (bm25, name weighted over brand)
+# unless the request asks for ?ordering=. bm25 has to score every match
+# before the first row comes back, so a broad query (more than RANK_LIMIT
+# matches, e.g. the first letter typed) is returned newest first instead,
+# which FTS5 can stream in rowid order. Other databases, and views without
+# an index, keep the plain SearchFilter behaviour.
+
+# model -> (FTS table, bm25 column weights)
+SEARCH_INDEXES = {
+    Product: ("api_product_fts", (10.0, 1.0)),  # name, brand
+    Brand: ("api_brand_fts", (1.0,)),
+}
+
+# Above this many matches, order by id instead of rank
+RANK_LIMIT = 1000
+
+# What the unicode61 tokenizer keeps; everything else separates tokens
+TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+_available = {}
+
+
+def match_expression(terms):
+    # ["red", "sho-e"] -> '"red"* "sho"* "e"*' (implicit AND), None if empty
+    tokens = [t for term in terms for t in TOKEN_RE.findall(term)]
+    if not tokens:
+        return None
+    return " ".join(f'"{t}"*' for t in tokens)
+
+
+def index_available(model, using="default"):
+    """
+    True when `model` has an FTS table on this database. Checked once per
+    process (the tables come from a migration, not at runtime).
+    """
+    if model not in SEARCH_INDEXES:
+        return False
+    connection = connections[using]
+    key = (connection.alias, model)
+    if key not in _available:
+        _available[key] = (
+            connection.vendor == "sqlite"
+            and SEARCH_INDEXES[model][0] in connection.introspection.table_names()
+        )
+    return _available[key]
+
+
+class FullTextSearchFilter(filters.SearchFilter):
+    def filter_queryset(self, request, queryset, view):
+        terms = self.get_search_terms(request)
+        if not terms or not index_available(queryset.model, queryset.db):
+            return super().filter_queryset(request, queryset, view)
+
+        expression = match_expression(terms)
+        if expression is None:
+            return queryset.none()
+
+        table, weights = SEARCH_INDEXES[queryset.model]
+        pk = f"{queryset.model._meta.db_table}.{queryset.model._meta.pk.column}"
+        # extra() because this has to be a join: the FTS table drives the
+        # query (one index lookup per term) and rows are fetched by pk.
+        # An id__in=(SELECT rowid ...) filter can't order by rank.
+        queryset = queryset.extra(
+            tables=[table],
+            where=[f"{table}.rowid = {pk}", f"{table} MATCH %s"],
+            params=[expression],
+        )
+        pk_name = queryset.model._meta.pk.name
+        if count_matches(table, expression, RANK_LIMIT + 1, queryset.db) > RANK_LIMIT:
+            # Same rows as -id, but sorting on the FTS rowid lets FTS5 walk
+            # its index backwards and stop after one page; ORDER BY the
+            # product id sorts every match first
+            return queryset.extra(select={"search_rowid": f"{table}.rowid"}).order_by("-search_rowid")
+        rank = f"bm25({table}, {', '.join(str(w) for w in weights)})"
+        return queryset.extra(select={"search_rank": rank}).order_by("search_rank", pk_name)
+
+
+def count_matches(table, expression, limit, using="default"):
+    # Stops reading the index after `limit` hits
+    with connections[using].cursor() as cursor:
+        cursor.execute(
+            f"SELECT COUNT(*) FROM (SELECT 1 FROM {table} WHERE {table} MATCH %s LIMIT %s)",
+            [expression, limit],
+        )
+        return cursor.fetchone()[0]
+
+
+# Same triggers as migration 0005. Most AlterField / AddField operations on
+# Product or Brand rebuild the table on SQLite, which fails while these
+# triggers point at it: such a migration has to drop them first and
+# re-create them after (see 0006). As a safety net, missing triggers are
+# re-created (and the index rebuilt) after every migrate, see api/signals.py.
+TRIGGERS = {
+    "api_product_fts_ai": """
+        CREATE TRIGGER IF NOT EXISTS api_product_fts_ai AFTER INSERT ON api_product BEGIN
+            INSERT OR REPLACE INTO api_product_fts (rowid, name, brand)
+            VALUES (new.id, new.name, COALESCE((SELECT name FROM api_brand WHERE id = new.brand_id), ''));
+        END
+    """,
+    "api_product_fts_au": """
+        CREATE TRIGGER IF NOT EXISTS api_product_fts_au AFTER UPDATE OF name, brand_id ON api_product BEGIN
+            DELETE FROM api_product_fts WHERE rowid = old.id;
+            INSERT INTO api_product_fts (rowid, name, brand)
+            VALUES (new.id, new.name, COALESCE((SELECT name FROM api_brand WHERE id = new.brand_id), ''));
+        END
+    """,
+    "api_product_fts_ad": """
+        CREATE TRIGGER IF NOT EXISTS api_product_fts_ad AFTER DELETE ON api_product BEGIN
+            DELETE FROM api_product_fts WHERE rowid = old.id;
+        END
+    """,
+    "api_brand_fts_ai": """
+        CREATE TRIGGER IF NOT EXISTS api_brand_fts_ai AFTER INSERT ON api_brand BEGIN
+            INSERT OR REPLACE INTO api_brand_fts (rowid, name) VALUES (new.id, new.name);
+        END
+    """,
+    "api_brand_fts_au": """
+        CREATE TRIGGER IF NOT EXISTS api_brand_fts_au AFTER UPDATE OF name ON api_brand BEGIN
+            UPDATE api_brand_fts SET name = new.name WHERE rowid = old.id;
+            UPDATE api_product_fts SET brand = new.name
+            WHERE rowid IN (SELECT id FROM api_product WHERE brand_id = new.id);
+        END
+    """,
+    "api_brand_fts_ad": """
+        CREATE TRIGGER IF NOT EXISTS api_brand_fts_ad AFTER DELETE ON api_brand BEGIN
+            DELETE FROM api_brand_fts WHERE rowid = old.id;
+        END
+    """,
+}
+
+
+def ensure_search_triggers(using="default"):
+    """
+    Re-create any missing sync trigger; if one was missing, writes may have
+    slipped past the index, so rebuild it. Returns the re-created names.
+    """
+    connection = connections[using]
+    if not index_available(Product, using):
+        return []
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT name FROM sqlite_master WHERE type = 'trigger'")
+        existing = {row[0] for row in cursor.fetchall()}
+        missing = [name for name in TRIGGERS if name not in existing]
+        for name in missing:
+            cursor.execute(TRIGGERS[name])
+    if missing:
+        rebuild_search_index(using)
+    return missing
+
+
+REBUILD = {
+    Product: [
+        "DELETE FROM api_product_fts",
+        """
+        INSERT INTO api_product_fts (rowid, name, brand)
+        SELECT p.id, p.name, COALESCE(b.name, '')
+        FROM api_product p LEFT JOIN api_brand b ON b.id = p.brand_id
+        """,
+        "INSERT INTO api_product_fts (api_product_fts) VALUES ('optimize')",
+    ],
+    Brand: [
+        "DELETE FROM api_brand_fts",
+        "INSERT INTO api_brand_fts (rowid, name) SELECT id, name FROM api_brand",
+        "INSERT INTO api_brand_fts (api_brand_fts) VALUES ('optimize')",
+    ],
+}
+
+
+def rebuild_search_index(using="default"):
+    """
+    Refill the FTS tables from scratch (after a restore or raw writes with
+    the triggers dropped) and merge their segments. Returns {table: rows}.
+    """
+    rebuilt = {}
+    connection = connections[using]
+    with transaction.atomic(using=using), connection.cursor() as cursor:
+        for model, statements in REBUILD.items():
+            if not index_available(model, using):
+                continue
+            for sql in statements:
+                cursor.execute(sql)
+            table = SEARCH_INDEXES[model][0]
+            cursor.execute(f"SELECT COUNT(*) FROM {table}")
+            rebuilt[table] = cursor.fetchone()[0]
+    return rebuilt
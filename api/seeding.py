@@ -0,0 +1,285 @@
+import multiprocessing
+import random
+import time
+from contextlib import contextmanager
+from datetime import date, datetime, time as dt_time, timedelta, timezone as dt_timezone
+from decimal import Decimal
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.management.color import no_style
+from django.db import connection, transaction
+
+from .caching import bump_data_version
+from .catalog import CATALOG_SCOPE
+from .ledger import record_movements
+from .models import Brand, DailySkuSales, Order, OrderHeader, Product, StockMovement, StockSnapshot
+from .rollups import rebuild_daily_sales
+
+
+# ======================
+# SEED DATA GENERATOR
+# ======================
+# Deterministic, chunked dataset generator behind `manage.py seed`.
+#
+# - every random choice comes from a seeded Random, and each order chunk has
+#   its own Random(seed, chunk_no), so 1 worker or 8 give the same rows
+# - orders are generated chunk by chunk in time order (ids follow created_at
+#   like real traffic) and only one chunk per worker is held in memory
+# - orders go in with raw executemany: bulk_create is several times slower
+#   at this volume. Every generated order is a one-line cart; the headers
+#   are attached afterwards in one set-based pass (attach_headers)
+# - on SQLite the load runs with relaxed pragmas and without the secondary
+#   indexes on Order, which are rebuilt once at the end
+
+BRAND_NAMES = [
+    "Stanley", "DeWalt", "Bosch", "Makita", "Black+Decker",
+    "Duracell", "Philips", "Yale", "WD-40", "3M",
+]
+LINES = ["Pro", "Max", "Ultra", "X", "Lite", "Industrial", "Compact"]
+PRICE_BOOST = {"Pro": 1.2, "Ultra": 1.4, "Industrial": 1.7}
+BUSY_LINES = ("Pro", "Ultra")  # these sell a bit more
+
+DEMO_PASSWORD = "123456"
+
+# Last day of order history when `manage.py seed --seed N` is given without
+# --end-date, so the same seed gives the same rows whenever it runs
+DEFAULT_END_DATE = date(2025, 12, 31)
+
+
+def _chunk_rng(seed, chunk_no):
+    # Independent, reproducible stream per chunk
+    return random.Random(seed * 1_000_003 + chunk_no)
+
+
+def generate_order_chunk(args):
+    """
+    Build one chunk of order rows as plain tuples (no Django involved, so it
+    can run in a worker process). Rows come out sorted by created_at.
+    """
+    (chunk_no, size, seed, user_ids, product_ids, prices, busy,
+     start_ts, chunk_seconds) = args
+    rng = _chunk_rng(seed, chunk_no)
+    n_products = len(product_ids)
+    chunk_start = start_ts + chunk_no * chunk_seconds
+
+    offsets = sorted(rng.random() * chunk_seconds for _ in range(size))
+    rows = []
+    for offset in offsets:
+        i = rng.randrange(n_products)
+        qty = rng.randint(1, 5)
+        if busy[i]:
+            qty += rng.randint(0, 5)
+        if rng.random() < 0.25:
+            qty = 1  # plenty of items barely sell
+        created = datetime.fromtimestamp(chunk_start + offset, dt_timezone.utc).replace(tzinfo=None)
+        rows.append((
+            rng.choice(user_ids),
+            product_ids[i],
+            qty,
+            str(prices[i] * qty),
+            # same text format Django writes for a UTC DateTimeField
+            str(created),
+        ))
+    return rows
+
+
+@contextmanager
+def sqlite_bulk_load(enabled=True):
+    """
+    Relax durability while a big load runs (SQLite only), then restore.
+    A crash mid-load can corrupt the file, which is fine for seed data.
+    """
+    if not enabled or connection.vendor != "sqlite":
+        yield
+        return
+
+    tuned = {
+        "synchronous": "OFF",
+        "journal_mode": "MEMORY",
+        "temp_store": "MEMORY",
+        "cache_size": "-262144",  # 256 MB
+    }
+    with connection.cursor() as cursor:
+        previous = {}
+        for pragma in tuned:
+            cursor.execute(f"PRAGMA {pragma}")
+            previous[pragma] = cursor.fetchone()[0]
+        for pragma, value in tuned.items():
+            cursor.execute(f"PRAGMA {pragma} = {value}")
+    try:
+        yield
+    finally:
+        with connection.cursor() as cursor:
+            for pragma, value in previous.items():
+                cursor.execute(f"PRAGMA {pragma} = {value}")
+
+
+@contextmanager
+def deferred_order_indexes(enabled=True):
+    # Dropping the composite indexes and building them once afterwards is
+    # much faster than maintaining them row by row during a big insert.
+    indexes = list(Order._meta.indexes)
+    if not enabled or not indexes:
+        yield
+        return
+
+    with connection.schema_editor() as editor:
+        for index in indexes:
+            editor.remove_index(Order, index)
+    try:
+        yield
+    finally:
+        with connection.schema_editor() as editor:
+            for index in indexes:
+                editor.add_index(Order, index)
+
+
+def flush():
+    # Raw DELETEs: the ORM would fire the per-order rollup signals one by one
+    with transaction.atomic(), connection.cursor() as cursor:
+        for model in (DailySkuSales, StockSnapshot, StockMovement, Order, OrderHeader):
+            cursor.execute(f'DELETE FROM "{model._meta.db_table}"')
+    Product.objects.all().delete()
+    Brand.objects.all().delete()
+    User.objects.filter(is_superuser=False).delete()
+
+
+def create_users(count, prefix="user"):
+    # Hash once; PBKDF2 per user would dominate the whole seed
+    password = make_password(DEMO_PASSWORD)
+    User.objects.bulk_create(
+        [User(username=f"{prefix}{i}", password=password) for i in range(1, count + 1)],
+        batch_size=1000,
+    )
+    return list(
+        User.objects.filter(username__startswith=prefix).order_by("id").values_list("id", flat=True)
+    )
+
+
+def create_catalog(products, rng):
+    names = BRAND_NAMES + [f"Brand {i}" for i in range(len(BRAND_NAMES), max(len(BRAND_NAMES), products // 150))]
+    brands = Brand.objects.bulk_create([Brand(name=n) for n in names])
+
+    batch = []
+    for _ in range(products):
+        brand = rng.choice(brands)
+        line = rng.choice(LINES)
+        name = f"{brand.name} {line} {rng.randint(100, 9999)}"
+
+        # Give the price a bit of "product personality"
+        price = rng.uniform(5, 600) * PRICE_BOOST.get(line, 1.0)
+
+        # Some items almost sold out, some medium, some warehouse bulk
+        stock = rng.choice([rng.randint(0, 2), rng.randint(5, 40), rng.randint(100, 500)])
+        batch.append(Product(name=name, brand=brand, price=round(Decimal(price), 2), stock=stock))
+
+    Product.objects.bulk_create(batch, batch_size=5000)
+    rows = list(Product.objects.order_by("id").values_list("id", "price", "name", "stock"))
+    # The ledger starts at seed time; the generated orders are history
+    record_movements(
+        StockMovement(product_id=r[0], delta=r[3], reason=StockMovement.INITIAL) for r in rows
+    )
+    product_ids = [r[0] for r in rows]
+    prices = [r[1] for r in rows]
+    busy = [any(line in r[2] for line in BUSY_LINES) for r in rows]
+    return product_ids, prices, busy
+
+
+def _insert_orders(rows):
+    table = Order._meta.db_table
+    sql = (
+        f'INSERT INTO "{table}" (user_id, product_id, quantity, total_price, created_at) '
+        "VALUES (%s, %s, %s, %s, %s)"
+    )
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.executemany(sql, rows)
+
+
+def attach_headers():
+    """
+    Give every order line without a header its own one-line header, in
+    three statements whatever the row count. Header ids follow the line ids
+    (shifted past any existing header) so history stays in time order.
+    """
+    lines = Order._meta.db_table
+    headers = OrderHeader._meta.db_table
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(f'SELECT MAX(id) FROM "{headers}"')
+        offset = cursor.fetchone()[0] or 0
+        cursor.execute(
+            f'UPDATE "{lines}" SET header_id = id + %s WHERE header_id IS NULL', [offset]
+        )
+        cursor.execute(
+            f'INSERT INTO "{headers}" (id, user_id, created_at, line_count, total_price) '
+            f'SELECT header_id, user_id, created_at, 1, total_price FROM "{lines}" '
+            f'WHERE header_id > %s',
+            [offset],
+        )
+        for sql in connection.ops.sequence_reset_sql(no_style(), [OrderHeader]):
+            cursor.execute(sql)
+
+
+def seed_database(
+    products=1500, orders=20000, users=5, days=365, seed=42, end_date=None,
+    chunk_size=50000, workers=0, tune=True, user_prefix="user", log=print,
+):
+    """
+    Fill the database with a reproducible dataset. Expects empty tables
+    (call flush() first). Order history covers the `days` up to the end of
+    `end_date` (UTC), or up to now without one. Returns a dict of timings.
+    """
+    rng = random.Random(seed)
+    timings = {}
+    t0 = time.perf_counter()
+
+    with transaction.atomic():
+        user_ids = create_users(users, user_prefix)
+        product_ids, prices, busy = create_catalog(products, rng)
+    timings["catalog_s"] = time.perf_counter() - t0
+    log(f"Created {len(user_ids)} users and {len(product_ids)} products")
+
+    n_chunks = max(1, -(-orders // chunk_size))
+    if end_date is None:
+        end_ts = time.time()
+    else:
+        end_ts = datetime.combine(end_date + timedelta(days=1), dt_time.min, dt_timezone.utc).timestamp()
+    start_ts = end_ts - days * 86400
+    chunk_seconds = (end_ts - start_ts) / n_chunks
+    jobs = (
+        (i, min(chunk_size, orders - i * chunk_size), seed, user_ids, product_ids,
+         prices, busy, start_ts, chunk_seconds)
+        for i in range(n_chunks)
+    )
+
+    t1 = time.perf_counter()
+    inserted = 0
+    with sqlite_bulk_load(tune), deferred_order_indexes(tune):
+        if workers and workers > 1 and "fork" in multiprocessing.get_all_start_methods():
+            # Workers only generate; the parent is the single writer.
+            # imap keeps chunk order and at most a few chunks in flight.
+            with multiprocessing.get_context("fork").Pool(workers) as pool:
+                for rows in pool.imap(generate_order_chunk, jobs):
+                    _insert_orders(rows)
+                    inserted += len(rows)
+                    log(f"  {inserted:,} / {orders:,} orders")
+        else:
+            for job in jobs:
+                rows = generate_order_chunk(job)
+                _insert_orders(rows)
+                inserted += len(rows)
+                log(f"  {inserted:,} / {orders:,} orders")
+    timings["orders_s"] = time.perf_counter() - t1
+
+    # bulk inserts skip signals: refresh everything derived from orders
+    t2 = time.perf_counter()
+    attach_headers()
+    rebuild_daily_sales()
+    bump_data_version()
+    bump_data_version(CATALOG_SCOPE)
+    if connection.vendor == "sqlite":
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE")
+    timings["derived_s"] = time.perf_counter() - t2
+    timings["total_s"] = time.perf_counter() - t0
+    return timings
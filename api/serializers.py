@@ -1,3 +1,5 @@
+from functools import lru_cache
+
 from rest_framework import serializers
 from .models import Product, Brand, Order
 from django.contrib.auth.models import User
@@ -36,6 +38,8 @@ class OrderSerializer(serializers.ModelSerializer):
     class Meta:
         model = Order
         fields = '__all__'
+        # a line posted on its own gets a one-line header (api/signals.py)
+        read_only_fields = ['header']
 
 
 # ------------------------------------------------------
@@ -45,4 +49,61 @@ class OrderSerializer(serializers.ModelSerializer):
 class UserSerializer(serializers.ModelSerializer):
     class Meta:
         model = User
-        fields = ['id', 'username', 'email']
\ No newline at end of file
+        fields = ['id', 'username', 'email']
+
+
+# ------------------------------------------------------
+# Values fast path for read-only list/retrieve
+# - reads the serializer's fields straight from .values()
+#   rows: one query per page, no model instances and no
+#   per-field get_attribute walk
+# - decimals, datetimes etc. still go through the field's
+#   own to_representation, so the output is identical
+# ------------------------------------------------------
+# DB values of these already are what the field would return
+PASS_THROUGH = (serializers.IntegerField, serializers.CharField, serializers.BooleanField)
+
+
+@lru_cache(maxsize=None)
+def values_plan(serializer_class):
+    """
+    -> [(field name, values() lookup, converter or None)], or None when a
+    field can't be read from a flat row (nested serializers, method
+    fields, many-related...), in which case callers use the serializer.
+    """
+    plan = []
+    for name, field in serializer_class().fields.items():
+        if field.write_only:
+            continue
+        if field.source == "*" or isinstance(
+            field, (serializers.BaseSerializer, serializers.SerializerMethodField, serializers.ManyRelatedField)
+        ):
+            return None
+        lookup = "__".join(field.source_attrs)
+        if isinstance(field, serializers.PrimaryKeyRelatedField):
+            # values("brand") is the brand_id
+            convert = field.pk_field.to_representation if field.pk_field else None
+        elif isinstance(field, serializers.RelatedField):
+            return None
+        elif type(field) in PASS_THROUGH:
+            convert = None
+        else:
+            convert = field.to_representation
+        plan.append((name, lookup, convert))
+    return plan
+
+
+def values_lookups(plan):
+    return [lookup for _, lookup, _ in plan]
+
+
+def render_values(rows, plan):
+    data = []
+    for row in rows:
+        item = {}
+        for name, lookup, convert in plan:
+            value = row[lookup]
+            # None stays None, like Serializer.to_representation
+            item[name] = value if convert is None or value is None else convert(value)
+        data.append(item)
+    return data
@@ -0,0 +1,172 @@
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.db.models.signals import post_delete, post_migrate, post_save, pre_save
+from django.dispatch import receiver
+
+from .authentication import user_cache
+
+from .caching import bump_data_version
+from .catalog import CATALOG_SCOPE
+from .events import Level, publish_orders, publish_stock
+from .ledger import record_movements
+from .models import Brand, Order, OrderHeader, Product, StockMovement
+from .rollups import SaleLine, record_orders
+from .search import ensure_search_triggers
+
+
+# ======================
+# MODEL SIGNALS
+# ======================
+# Wired up in ApiConfig.ready(). Only single-object saves/deletes land here;
+# bulk write paths call the helpers they need directly.
+
+
+# --- Order headers ---
+
+@receiver(pre_save, sender=Order)
+def attach_order_header(sender, instance, raw=False, **kwargs):
+    # A line saved on its own (admin, the orders API, scripts) is a
+    # one-line order; checkout creates its header itself (api/ordering.py)
+    if raw or instance.header_id is not None or not instance._state.adding:
+        return
+    instance.header = OrderHeader.objects.create(
+        user_id=instance.user_id,
+        created_at=instance.created_at,
+        line_count=1,
+        total_price=instance.total_price,
+    )
+    instance._new_header = True
+
+
+@receiver(post_save, sender=Order)
+def update_header_total(sender, instance, created, raw=False, **kwargs):
+    before = getattr(instance, "_rollup_before", None)
+    if created or raw or before is None or instance.header_id is None:
+        return
+    if instance.total_price != before[3]:
+        OrderHeader.objects.filter(pk=instance.header_id).update(
+            total_price=F("total_price") + (instance.total_price - before[3])
+        )
+
+
+@receiver(post_delete, sender=Order)
+def shrink_order_header(sender, instance, **kwargs):
+    # Also runs for every line when the header itself is deleted (cascade),
+    # before the header row goes: harmless
+    if instance.header_id is None:
+        return
+    headers = OrderHeader.objects.filter(pk=instance.header_id)
+    headers.update(
+        line_count=F("line_count") - 1,
+        total_price=F("total_price") - instance.total_price,
+    )
+    # An order without lines is no order: it would still be counted by the
+    # summary, daily orders and the customer's history
+    headers.filter(line_count__lte=0).delete()
+
+
+# --- Daily sales rollup ---
+
+@receiver(pre_save, sender=Order)
+def remember_order_before_update(sender, instance, **kwargs):
+    # Updates are rare, but if quantity/price/product/date change we need the
+    # old values to take them back out of the rollup.
+    instance._rollup_before = None
+    if instance.pk and not instance._state.adding:
+        instance._rollup_before = (
+            Order.objects.filter(pk=instance.pk)
+            .values_list("product_id", "created_at", "quantity", "total_price")
+            .first()
+        )
+
+
+@receiver(post_save, sender=Order)
+def rollup_order_saved(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        # loaddata: fixtures are followed by a rebuild_sales_rollup run
+        return
+    before = getattr(instance, "_rollup_before", None)
+    if before is not None:
+        record_orders([SaleLine(*before)], sign=-1)
+    record_orders([instance])
+
+
+@receiver(post_delete, sender=Order)
+def rollup_order_deleted(sender, instance, **kwargs):
+    record_orders([instance], sign=-1)
+
+
+# --- Stock ledger ---
+
+@receiver(post_save, sender=Product)
+def log_product_stock(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    if created:
+        before, delta, reason = None, instance.stock, StockMovement.INITIAL
+    else:
+        # _loaded_stock is set by Product.from_db; an instance built by hand
+        # has no baseline, so there is nothing reliable to log
+        before = getattr(instance, "_loaded_stock", None)
+        if before is None:
+            return
+        delta, reason = instance.stock - before, StockMovement.EDIT
+    record_movements([StockMovement(product=instance, delta=delta, reason=reason)])
+
+    after = Level(instance.stock, instance.reorder_point)
+    if before is not None:
+        before = Level(before, getattr(instance, "_loaded_reorder_point", None) or after.reorder_point)
+    publish_stock({instance.pk: (before, after)})
+    instance._loaded_stock = instance.stock
+    instance._loaded_reorder_point = instance.reorder_point
+
+
+# --- Live change feed ---
+
+@receiver(post_save, sender=Order)
+def publish_order_saved(sender, instance, created, raw=False, **kwargs):
+    # Only a line that made its own order is a new order; a line added to
+    # an existing one is not (the dashboard counts orders)
+    if created and not raw and getattr(instance, "_new_header", False):
+        publish_orders(instance.header, [instance])
+
+
+# --- Analytics response cache ---
+
+@receiver(post_save, sender=Order)
+@receiver(post_delete, sender=Order)
+@receiver(post_save, sender=Product)
+@receiver(post_delete, sender=Product)
+@receiver(post_save, sender=Brand)
+@receiver(post_delete, sender=Brand)
+def invalidate_analytics(sender, **kwargs):
+    bump_data_version()
+
+
+# --- Precomputed customer catalog ---
+
+@receiver(post_save, sender=Product)
+@receiver(post_delete, sender=Product)
+@receiver(post_save, sender=Brand)
+@receiver(post_delete, sender=Brand)
+def invalidate_catalog(sender, **kwargs):
+    bump_data_version(CATALOG_SCOPE)
+
+
+# --- Search index ---
+
+@receiver(post_migrate)
+def restore_search_triggers(sender, using="default", **kwargs):
+    if sender.name == "api":
+        ensure_search_triggers(using)
+
+
+# --- Cached JWT users ---
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+@receiver(post_delete, sender=settings.AUTH_USER_MODEL)
+def invalidate_cached_user(sender, instance, **kwargs):
+    user_cache.invalidate(instance.pk)
+    # a request in between could cache the old row again before commit
+    transaction.on_commit(lambda: user_cache.invalidate(instance.pk))
@@ -0,0 +1,178 @@
+import math
+
+from django.db import models, transaction
+from django.db.models import Case, F, Value, When
+from django.db.models.functions import Greatest
+
+from .aggregates import recommended_restock, sku_windows
+from .caching import bump_data_version
+from .catalog import CATALOG_SCOPE
+from .events import Level, publish_resync, publish_stock
+from .ledger import record_movements
+from .models import Product, StockMovement
+
+
+# ======================
+# STOCK ADJUSTMENTS
+# ======================
+# Every stock change is a set-based UPDATE computed by the database:
+#
+#   UPDATE product SET stock = MAX(CASE id WHEN 1 THEN stock + 5
+#                                          WHEN 2 THEN stock - 3 ... END, 0)
+#   WHERE id IN (1, 2, ...)
+#
+# so concurrent adjustments / checkouts never overwrite each other (no
+# read-modify-write in Python) and stock can't go below zero. Each call also
+# appends the applied deltas to the stock ledger (api/ledger.py).
+
+# Products per UPDATE (each binds 3 params, SQLite allows 999)
+ADJUST_CHUNK = 300
+
+# Upper bound for one bulk request
+MAX_ADJUSTMENTS = 10000
+
+
+def parse_adjustments(items):
+    """
+    [{product_id, delta}, ...] -> {product_id: summed delta}.
+    Raises ValueError naming the first bad entry; the bulk endpoint is
+    all-or-nothing, so nothing is skipped silently.
+    """
+    if not isinstance(items, list) or not items:
+        raise ValueError("adjustments must be a non-empty list")
+    if len(items) > MAX_ADJUSTMENTS:
+        raise ValueError(f"At most {MAX_ADJUSTMENTS} adjustments per request")
+
+    deltas = {}
+    for i, item in enumerate(items):
+        try:
+            pid = int(item["product_id"])
+            delta = int(item["delta"])
+        except (KeyError, TypeError, ValueError):
+            raise ValueError(f"adjustments[{i}] needs integer product_id and delta")
+        deltas[pid] = deltas.get(pid, 0) + delta
+    return deltas
+
+
+@transaction.atomic
+def apply_stock_deltas(deltas, reason=StockMovement.ADJUST):
+    """
+    Add each delta to the product's stock (clamped at 0) in one transaction
+    and log what was actually applied to the stock ledger.
+    Returns ({product_id: new stock}, [unknown product ids]).
+    """
+    deltas = {pid: d for pid, d in deltas.items() if d}
+    items = list(deltas.items())
+
+    # Lock the rows first: the ledger needs the delta after clamping, and
+    # nobody can move these rows between this read and the UPDATE (on
+    # SQLite select_for_update is a no-op; the IMMEDIATE transaction mode
+    # in settings holds the write lock from BEGIN instead)
+    before = {}
+    for i in range(0, len(items), ADJUST_CHUNK):
+        ids = [pid for pid, _ in items[i:i + ADJUST_CHUNK]]
+        rows = Product.objects.select_for_update().filter(id__in=ids)
+        before.update(
+            (pid, Level(stock, point))
+            for pid, stock, point in rows.values_list("id", "stock", "reorder_point")
+        )
+
+    for i in range(0, len(items), ADJUST_CHUNK):
+        chunk = items[i:i + ADJUST_CHUNK]
+        Product.objects.filter(id__in=[pid for pid, _ in chunk]).update(
+            stock=Greatest(
+                Case(
+                    *[When(id=pid, then=F("stock") + delta) for pid, delta in chunk],
+                    output_field=models.IntegerField(),
+                ),
+                Value(0),
+            )
+        )
+
+    stock = {pid: max(0, old.stock + deltas[pid]) for pid, old in before.items()}
+    missing = sorted(pid for pid in deltas if pid not in stock)
+
+    record_movements(
+        StockMovement(product_id=pid, delta=stock[pid] - old.stock, reason=reason)
+        for pid, old in before.items()
+    )
+    if stock:
+        # update() skips the model signals, so invalidate here
+        bump_data_version()
+        bump_data_version(CATALOG_SCOPE)
+        publish_stock({pid: (old, old._replace(stock=stock[pid])) for pid, old in before.items()})
+    return stock, missing
+
+
+def restock_plan(window_days, horizon_days, request=None):
+    # {product_id: units} for every SKU the inventory insights would restock
+    plan = {}
+    for w in sku_windows(window_days, request):
+        units = recommended_restock(w, window_days, horizon_days)
+        if units > 0:
+            plan[w.product_id] = units
+    return plan
+
+
+def apply_auto_restock(window_days, horizon_days, dry_run=False, request=None):
+    """
+    Apply the insights' recommended_restock to every at-risk SKU.
+    Returns [{product_id, added, stock}] (stock is None on a dry run).
+    """
+    plan = restock_plan(window_days, horizon_days, request)
+    stock = {} if dry_run else apply_stock_deltas(plan, StockMovement.RESTOCK)[0]
+    return [
+        {"product_id": pid, "added": units, "stock": stock.get(pid)}
+        for pid, units in sorted(plan.items())
+    ]
+
+
+# ======================
+# REORDER POINTS
+# ======================
+# A SKU is low once stock <= its reorder point. Derived from sales, the
+# point is what the SKU sells over the supplier lead time plus a safety
+# margin, at the window's daily rate:
+#
+#   reorder_point = ceil(total_qty / window_days * (lead_days + safety_days))
+#
+# so a fast mover is flagged days before it runs out and a slow SKU isn't
+# flagged at 4 units. SKUs without sales in the window keep their point.
+
+DEFAULT_LEAD_DAYS = 7
+DEFAULT_SAFETY_DAYS = 3
+
+# Products per UPDATE (the CASE appears twice: 5 params each)
+REORDER_CHUNK = 150
+
+
+def reorder_points_from_sales(window_days, lead_days, safety_days, request=None):
+    cover_days = lead_days + safety_days
+    return {
+        w.product_id: math.ceil(w.total_qty / window_days * cover_days)
+        for w in sku_windows(window_days, request)
+    }
+
+
+@transaction.atomic
+def set_reorder_points(points):
+    """
+    {product_id: reorder point} -> chunked CASE updates, only rows whose
+    point actually changes. Returns the number of products updated.
+    """
+    items = list(points.items())
+    updated = 0
+    for i in range(0, len(items), REORDER_CHUNK):
+        chunk = items[i:i + REORDER_CHUNK]
+        whens = [When(id=pid, then=Value(point)) for pid, point in chunk]
+        updated += (
+            Product.objects.filter(id__in=[pid for pid, _ in chunk])
+            .exclude(reorder_point=Case(*whens, output_field=models.IntegerField()))
+            .update(reorder_point=Case(*whens, output_field=models.IntegerField()))
+        )
+    if updated:
+        bump_data_version()
+        bump_data_version(CATALOG_SCOPE)
+        # any number of SKUs may have crossed: let dashboards reload once
+        publish_resync()
+    return updated
@@ -0,0 +1,235 @@
+from datetime import datetime, time, timedelta
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from django.conf import settings
+from django.db.models import Count, Sum
+from django.db.models.functions import Trunc
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from .exports import _int_list
+from .models import DailySkuSales, Order, OrderHeader
+
+
+# ======================
+# TIME-SERIES ANALYTICS
+# ======================
+# One endpoint for every chart series:
+#   ?metric=orders|units|revenue  ?granularity=hour|day|week|month
+#   ?start=&end= (dates or ISO datetimes, in ?tz=, default the project's)
+#   ?product=&brand= (ids, comma separated)
+#
+# Only the requested range is read, and the series is dense: every bucket
+# between start and end is there, empty ones as 0. Edge buckets are
+# widened to whole buckets (a week starts on Monday, a month on the 1st).
+#
+# Where the data comes from:
+#   - units / revenue by day, week or month in the rollup's timezone: the
+#     DailySkuSales rollup, a range on its day index, folded into buckets
+#   - other timezones and hourly buckets: order lines, a range on the
+#     (created_at, product, quantity, total_price) covering index
+#   - orders: order headers (carts), a range on their created_at index; with
+#     a product/brand filter, the distinct orders among the matching lines
+
+METRICS = ("orders", "units", "revenue")
+GRANULARITIES = ("hour", "day", "week", "month")
+
+# Range used when ?start is missing, counted back from ?end
+DEFAULT_SPAN = {
+    "hour": timedelta(hours=48),
+    "day": timedelta(days=30),
+    "week": timedelta(weeks=26),
+    "month": timedelta(days=365),
+}
+
+# Guards against ?granularity=hour over ten years
+MAX_BUCKETS = 5000
+
+
+def _zone(name):
+    try:
+        return ZoneInfo(name)
+    except (ZoneInfoNotFoundError, ValueError):
+        raise ValueError(f"Unknown timezone: {name}")
+
+
+def _parse_local(value, zone, end=False):
+    # -> naive wall time in `zone`; a date as `end` covers that whole day
+    # (dates first: parse_datetime reads "2025-01-31" as its midnight)
+    try:
+        d = parse_date(value)
+    except ValueError:
+        d = None
+    if d is not None:
+        return datetime.combine(d + timedelta(days=1) if end else d, time.min)
+    try:
+        dt = parse_datetime(value)
+    except ValueError:
+        dt = None
+    if dt is None:
+        raise ValueError(f"Invalid date: {value}")
+    if timezone.is_aware(dt):
+        dt = dt.astimezone(zone).replace(tzinfo=None)
+    return dt
+
+
+def bucket_floor(wall, granularity):
+    if granularity == "hour":
+        return wall.replace(minute=0, second=0, microsecond=0)
+    day = datetime.combine(wall.date(), time.min)
+    if granularity == "week":
+        return day - timedelta(days=day.weekday())
+    if granularity == "month":
+        return day.replace(day=1)
+    return day
+
+
+def next_bucket(wall, granularity):
+    if granularity == "hour":
+        return wall + timedelta(hours=1)
+    if granularity == "day":
+        return wall + timedelta(days=1)
+    if granularity == "week":
+        return wall + timedelta(weeks=1)
+    if wall.month == 12:
+        return wall.replace(year=wall.year + 1, month=1)
+    return wall.replace(month=wall.month + 1)
+
+
+def buckets(start, end, granularity):
+    """
+    Bucket starts (naive wall times) covering [start, end), plus the end of
+    the last bucket.
+    """
+    out = []
+    at = bucket_floor(start, granularity)
+    while at < end:
+        out.append(at)
+        if len(out) > MAX_BUCKETS:
+            raise ValueError(f"More than {MAX_BUCKETS} buckets; narrow the range or coarsen the granularity")
+        at = next_bucket(at, granularity)
+    return out, at
+
+
+def parse_params(params):
+    """
+    Query-param dict -> validated options. Raises ValueError on bad input.
+    """
+    metric = params.get("metric", "revenue")
+    if metric not in METRICS:
+        raise ValueError(f"metric must be one of {', '.join(METRICS)}")
+    granularity = params.get("granularity", "day")
+    if granularity not in GRANULARITIES:
+        raise ValueError(f"granularity must be one of {', '.join(GRANULARITIES)}")
+    tz_name = params.get("tz") or settings.TIME_ZONE
+    zone = _zone(tz_name)
+
+    if params.get("end"):
+        end = _parse_local(params["end"], zone, end=True)
+    else:
+        end = timezone.now().astimezone(zone).replace(tzinfo=None)
+        end = next_bucket(bucket_floor(end, granularity), granularity)
+    if params.get("start"):
+        start = _parse_local(params["start"], zone)
+    else:
+        start = end - DEFAULT_SPAN[granularity]
+    if start >= end:
+        raise ValueError("start must be before end")
+
+    return {
+        "metric": metric,
+        "granularity": granularity,
+        "tz": tz_name,
+        "zone": zone,
+        "start": start,
+        "end": end,
+        "product_ids": _int_list(params["product"]) if params.get("product") else None,
+        "brand_ids": _int_list(params["brand"]) if params.get("brand") else None,
+    }
+
+
+def _filtered(qs, opts):
+    if opts["product_ids"]:
+        qs = qs.filter(product_id__in=opts["product_ids"])
+    if opts["brand_ids"]:
+        qs = qs.filter(product__brand_id__in=opts["brand_ids"])
+    return qs
+
+
+def _uses_rollup(opts):
+    # Rollup days are calendar days in settings.TIME_ZONE (api/rollups.py)
+    return (
+        opts["metric"] != "orders"
+        and opts["granularity"] != "hour"
+        and opts["zone"] == _zone(settings.TIME_ZONE)
+    )
+
+
+def _from_rollup(opts, first, last_end):
+    column = "qty" if opts["metric"] == "units" else "revenue"
+    rows = (
+        _filtered(DailySkuSales.objects, opts)
+        .filter(day__gte=first.date(), day__lt=last_end.date())
+        .values("day")
+        .annotate(value=Sum(column))
+        .order_by()
+    )
+    for row in rows:
+        yield bucket_floor(datetime.combine(row["day"], time.min), opts["granularity"]), row["value"]
+
+
+def _from_orders(opts, first, last_end):
+    zone = opts["zone"]
+    bounds = {
+        "created_at__gte": first.replace(tzinfo=zone),
+        "created_at__lt": last_end.replace(tzinfo=zone),
+    }
+    if opts["metric"] == "orders" and not (opts["product_ids"] or opts["brand_ids"]):
+        qs, value = OrderHeader.objects.filter(**bounds), Count("id")
+    else:
+        qs = _filtered(Order.objects.filter(**bounds), opts)
+        value = {
+            "orders": Count("header", distinct=True),
+            "units": Sum("quantity"),
+            "revenue": Sum("total_price"),
+        }[opts["metric"]]
+
+    rows = (
+        qs.annotate(bucket=Trunc("created_at", opts["granularity"], tzinfo=zone))
+        .values("bucket")
+        .annotate(value=value)
+        .order_by()
+    )
+    for row in rows:
+        yield timezone.localtime(row["bucket"], zone).replace(tzinfo=None), row["value"]
+
+
+def build_series(opts):
+    starts, last_end = buckets(opts["start"], opts["end"], opts["granularity"])
+    source = _from_rollup if _uses_rollup(opts) else _from_orders
+
+    totals = dict.fromkeys(starts, 0)
+    for at, value in source(opts, starts[0], last_end):
+        # an ambiguous DST hour lands on one wall-clock bucket
+        if at in totals:
+            totals[at] += value or 0
+
+    if opts["metric"] == "revenue":
+        # SQLite sums decimals as floats
+        as_number = lambda v: round(float(v), 2)  # noqa: E731
+    else:
+        as_number = int
+    zone = opts["zone"]
+    return {
+        "metric": opts["metric"],
+        "granularity": opts["granularity"],
+        "tz": opts["tz"],
+        "start": starts[0].replace(tzinfo=zone),
+        "end": last_end.replace(tzinfo=zone),
+        "source": "rollup" if source is _from_rollup else "orders",
+        "total": as_number(sum(totals.values())),
+        "series": [
+            {"bucket": at.replace(tzinfo=zone), "value": as_number(value)}
+            for at, value in totals.items()
+        ],
+    }
@@ -2,6 +2,7 @@ from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 from rest_framework_simplejwt.views import TokenRefreshView
 
+from . import async_views
 from .views import demand_forecast
 from .views import (
     ProductViewSet,
@@ -15,6 +16,7 @@ from .views import (
     top_products,
     monthly_revenue,
     daily_orders,
+    timeseries,
     brand_revenue,
     low_stock,
     inventory_insights,
@@ -23,8 +25,18 @@ from .views import (
     customer_catalog,
     customer_orders,
 
-    # short executive-style AI summary
-    ai_decision_summary,
+    # bulk data exports
+    export_orders,
+    export_products,
+
+    # background jobs
+    job_detail,
+
+    # live feed
+    event_ticket,
+
+    # request metrics (Prometheus)
+    metrics,
 )
 
 # DRF router keeps all the CRUD endpoints clean and consistent
@@ -37,7 +49,8 @@ router.register(r"orders", OrderViewSet)
 urlpatterns = [
 
     # --- Management / executive tools ---
-    path("ai-summary/", ai_decision_summary, name="ai_decision_summary"),
+    # async: its independent queries run concurrently (api/async_views.py)
+    path("ai-summary/", async_views.ai_decision_summary, name="ai_decision_summary"),
 
     # --- Standard CRUD routes (auto-generated via router) ---
     path("", include(router.urls)),
@@ -54,6 +67,7 @@ urlpatterns = [
     path("analytics/top-products/", top_products, name="top_products"),
     path("analytics/monthly-revenue/", monthly_revenue, name="monthly_revenue"),
     path("analytics/daily-orders/", daily_orders, name="daily_orders"),
+    path("analytics/timeseries/", timeseries, name="timeseries"),
     path("analytics/brand-revenue/", brand_revenue, name="brand_revenue"),
     path("analytics/low-stock/", low_stock, name="low_stock"),
 
@@ -66,4 +80,18 @@ urlpatterns = [
 
     # --- Simple demand forecasting endpoint ---
     path("analytics/demand-forecast/", demand_forecast, name="demand_forecast"),
+
+    # --- Background recomputes (?fresh=1 on forecast / insights) ---
+    path("jobs/<int:pk>/", job_detail, name="job_detail"),
+
+    # --- Live dashboard deltas (server-sent events, ASGI) ---
+    path("events/", async_views.event_stream, name="event_stream"),
+    path("events/ticket/", event_ticket, name="event_ticket"),
+
+    # --- Streaming exports (CSV / NDJSON, ?gzip=1) ---
+    path("exports/orders/", export_orders, name="export_orders"),
+    path("exports/products/", export_products, name="export_products"),
+
+    # --- Per-route request timings, Prometheus text format ---
+    path("metrics/", metrics, name="metrics"),
 ]
\ No newline at end of file
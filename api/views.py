@@ -2,20 +2,82 @@
 # IMPORTS (trying to keep things tidy)
 # ======================
 
-from datetime import timedelta
+import hashlib
+import hmac
+
 from django.utils.timezone import now
 from django.contrib.auth.models import User
-from django.db.models import Count, Sum, F
+from django.db.models import Count, Sum, F, Prefetch
 from django.db.models.functions import TruncMonth, TruncDay
 
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import viewsets, permissions, status, filters
-from rest_framework.decorators import api_view, permission_classes, action
+from rest_framework.generics import get_object_or_404 as get_row_or_404
+from django.conf import settings
+from django.http import HttpResponse, StreamingHttpResponse
+from django.shortcuts import get_object_or_404
+from django.urls import reverse
+from django.views.decorators.http import require_GET
+from rest_framework.decorators import api_view, permission_classes, action, renderer_classes
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 
-from .models import Product, Brand, Order
-from .serializers import ProductSerializer, BrandSerializer, OrderSerializer
+from .async_views import TICKET_MAX_AGE, make_event_ticket
+from .caching import cached_response, etag_matches
+from .catalog import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, catalog_page, discount_for, get_catalog
+from .exports import (
+    CSVRenderer,
+    NDJSONRenderer,
+    ORDER_COLUMNS,
+    PRODUCT_COLUMNS,
+    filter_orders,
+    filter_products,
+    stream_export,
+)
+from .jobs import fresh_snapshot_job, get_snapshot, snapshot_payload
+from .ledger import parse_at, stock_at as ledger_stock_at
+from .metrics import registry as metrics_registry
+from .models import Product, Brand, Order, OrderHeader, ForecastRun, Job
+from .ordering import InsufficientStock, parse_cart_lines, place_order
+from .pagination import LowStockPagination, OrderHistoryPagination, PageOrKeysetPagination
+from .routers import replica_reads
+from .search import FullTextSearchFilter
+from .serializers import (
+    ProductSerializer, BrandSerializer, OrderSerializer, render_values, values_lookups, values_plan,
+)
+from .stock import apply_auto_restock, apply_stock_deltas, parse_adjustments
+from .timeseries import build_series, parse_params as parse_series_params
+
+
+# ======================
+# VALUES READ PATH (list / retrieve without model instances)
+# ======================
+class ValuesReadMixin:
+    # GET list/detail render .values() rows through values_plan (see
+    # api/serializers.py): one query per page whatever the serializer
+    # pulls from related tables. Writes and custom actions keep using
+    # the serializer and get_object().
+    def list(self, request, *args, **kwargs):
+        plan = values_plan(self.get_serializer_class())
+        if plan is None:
+            return super().list(request, *args, **kwargs)
+
+        queryset = self.filter_queryset(self.get_queryset()).values(*values_lookups(plan))
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(render_values(page, plan))
+        return Response(render_values(queryset, plan))
+
+    def retrieve(self, request, *args, **kwargs):
+        plan = values_plan(self.get_serializer_class())
+        if plan is None:
+            return super().retrieve(request, *args, **kwargs)
+
+        queryset = self.filter_queryset(self.get_queryset()).values(*values_lookups(plan))
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        row = get_row_or_404(queryset, **{self.lookup_field: self.kwargs[lookup_url_kwarg]})
+        self.check_object_permissions(request, row)
+        return Response(render_values([row], plan)[0])
 
 
 # ======================
@@ -28,23 +90,27 @@ class BrandViewSet(viewsets.ModelViewSet):
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
 
     # Simple search/filter support (helps frontend UX)
-    filter_backends = [filters.SearchFilter, DjangoFilterBackend]
-    search_fields = ["name"]
+    filter_backends = [FullTextSearchFilter, DjangoFilterBackend]
+    search_fields = ["name"]  # LIKE fallback when there is no FTS index
 
 
 # ======================
 # PRODUCT VIEWSET
 # ======================
-class ProductViewSet(viewsets.ModelViewSet):
-    # Showing newest products first
-    queryset = Product.objects.all().order_by("-id")
+class ProductViewSet(ValuesReadMixin, viewsets.ModelViewSet):
+    # Showing newest products first (brand joined for brand_name when a
+    # write response goes through the serializer)
+    queryset = Product.objects.select_related("brand").order_by("-id")
     serializer_class = ProductSerializer
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
+    # ?page=N as before, or ?pagination=keyset / ?cursor=... for deep paging
+    pagination_class = PageOrKeysetPagination
 
     # Allow frontend to search, sort, and filter the catalog
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    # ?search= goes through the FTS5 index (prefix + ranked), see api/search.py
+    filter_backends = [DjangoFilterBackend, FullTextSearchFilter, filters.OrderingFilter]
     filterset_fields = ["brand"]
-    search_fields = ["name", "brand__name"]
+    search_fields = ["name", "brand__name"]  # LIKE fallback when there is no FTS index
     ordering_fields = ["name", "price", "stock"]
 
     @action(detail=True, methods=["post"], permission_classes=[permissions.IsAuthenticated])
@@ -58,20 +124,70 @@ class ProductViewSet(viewsets.ModelViewSet):
         except (TypeError, ValueError):
             return Response({"error": "Amount must be integer"}, status=400)
 
-        # Never let stock drop below zero
-        product.stock = max(0, product.stock + amount)
-        product.save()
-        return Response({"stock": product.stock})
+        # Applied as UPDATE ... SET stock = MAX(stock + amount, 0), so two
+        # admins clicking at once can't overwrite each other
+        stock, _ = apply_stock_deltas({product.pk: amount})
+        return Response({"stock": stock.get(product.pk, product.stock)})
+
+    @action(detail=False, methods=["post"], permission_classes=[permissions.IsAuthenticated])
+    def bulk_adjust_stock(self, request):
+        # {"adjustments": [{"product_id": 1, "delta": 5}, ...]} -> one transaction
+        try:
+            deltas = parse_adjustments(request.data.get("adjustments"))
+        except ValueError as exc:
+            return Response({"error": str(exc)}, status=400)
+
+        stock, missing = apply_stock_deltas(deltas)
+        return Response({
+            "updated": len(stock),
+            "missing": missing,
+            "stock": [{"product_id": pid, "stock": s} for pid, s in sorted(stock.items())],
+        })
+
+    @action(detail=False, methods=["post"], permission_classes=[permissions.IsAuthenticated])
+    def auto_restock(self, request):
+        # Restock every at-risk SKU by its inventory-insights recommendation
+        def _int(name, default):
+            try:
+                return max(1, int(request.data.get(name, default)))
+            except (TypeError, ValueError):
+                return default
+
+        window_days = _int("window", 30)
+        horizon_days = _int("horizon", 30)
+        dry_run = str(request.data.get("dry_run", "")).lower() in ("1", "true", "yes")
+
+        items = apply_auto_restock(window_days, horizon_days, dry_run=dry_run, request=request)
+        return Response({
+            "window_days": window_days,
+            "horizon_days": horizon_days,
+            "dry_run": dry_run,
+            "restocked": len(items),
+            "units": sum(i["added"] for i in items),
+            "items": items,
+        })
+
+    @action(detail=True, methods=["get"])
+    def stock_at(self, request, pk=None):
+        # ?at=2025-01-31 (end of day) or an ISO datetime, from the stock ledger
+        product = self.get_object()
+        at = parse_at(request.query_params.get("at", ""))
+        if at is None:
+            return Response({"error": "at must be a date or ISO datetime"}, status=400)
+        if at >= now():
+            return Response({"product_id": product.pk, "at": now(), "stock": product.stock})
+        return Response({"product_id": product.pk, "at": at, "stock": ledger_stock_at(product.pk, at)})
 
 
 # ======================
 # ORDER VIEWSET
 # ======================
-class OrderViewSet(viewsets.ModelViewSet):
+class OrderViewSet(ValuesReadMixin, viewsets.ModelViewSet):
     # Newest orders on top (makes sense for admin)
-    queryset = Order.objects.all().order_by("-id")
+    queryset = Order.objects.select_related("product").order_by("-id")
     serializer_class = OrderSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = PageOrKeysetPagination
 
 
 # ======================
@@ -118,11 +234,14 @@ class CustomLoginView(TokenObtainPairView):
 # ======================
 @api_view(["GET"])
 @permission_classes([permissions.AllowAny])
+@replica_reads
+@cached_response("summary")
 def summary(request):
     # A quick stats snapshot the frontend uses for dashboard cards
     products_count = Product.objects.count()
     brands_count = Brand.objects.count()
-    orders_count = Order.objects.count()
+    # Orders are carts (headers), not lines
+    orders_count = OrderHeader.objects.count()
 
     # Count how many products each brand has
     by_brand_qs = (
@@ -149,6 +268,7 @@ def summary(request):
 # ======================
 @api_view(["GET"])
 @permission_classes([IsAuthenticated])
+@replica_reads
 def inventory_insights(request):
     # Little helper to keep parsing cleaner
     def _int(name, default):
@@ -163,71 +283,37 @@ def inventory_insights(request):
     horizon_days = _int("horizon", 30)
     limit = _int("limit", 50)
 
-    since = now() - timedelta(days=window_days)
-
-    # Pull sales per SKU over the selected window
-    orders_qs = (
-        Order.objects.filter(created_at__gte=since)
-        .values(
-            "product_id", "product__name", "product__brand__name",
-            "product__stock", "product__price"
+    # Precomputed by the job worker (api/jobs.py), see build_insights
+    response = _snapshot_response(request, ForecastRun.INSIGHTS, window_days, horizon_days)
+    if response.status_code == 200:
+        response.data["items"] = response.data["items"][:limit]
+    return response
+
+
+def _snapshot_response(request, kind, window_days, horizon_days):
+    # ?fresh=1 -> queue a recompute and hand back the job to poll (already
+    # done when no worker is running)
+    if request.query_params.get("fresh") in ("1", "true", "yes"):
+        job = fresh_snapshot_job(kind, window_days, horizon_days)
+        return Response(
+            {"job_id": job.id, "status": job.status, "poll": reverse("job_detail", args=[job.id])},
+            status=status.HTTP_202_ACCEPTED,
         )
-        .annotate(total_qty=Sum("quantity"), revenue=Sum("total_price"))
-    )
-
-    items = []
-    total_daily_units = 0
-
-    # Crunch numbers for each SKU
-    for row in orders_qs:
-        stock = row["product__stock"] or 0
-        total_qty = row["total_qty"] or 0
-        price = float(row["product__price"])
-        revenue = float(row["revenue"] or 0)
-
-        daily_rate = total_qty / window_days
-        total_daily_units += daily_rate
-
-        if daily_rate > 0:
-            days_to_oos = stock / daily_rate if stock > 0 else 0
-            recommended = max(0, round(horizon_days * daily_rate - stock))
-        else:
-            days_to_oos = None
-            recommended = 0
-
-        items.append({
-            "product_id": row["product_id"],
-            "name": row["product__name"],
-            "brand": row["product__brand__name"],
-            "stock": stock,
-            "price": price,
-            "daily_rate": round(daily_rate, 2),
-            "days_to_oos": round(days_to_oos, 1) if days_to_oos else None,
-            "recommended_restock": recommended,
-        })
-
-    # Sort by "who will run out first"
-    items_sorted = sorted(items, key=lambda x: (x["days_to_oos"] is None, x["days_to_oos"] or 99999))
-
-    return Response({
-        "window_days": window_days,
-        "horizon_days": horizon_days,
-        "summary": {
-            "total_skus": Product.objects.count(),
-            "tracked_skus": len(items),
-        },
-        "items": items_sorted[:limit],
-    })
+    run, stale = get_snapshot(kind, window_days, horizon_days)
+    return Response(snapshot_payload(run, stale))
 
 
 # ======================
 # ANALYTICS ENDPOINTS (small helpers for dashboard charts)
 # ======================
 @api_view(["GET"])
+@replica_reads
+@cached_response("top_products")
 def top_products(request):
-    # Top sellers by quantity
+    # Top sellers by quantity (grouped by product id first so the sum comes
+    # straight off the (product, quantity, total_price) covering index)
     data = (
-        Order.objects.values("product__name")
+        Order.objects.values("product_id", "product__name")
         .annotate(total=Sum("quantity"))
         .order_by("-total")[:50]
     )
@@ -235,6 +321,8 @@ def top_products(request):
 
 
 @api_view(["GET"])
+@replica_reads
+@cached_response("monthly_revenue")
 def monthly_revenue(request):
     # Revenue grouped by month
     data = (
@@ -247,10 +335,12 @@ def monthly_revenue(request):
 
 
 @api_view(["GET"])
+@replica_reads
+@cached_response("daily_orders")
 def daily_orders(request):
-    # Orders counted per day (for charts)
+    # Orders (carts, not lines) counted per day (for charts)
     data = (
-        Order.objects.annotate(day=TruncDay("created_at"))
+        OrderHeader.objects.annotate(day=TruncDay("created_at"))
         .values("day")
         .annotate(count=Count("id"))
         .order_by("day")
@@ -259,6 +349,20 @@ def daily_orders(request):
 
 
 @api_view(["GET"])
+@replica_reads
+@cached_response("timeseries")
+def timeseries(request):
+    # Range-bounded, gap-filled series for any chart (see api/timeseries.py)
+    try:
+        opts = parse_series_params(request.query_params)
+        return Response(build_series(opts))
+    except ValueError as exc:
+        return Response({"error": str(exc)}, status=400)
+
+
+@api_view(["GET"])
+@replica_reads
+@cached_response("brand_revenue")
 def brand_revenue(request):
     # Simple brand revenue leaderboard
     data = (
@@ -270,19 +374,33 @@ def brand_revenue(request):
 
 
 @api_view(["GET"])
+@cached_response("low_stock")
 def low_stock(request):
-    # Everything nearly sold out (<=5)
-    low = Product.objects.filter(stock__lte=5).select_related("brand")
+    # Everything at or below its reorder point, biggest shortfall first.
+    # Not on the replica: the dashboard refetches this as soon as a live
+    # low_stock event arrives, and a lagging copy would miss the change.
+    # Filter + order match product_below_reorder_idx, so both the page and
+    # the COUNT(*) only touch flagged rows.
+    low = (
+        Product.objects.filter(stock__lte=F("reorder_point"))
+        .annotate(shortfall=F("reorder_point") - F("stock"))
+        .order_by("-shortfall", "id")
+        .values("id", "name", "brand__name", "stock", "reorder_point", "shortfall")
+    )
+    paginator = LowStockPagination()
+    page = paginator.paginate_queryset(low, request)
     data = [
         {
-            "id": p.id,
-            "name": p.name,
-            "brand": p.brand.name if p.brand else "Unknown",
-            "stock": p.stock,
+            "id": p["id"],
+            "name": p["name"],
+            "brand": p["brand__name"] or "Unknown",
+            "stock": p["stock"],
+            "reorder_point": p["reorder_point"],
+            "shortfall": p["shortfall"],
         }
-        for p in low
+        for p in page
     ]
-    return Response(data)
+    return paginator.get_paginated_response(data)
 
 
 # ======================
@@ -291,34 +409,38 @@ def low_stock(request):
 @api_view(["GET"])
 @permission_classes([IsAuthenticated])
 def customer_catalog(request):
-    user = request.user
+    # Basic loyalty system: older customers get small discount (0/5/10%).
+    # The priced catalog for each tier is precomputed in api/catalog.py.
+    discount = discount_for(request.user)
+    snapshot = get_catalog(discount)
+
+    try:
+        page_size = int(request.query_params.get("page_size", DEFAULT_PAGE_SIZE))
+        page_size = min(max(1, page_size), MAX_PAGE_SIZE)
+        brand_ids = [
+            int(b) for b in request.query_params.get("brand", "").split(",") if b.strip()
+        ]
+    except ValueError:
+        return Response({"error": "page_size and brand must be integers"}, status=400)
+    cursor = request.query_params.get("cursor")
+
+    # Same snapshot content + same params = same page, so no need to hash
+    # the body
+    etag = '"catalog-%s-%s-%s"' % (
+        snapshot.digest,
+        discount,
+        hashlib.sha1(f"{sorted(brand_ids)}|{cursor}|{page_size}".encode()).hexdigest()[:16],
+    )
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if etag_matches(request, etag):
+        return Response(status=304, headers=headers)
 
-    # Basic loyalty system: older customers get small discount
-    age_days = (now() - user.date_joined).days
-    if age_days > 90:
-        discount = 0.10
-    elif age_days > 30:
-        discount = 0.05
-    else:
-        discount = 0.0
-
-    products = Product.objects.select_related("brand").order_by("name")
-
-    data = []
-    for p in products:
-        base = float(p.price)
-        final = round(base * (1 - discount), 2)
-        data.append({
-            "id": p.id,
-            "name": p.name,
-            "brand": p.brand.name if p.brand else "Unknown",
-            "price": base,
-            "effective_price": final,
-            "discount_percent": int(discount * 100),
-            "stock": p.stock
-        })
+    try:
+        page = catalog_page(snapshot, brand_ids, cursor, page_size)
+    except ValueError:
+        return Response({"error": "Invalid cursor"}, status=400)
 
-    return Response({"results": data})
+    return Response(page, headers=headers)
 
 
 # ======================
@@ -331,60 +453,64 @@ def customer_orders(request):
     user = request.user
 
     if request.method == "GET":
-        # Returning user's order history
-        orders = (
-            Order.objects.filter(user=user)
-            .select_related("product", "product__brand")
-            .order_by("-created_at")
+        # Returning user's order history, one entry per cart, newest first.
+        # Paginated over headers (user, -created_at index), lines come in
+        # one extra query for the whole page: 3 queries whatever the page.
+        headers = (
+            OrderHeader.objects.filter(user=user)
+            .order_by("-created_at", "-id")
+            .prefetch_related(Prefetch(
+                "lines",
+                queryset=Order.objects.select_related("product__brand").order_by("id"),
+            ))
         )
+        paginator = OrderHistoryPagination()
+        page = paginator.paginate_queryset(headers, request)
         data = [{
-            "id": o.id,
-            "product": o.product.name,
-            "brand": o.product.brand.name if o.product.brand else "Unknown",
-            "quantity": o.quantity,
-            "total_price": float(o.total_price),
-            "created_at": o.created_at
-        } for o in orders]
-
-        return Response(data)
-
-    # POST → user creates one (or multiple) new orders
+            "id": h.id,
+            "created_at": h.created_at,
+            "line_count": h.line_count,
+            "total_price": float(h.total_price),
+            "lines": [{
+                "id": o.id,
+                "product": o.product.name,
+                "brand": o.product.brand.name if o.product.brand else "Unknown",
+                "quantity": o.quantity,
+                "total_price": float(o.total_price),
+            } for o in h.lines.all()],
+        } for h in page]
+
+        return paginator.get_paginated_response(data)
+
+    # POST → user places a whole cart (one or many lines) in one transaction
     lines = request.data.get("lines", [])
     if not isinstance(lines, list) or not lines:
         return Response({"error": "Provide 'lines': [ {product_id, quantity} ]"}, status=400)
 
-    created_ids = []
-
-    for item in lines:
-        try:
-            pid = int(item.get("product_id"))
-            qty = int(item.get("quantity"))
-        except:
-            continue
-
-        if qty <= 0:
-            continue
-
-        try:
-            product = Product.objects.get(id=pid)
-        except Product.DoesNotExist:
-            continue
-
-        total = product.price * qty
-
-        order = Order.objects.create(
-            user=user,
-            product=product,
-            quantity=qty,
-            total_price=total
+    lines = parse_cart_lines(lines)
+    if not lines:
+        return Response({"error": "No valid order lines"}, status=400)
+
+    try:
+        orders = place_order(user, lines)
+    except InsufficientStock as exc:
+        # Nothing was written — the cart is all or nothing
+        return Response(
+            {"error": "Insufficient stock", "product_ids": exc.product_ids},
+            status=409,
         )
-        created_ids.append(order.id)
 
-        # Reduce stock after purchase
-        product.stock = max(0, product.stock - qty)
-        product.save()
+    if not orders:
+        # place_order skips unknown products; none of these exist
+        return Response(
+            {"error": "Unknown products", "product_ids": sorted({pid for pid, _ in lines})},
+            status=400,
+        )
 
-    return Response({"created_order_ids": created_ids}, status=201)
+    return Response(
+        {"order_id": orders[0].header_id, "created_order_ids": [o.id for o in orders]},
+        status=201,
+    )
 
 
 # ======================
@@ -392,6 +518,7 @@ def customer_orders(request):
 # ======================
 @api_view(["GET"])
 @permission_classes([IsAuthenticated])
+@replica_reads
 def demand_forecast(request):
     """
     Basic demand forecast using:
@@ -411,259 +538,104 @@ def demand_forecast(request):
     window_days = _int_param("window", 30)
     horizon_days = _int_param("horizon", 30)
 
-    now_ts = now()
-    window_since = now_ts - timedelta(days=window_days)
-    recent_since = now_ts - timedelta(days=7)
-    prev_since = now_ts - timedelta(days=14)
-
-    base_qs = Order.objects.filter(created_at__gte=window_since)
-
-    # If there's no recent order data, just return an empty forecast
-    if not base_qs.exists():
-        return Response({
-            "window_days": window_days,
-            "horizon_days": horizon_days,
-            "generated_at": now_ts,
-            "summary": {
-                "total_skus": Product.objects.count(),
-                "tracked_skus": 0,
-                "avg_daily_units": 0.0,
-                "high_risk": 0,
-                "medium_risk": 0,
-            },
-            "items": [],
-        })
-
-    # 1) total units sold during window
-    agg_window = (
-        base_qs
-        .values(
-            "product_id",
-            "product__name",
-            "product__brand__name",
-            "product__stock",
-        )
-        .annotate(total_qty=Sum("quantity"))
-    )
-
-    # 2) last 7 days sales
-    agg_recent = (
-        Order.objects.filter(created_at__gte=recent_since)
-        .values("product_id")
-        .annotate(qty7=Sum("quantity"))
-    )
-    recent_map = {row["product_id"]: row["qty7"] or 0 for row in agg_recent}
-
-    # 3) 7 days prior to that (day 8–14)
-    agg_prev = (
-        Order.objects
-        .filter(created_at__gte=prev_since, created_at__lt=recent_since)
-        .values("product_id")
-        .annotate(qty7=Sum("quantity"))
-    )
-    prev_map = {row["product_id"]: row["qty7"] or 0 for row in agg_prev}
-
-    items = []
-    total_daily_units = 0.0
-    high_risk = 0
-    medium_risk = 0
-
-    # Loop all SKUs and produce their forecast
-    for row in agg_window:
-        pid = row["product_id"]
-        name = row["product__name"]
-        brand = row["product__brand__name"] or "Unknown"
-        stock = row["product__stock"] or 0
-        total_qty = row["total_qty"] or 0
-
-        daily_rate = total_qty / float(window_days) if window_days else 0.0
-        total_daily_units += daily_rate
-
-        # Compare recent week vs previous week
-        recent = float(recent_map.get(pid, 0))
-        prev = float(prev_map.get(pid, 0))
-
-        if prev > 0:
-            raw_trend = (recent - prev) / prev
-        elif recent > 0:
-            raw_trend = 0.5  # picking up new demand
-        else:
-            raw_trend = 0.0
-
-        # Keep trend from getting too crazy
-        trend = max(-0.8, min(raw_trend, 1.5))
-
-        # Simple future estimate
-        forecast_qty = max(
-            0,
-            int(round(daily_rate * horizon_days * (1 + 0.5 * trend)))
-        )
-
-        # Days until stock-out (if relevant)
-        if daily_rate > 0:
-            days_to_oos = stock / daily_rate if stock > 0 else 0
-        else:
-            days_to_oos = None
-
-        # classify into risk buckets
-        if days_to_oos is None:
-            risk = "none"
-        elif days_to_oos <= 7:
-            risk = "high"
-            high_risk += 1
-        elif days_to_oos <= 30:
-            risk = "medium"
-            medium_risk += 1
-        else:
-            risk = "low"
-
-        items.append({
-            "product_id": pid,
-            "name": name,
-            "brand": brand,
-            "stock": stock,
-            "daily_rate": round(daily_rate, 2),
-            "trend": round(trend, 2),
-            "forecast_qty": forecast_qty,
-            "days_to_oos": round(days_to_oos, 1) if days_to_oos is not None else None,
-            "risk": risk,
-        })
-
-    # Sort by urgency
-    items_sorted = sorted(
-        items,
-        key=lambda x: (
-            x["days_to_oos"] is None,
-            x["days_to_oos"] if x["days_to_oos"] is not None else 999999
-        ),
-    )
+    # All the number crunching lives in api/forecasting.py (vectorized);
+    # the job worker keeps the result precomputed (api/jobs.py)
+    return _snapshot_response(request, ForecastRun.FORECAST, window_days, horizon_days)
 
-    data = {
-        "window_days": window_days,
-        "horizon_days": horizon_days,
-        "generated_at": now_ts,
-        "summary": {
-            "total_skus": Product.objects.count(),
-            "tracked_skus": len(items),
-            "avg_daily_units": round(total_daily_units, 1),
-            "high_risk": high_risk,
-            "medium_risk": medium_risk,
-        },
-        "items": items_sorted,
-    }
 
-    return Response(data)
+# ======================
+# LIVE FEED TICKET (EventSource can't send the JWT header)
+# ======================
+@api_view(["POST"])
+@permission_classes([IsAuthenticated])
+def event_ticket(request):
+    return Response({"ticket": make_event_ticket(request.user), "expires_in": TICKET_MAX_AGE})
 
 
 # ======================
-# AI DECISION SUMMARY (manager-level overview)
+# BACKGROUND JOBS (poll a ?fresh=1 recompute)
 # ======================
 @api_view(["GET"])
-@permission_classes([permissions.IsAuthenticated])
-def ai_decision_summary(request):
-    """
-    Short summary aimed at managers — something readable,
-    not a wall of raw numbers.
-    """
+@permission_classes([IsAuthenticated])
+def job_detail(request, pk):
+    job = get_object_or_404(Job, pk=pk)
+    return Response({
+        "id": job.id,
+        "kind": job.kind,
+        "params": job.params,
+        "status": job.status,
+        "attempts": job.attempts,
+        "created_at": job.created_at,
+        "started_at": job.started_at,
+        "finished_at": job.finished_at,
+        "error": job.error or None,
+        "result": job.result,
+    })
 
-    # Fixed window for now; easy to expose later if needed
-    window_days = 30
-    horizon_days = 30
-    since = now() - timedelta(days=window_days)
 
-    # Basic counts
-    products_count = Product.objects.count()
-    brands_count = Product.objects.values("brand_id").distinct().count()
-    orders_count = Order.objects.filter(created_at__gte=since).count()
-
-    # Pull window sales
-    orders_qs = (
-        Order.objects.filter(created_at__gte=since)
-        .values(
-            "product_id",
-            "product__name",
-            "product__brand__name",
-            "product__stock",
-        )
-        .annotate(
-            total_qty=Sum("quantity"),
-            revenue=Sum("total_price"),
-        )
+# ======================
+# STREAMING EXPORTS (CSV / NDJSON, optionally gzipped)
+# ======================
+def _export_response(request, queryset, columns, name):
+    # ?format=csv|ndjson is picked up by DRF's negotiation (csv by default)
+    renderer = request.accepted_renderer
+    gzip = request.query_params.get("gzip") in ("1", "true", "yes")
+
+    content_type = renderer.media_type
+    filename = f"{name}.{renderer.format}"
+    if gzip:
+        content_type, filename = "application/gzip", filename + ".gz"
+
+    # The rows are read while streaming, after the view has returned: bind
+    # the queryset to the database it would read from now (the replica)
+    queryset = queryset.using(queryset.db)
+
+    response = StreamingHttpResponse(
+        stream_export(queryset, columns, fmt=renderer.format, gzip=gzip),
+        content_type=content_type,
     )
+    response["Content-Disposition"] = f'attachment; filename="{filename}"'
+    return response
 
-    at_risk_7 = 0
-    at_risk_30 = 0
-    total_recommended = 0
-    pressure_brands = set()
-
-    # Loop SKUs and build high-level insights
-    for row in orders_qs:
-        stock = row["product__stock"] or 0
-        total_qty = row["total_qty"] or 0
 
-        if window_days == 0:
-            continue
-
-        daily_rate = total_qty / float(window_days)
-        if daily_rate <= 0:
-            continue
-
-        days_to_oos = stock / daily_rate if stock > 0 else 0
-        recommended = max(0, int(round(horizon_days * daily_rate - stock)))
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+@renderer_classes([CSVRenderer, NDJSONRenderer])
+@replica_reads
+def export_orders(request):
+    # Full order history: ?start=&end=&user=&product=&brand= (ids comma separated)
+    try:
+        qs = filter_orders(request.query_params)
+    except ValueError as exc:
+        return Response({"error": str(exc)}, status=400)
+    return _export_response(request, qs, ORDER_COLUMNS, "orders")
 
-        if days_to_oos <= 7:
-            at_risk_7 += 1
-        if days_to_oos <= 30:
-            at_risk_30 += 1
 
-        if recommended > 0:
-            total_recommended += recommended
-            brand_name = row["product__brand__name"] or "Unknown"
-            pressure_brands.add(brand_name)
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+@renderer_classes([CSVRenderer, NDJSONRenderer])
+@replica_reads
+def export_products(request):
+    try:
+        qs = filter_products(request.query_params)
+    except ValueError as exc:
+        return Response({"error": str(exc)}, status=400)
+    return _export_response(request, qs, PRODUCT_COLUMNS, "products")
 
-    # Turn the info into short bullet points
-    bullets = []
 
-    bullets.append(
-        f"{products_count} products active across {brands_count} brands – "
-        f"{orders_count} orders placed in the last {window_days} days."
+# ======================
+# METRICS (Prometheus scrape target)
+# ======================
+# Plain Django view: Prometheus can't do the JWT dance, so access is an
+# optional static bearer token (settings.METRICS_TOKEN) instead.
+@require_GET
+def metrics(request):
+    token = settings.METRICS_TOKEN
+    if token:
+        sent = request.headers.get("Authorization", "")
+        if not hmac.compare_digest(sent.encode(), f"Bearer {token}".encode()):
+            return HttpResponse("Unauthorized\n", status=401, content_type="text/plain")
+    return HttpResponse(
+        metrics_registry.render(),
+        content_type="text/plain; version=0.0.4; charset=utf-8",
     )
-
-    if at_risk_7 > 0:
-        bullets.append(
-            f"{at_risk_7} SKUs may run out within a week "
-            f"({at_risk_30} within 30 days)."
-        )
-    else:
-        bullets.append(
-            "No SKUs expected to run out within the next 7 days."
-        )
-
-    if total_recommended > 0:
-        bullets.append(
-            f"Suggested replenishment for the next {horizon_days} days: "
-            f"around {total_recommended} total units."
-        )
-
-    if pressure_brands:
-        top_brands = ", ".join(sorted(pressure_brands)[:3])
-        bullets.append(
-            f"Supply may tighten for: {top_brands}."
-        )
-
-    return Response(
-        {
-            "window_days": window_days,
-            "horizon_days": horizon_days,
-            "bullets": bullets,
-            "meta": {
-                "products": products_count,
-                "brands": brands_count,
-                "orders_last_window": orders_count,
-                "at_risk_7": at_risk_7,
-                "at_risk_30": at_risk_30,
-                "recommended_total": total_recommended,
-                "pressure_brands": sorted(pressure_brands),
-            },
-        }
-    )
\ No newline at end of file
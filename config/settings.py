@@ -28,7 +28,9 @@ CORS_ALLOW_ALL_ORIGINS = True
 CORS_ALLOW_METHODS = ['GET', 'POST', 'PUT', 'PATCH', 'DELETE', 'OPTIONS']
 
 MIDDLEWARE = [
-    'whitenoise.middleware.WhiteNoiseMiddleware',
+    # WhiteNoise, async capable (every middleware here is, for ASGI)
+    'api.middleware.StaticFilesMiddleware',
+    'api.middleware.ProfilingMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -59,13 +61,78 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'config.wsgi.application'
 
+# Persistent connections, checked before reuse. Set DB_CONN_MAX_AGE=0 to
+# open one per request again.
+DB_CONN_MAX_AGE = int(os.environ.get('DB_CONN_MAX_AGE', 60))
+
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        'CONN_MAX_AGE': DB_CONN_MAX_AGE,
+        'CONN_HEALTH_CHECKS': True,
+        # Take the write lock at BEGIN: checkout and stock adjustments read
+        # then write in one transaction, and a deferred transaction can't
+        # upgrade its read lock while another writer waits ("database is
+        # locked" instead of queueing behind the busy timeout)
+        'OPTIONS': {'transaction_mode': 'IMMEDIATE'},
+        # A file, not the shared-cache in-memory default: the concurrency
+        # tests need SQLite's real file locking
+        'TEST': {'NAME': BASE_DIR / 'test_db.sqlite3'},
     }
 }
 
+# Optional read replica for the analytics views (api/routers.py). Locally a
+# second SQLite file stands in for it: REPLICA_DB_NAME=db.replica.sqlite3,
+# refreshed with `python manage.py sync_replica`. Tests read it through
+# default (MIRROR).
+if os.environ.get('REPLICA_DB_NAME'):
+    DATABASES['replica'] = {
+        **DATABASES['default'],
+        'NAME': BASE_DIR / os.environ['REPLICA_DB_NAME'],
+        'TEST': {'MIRROR': 'default'},
+    }
+
+DATABASE_ROUTERS = ['api.routers.ReplicaRouter']
+
+# Cache backend (analytics response cache, see api/caching.py).
+# Local memory works for a single process; set REDIS_URL so every worker
+# shares the cached responses and the single-flight locks.
+if os.environ.get('REDIS_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.environ['REDIS_URL'],
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'staxtrade',
+            'OPTIONS': {'MAX_ENTRIES': 2000},
+        }
+    }
+
+# Seconds a cached analytics response may live (writes invalidate it sooner)
+ANALYTICS_CACHE_TIMEOUT = int(os.environ.get('ANALYTICS_CACHE_TIMEOUT', 300))
+
+# Server-Timing header + per-route histograms at /api/metrics/ (api/middleware.py).
+# METRICS_TOKEN, when set, must be sent as "Authorization: Bearer <token>" to scrape.
+REQUEST_PROFILING = os.environ.get('REQUEST_PROFILING', '1') == '1'
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN', '')
+
+# Forecast / insight snapshots are recomputed by `manage.py run_jobs` at least
+# this often, and sooner when orders or stock change (api/jobs.py).
+SNAPSHOT_REFRESH_SECONDS = int(os.environ.get('SNAPSHOT_REFRESH_SECONDS', 900))
+# Without a worker picking recomputes up within this, requests recompute inline.
+SNAPSHOT_WORKER_GRACE_SECONDS = int(os.environ.get('SNAPSHOT_WORKER_GRACE_SECONDS', 60))
+
+# Per-process cache of JWT users (api/authentication.py). Saves/deletes evict
+# at once; other processes and update() writes are picked up after the TTL.
+AUTH_USER_CACHE_SIZE = int(os.environ.get('AUTH_USER_CACHE_SIZE', 10000))
+AUTH_USER_CACHE_TTL = int(os.environ.get('AUTH_USER_CACHE_TTL', 60))
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
@@ -95,7 +162,17 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'api.authentication.CachedJWTAuthentication',
+    ],
+    # orjson-backed JSON, same output as DRF's (api/renderers.py)
+    'DEFAULT_RENDERER_CLASSES': [
+        'api.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'api.renderers.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
     ],
     'DEFAULT_FILTER_BACKENDS': [
         'django_filters.rest_framework.DjangoFilterBackend'
@@ -6,7 +6,7 @@ export default function AIOpsAssistant() {
   const [activeTab, setActiveTab] = useState("business");
 
   const [summary, setSummary] = useState(null);
-  const [lowStock, setLowStock] = useState([]);
+  const [lowStockCount, setLowStockCount] = useState(0);
   const [topProducts, setTopProducts] = useState([]);
 
   useEffect(() => {
@@ -22,7 +22,8 @@ export default function AIOpsAssistant() {
       ]);
 
       setSummary(sum.data);
-      setLowStock(low.data || []);
+      // paginated, most urgent first: the count is what matters here
+      setLowStockCount(low.data?.count || 0);
       setTopProducts(top.data || []);
     } catch (err) {
       console.error("AI assistant insight error:", err);
@@ -159,9 +160,9 @@ export default function AIOpsAssistant() {
                     <div style={section}>
                       <div style={sectionTitle}>⚠️ Stock risk</div>
                       <p>
-                        {lowStock.length === 0
+                        {lowStockCount === 0
                           ? "No critical low-stock items — stable position."
-                          : `${lowStock.length} SKUs below buffer level → increasing stock-out exposure.`}
+                          : `${lowStockCount} SKUs below their reorder point → increasing stock-out exposure.`}
                         <br />
                         • High velocity items need tighter replenishment  
                         <br />• Small shortages now → large revenue leakage later  
@@ -67,7 +67,12 @@ function Cart() {
       updateCart([]); // empty the cart afterwards
     } catch (err) {
       console.error(err);
-      toast.error("Order failed");
+      // 409 = not enough stock for at least one line, nothing was placed
+      if (err.response?.status === 409) {
+        toast.error("Some items don't have enough stock – order not placed");
+      } else {
+        toast.error("Order failed");
+      }
     }
   };
 
@@ -27,8 +27,16 @@ function CustomerCatalog() {
   const fetchCatalog = async () => {
     try {
       setLoading(true);
-      const res = await API.get("customer/catalog/");
-      const results = res.data.results || [];
+      // catalog is cursor-paginated; walk the pages until "next" runs out
+      let results = [];
+      let cursor = null;
+      do {
+        const res = await API.get("customer/catalog/", {
+          params: { page_size: 500, ...(cursor ? { cursor } : {}) },
+        });
+        results = results.concat(res.data.results || []);
+        cursor = res.data.next;
+      } while (cursor);
 
       setProducts(results);
       setFiltered(results);
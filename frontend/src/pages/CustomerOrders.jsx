@@ -2,15 +2,22 @@ import React, { useEffect, useState } from "react";
 import API from "../api";
 import { toast } from "react-toastify";
 
+// Matches OrderHistoryPagination.page_size in api/pagination.py
+const PAGE_SIZE = 20;
+
 function CustomerOrders() {
   const [orders, setOrders] = useState([]);
+  const [count, setCount] = useState(0);
+  const [page, setPage] = useState(1);
   const [loading, setLoading] = useState(true);
 
-  // Loads the user's orders from the backend
-  const loadOrders = async () => {
+  // Loads one page of the user's orders (each with its lines)
+  const loadOrders = async (p) => {
+    setLoading(true);
     try {
-      const res = await API.get("customer/orders/");
-      setOrders(res.data); // store them in state
+      const res = await API.get("customer/orders/", { params: { page: p } });
+      setOrders(res.data.results); // store them in state
+      setCount(res.data.count);
     } catch (err) {
       console.error(err);
       toast.error("Failed to load orders");
@@ -19,10 +26,12 @@ function CustomerOrders() {
     }
   };
 
-  // Fetch orders when the page first loads
+  // Fetch orders when the page loads and whenever the page changes
   useEffect(() => {
-    loadOrders();
-  }, []);
+    loadOrders(page);
+  }, [page]);
+
+  const pages = Math.max(1, Math.ceil(count / PAGE_SIZE));
 
   return (
     <div className="fade-in">
@@ -38,32 +47,63 @@ function CustomerOrders() {
         // If no orders exist
         <div className="alert alert-info">You have no orders yet.</div>
       ) : (
-        // Normal table view
-        <div className="table-responsive">
-          <table className="table table-hover align-middle">
-            <thead>
-              <tr>
-                <th>Product</th>
-                <th>Brand</th>
-                <th>Qty</th>
-                <th>Total (£)</th>
-                <th>Date</th>
-              </tr>
-            </thead>
-            <tbody>
-              {orders.map((o) => (
-                <tr key={o.id}>
-                  <td>{o.product}</td>
-                  <td>{o.brand}</td>
-                  <td>{o.quantity}</td>
-                  <td>{o.total_price}</td>
-                  {/* Display order date in a readable way */}
-                  <td>{new Date(o.created_at).toLocaleString()}</td>
-                </tr>
-              ))}
-            </tbody>
-          </table>
-        </div>
+        // One card per order, its lines in a table
+        <>
+          {orders.map((o) => (
+            <div className="card mb-3" key={o.id}>
+              <div className="card-header d-flex justify-content-between">
+                <span className="fw-semibold">Order #{o.id}</span>
+                {/* Display order date in a readable way */}
+                <span className="text-muted">{new Date(o.created_at).toLocaleString()}</span>
+              </div>
+              <div className="table-responsive">
+                <table className="table table-hover align-middle mb-0">
+                  <thead>
+                    <tr>
+                      <th>Product</th>
+                      <th>Brand</th>
+                      <th>Qty</th>
+                      <th>Total (£)</th>
+                    </tr>
+                  </thead>
+                  <tbody>
+                    {o.lines.map((l) => (
+                      <tr key={l.id}>
+                        <td>{l.product}</td>
+                        <td>{l.brand}</td>
+                        <td>{l.quantity}</td>
+                        <td>{l.total_price}</td>
+                      </tr>
+                    ))}
+                  </tbody>
+                </table>
+              </div>
+              <div className="card-footer text-end">
+                {o.line_count} item(s) · <strong>£{o.total_price}</strong>
+              </div>
+            </div>
+          ))}
+
+          {pages > 1 && (
+            <div className="d-flex justify-content-between align-items-center">
+              <button
+                className="btn btn-outline-secondary btn-sm"
+                disabled={page <= 1}
+                onClick={() => setPage(page - 1)}
+              >
+                Newer
+              </button>
+              <span className="text-muted">Page {page} of {pages}</span>
+              <button
+                className="btn btn-outline-secondary btn-sm"
+                disabled={page >= pages}
+                onClick={() => setPage(page + 1)}
+              >
+                Older
+              </button>
+            </div>
+          )}
+        </>
       )}
     </div>
   );
@@ -1,4 +1,4 @@
-import React, { useEffect, useState } from "react";
+import React, { useCallback, useEffect, useRef, useState } from "react";
 import API from "../api";
 
 import {
@@ -27,6 +27,7 @@ function Dashboard() {
   const [dailyOrders, setDailyOrders] = useState([]);
   const [brandRevenue, setBrandRevenue] = useState([]);
   const [lowStock, setLowStock] = useState([]);
+  const [lowStockCount, setLowStockCount] = useState(0);
 
   const [loading, setLoading] = useState(true);
   const [autoRefresh, setAutoRefresh] = useState(true);
@@ -44,19 +45,158 @@ function Dashboard() {
     "#9AD95A",
   ];
 
-  // refresh analytics every 10 seconds if the switch is on
+  // charts are re-fetched at most this often while orders stream in
+  const CHART_REFRESH_MS = 30000;
+  const chartTimer = useRef(null);
+  const lowStockTimer = useRef(null);
+
+  const scheduleChartRefresh = useCallback(() => {
+    if (chartTimer.current) return;
+    chartTimer.current = setTimeout(() => {
+      chartTimer.current = null;
+      fetchAllAnalytics(false);
+    }, CHART_REFRESH_MS);
+  }, []);
+
+  // a product we don't have a row for went low: fetch just that table
+  const scheduleLowStockRefresh = useCallback(() => {
+    if (lowStockTimer.current) return;
+    lowStockTimer.current = setTimeout(async () => {
+      lowStockTimer.current = null;
+      try {
+        const res = await API.get("analytics/low-stock/");
+        setLowStock(res.data.results || []);
+        setLowStockCount(res.data.count || 0);
+      } catch (err) {
+        console.error("Low stock fetch error:", err);
+      }
+    }, 1000);
+  }, []);
+
+  // first load, then live updates over server-sent events instead of
+  // re-running every analytics query on a timer
   useEffect(() => {
     fetchAllAnalytics();
-    const timer = setInterval(() => {
-      if (autoRefresh) fetchAllAnalytics();
-    }, 10000);
-    return () => clearInterval(timer);
-  }, [autoRefresh]);
+  }, []);
+
+  useEffect(() => {
+    if (!autoRefresh) return undefined;
+
+    let source = null;
+    let retry = null;
+    let closed = false;
+
+    const connect = async () => {
+      // EventSource can't send the JWT header: trade it for a short-lived
+      // ticket so no access token lands in the server's access logs
+      let ticket = "";
+      try {
+        const res = await API.post("events/ticket/");
+        ticket = res.data.ticket;
+      } catch (err) {
+        console.error(err);
+      }
+      if (closed) return;
+      source = new EventSource(
+        `/api/events/?ticket=${encodeURIComponent(ticket)}`
+      );
+
+      // one event per order (cart), whatever its line count: the same unit
+      // the summary and daily counts use; total_price is the cart total
+      source.addEventListener("order", (e) => {
+        const order = JSON.parse(e.data);
+        setSummary((s) => (s ? { ...s, orders: s.orders + 1 } : s));
+        setDailyOrders((rows) =>
+          rows.length === 0
+            ? rows
+            : [
+                ...rows.slice(0, -1),
+                { ...rows[rows.length - 1], count: rows[rows.length - 1].count + 1 },
+              ]
+        );
+        setMonthlyRevenue((rows) =>
+          rows.length === 0
+            ? rows
+            : [
+                ...rows.slice(0, -1),
+                {
+                  ...rows[rows.length - 1],
+                  revenue: rows[rows.length - 1].revenue + Number(order.total_price || 0),
+                },
+              ]
+        );
+        markUpdated();
+        scheduleChartRefresh();
+      });
+
+      source.addEventListener("stock", (e) => {
+        const { product_id, stock, reorder_point } = JSON.parse(e.data);
+        setLowStock((rows) =>
+          rows.map((p) =>
+            p.id === product_id
+              ? { ...p, stock, reorder_point, shortfall: reorder_point - stock }
+              : p
+          )
+        );
+        markUpdated();
+      });
+
+      source.addEventListener("low_stock", (e) => {
+        const { product_id, low } = JSON.parse(e.data);
+        if (low) {
+          scheduleLowStockRefresh();
+        } else {
+          setLowStock((rows) => rows.filter((p) => p.id !== product_id));
+          setLowStockCount((n) => Math.max(0, n - 1));
+        }
+        markUpdated();
+      });
+
+      // server dropped events for us (restart / slow client): reload once
+      source.addEventListener("resync", () => fetchAllAnalytics(false));
+
+      source.onerror = () => {
+        // the browser retries by itself unless the request was refused
+        // (expired ticket): reload via the API client, then reconnect
+        // with a new ticket
+        if (source.readyState !== EventSource.CLOSED || closed) return;
+        retry = setTimeout(async () => {
+          await fetchAllAnalytics(false);
+          if (!closed) connect();
+        }, 5000);
+      };
+    };
+
+    connect();
+    return () => {
+      closed = true;
+      clearTimeout(retry);
+      if (source) source.close();
+    };
+  }, [autoRefresh, scheduleChartRefresh, scheduleLowStockRefresh]);
+
+  useEffect(
+    () => () => {
+      clearTimeout(chartTimer.current);
+      clearTimeout(lowStockTimer.current);
+    },
+    []
+  );
+
+  // small “updated” animation on the badge
+  const markUpdated = () => {
+    setLastUpdated(new Date().toLocaleTimeString());
+    const el = document.getElementById("updated-badge");
+    if (el) {
+      el.classList.add("updated-ping");
+      setTimeout(() => el.classList.remove("updated-ping"), 800);
+    }
+  };
 
   // loads all API analytics at once so UI updates together
-  const fetchAllAnalytics = async () => {
+  const fetchAllAnalytics = async (showSkeleton = true) => {
     try {
-      setLoading(true);
+      if (showSkeleton) setLoading(true);
 
       // fetch everything in parallel
       const [
@@ -69,8 +209,19 @@ function Dashboard() {
       ] = await Promise.all([
         API.get("summary/"),
         API.get("analytics/top-products/"),
-        API.get("analytics/monthly-revenue/"),
-        API.get("analytics/daily-orders/"),
+        // dense, range-bounded series (last 12 months / last 30 days).
+        // Revenue stays in the server's timezone so it is read from the
+        // daily rollup; order counts follow the browser's calendar.
+        API.get("analytics/timeseries/", {
+          params: { metric: "revenue", granularity: "month" },
+        }),
+        API.get("analytics/timeseries/", {
+          params: {
+            metric: "orders",
+            granularity: "day",
+            tz: Intl.DateTimeFormat().resolvedOptions().timeZone,
+          },
+        }),
         API.get("analytics/brand-revenue/"),
         API.get("analytics/low-stock/"),
       ]);
@@ -86,26 +237,24 @@ function Dashboard() {
       setTopProducts(topMapped);
 
       // format monthly revenue dates
-      const monthMapped = (monthRes.data || []).map((row) => ({
-        month: row.month
-          ? new Date(row.month).toLocaleDateString("en-GB", {
-              month: "short",
-              year: "2-digit",
-            })
-          : "Unknown",
-        revenue: Number(row.revenue || 0),
+      const monthMapped = (monthRes.data.series || []).map((row) => ({
+        month: new Date(row.bucket).toLocaleDateString("en-GB", {
+          month: "short",
+          year: "2-digit",
+          timeZone: monthRes.data.tz,
+        }),
+        revenue: Number(row.value || 0),
       }));
       setMonthlyRevenue(monthMapped);
 
       // format daily order counts
-      const dailyMapped = (dailyRes.data || []).map((row) => ({
-        day: row.day
-          ? new Date(row.day).toLocaleDateString("en-GB", {
-              day: "2-digit",
-              month: "short",
-            })
-          : "Unknown",
-        count: row.count,
+      const dailyMapped = (dailyRes.data.series || []).map((row) => ({
+        day: new Date(row.bucket).toLocaleDateString("en-GB", {
+          day: "2-digit",
+          month: "short",
+          timeZone: dailyRes.data.tz,
+        }),
+        count: row.value,
       }));
       setDailyOrders(dailyMapped);
 
@@ -117,18 +266,12 @@ function Dashboard() {
       setBrandRevenue(brandRevMapped);
 
       // store low-stock list
-      setLowStock(lowStockRes.data || []);
+      setLowStock(lowStockRes.data.results || []);
+      setLowStockCount(lowStockRes.data.count || 0);
 
       // update the last updated time for UI
-      setLastUpdated(new Date().toLocaleTimeString());
+      markUpdated();
       setLoading(false);
-
-      // small “updated” animation on the badge
-      const el = document.getElementById("updated-badge");
-      if (el) {
-        el.classList.add("updated-ping");
-        setTimeout(() => el.classList.remove("updated-ping"), 800);
-      }
     } catch (err) {
       console.error("Analytics fetch error:", err);
       setLoading(false);
@@ -182,10 +325,11 @@ function Dashboard() {
       : 0;
 
   // gives each low stock item a simple severity label
-  const stockSeverity = (stock) => {
-    if (stock <= 0) return "Critical";
-    if (stock <= 2) return "High";
-    if (stock <= 5) return "Medium";
+  // (relative to its own reorder point)
+  const stockSeverity = (p) => {
+    if (p.stock <= 0) return "Critical";
+    if (p.stock <= p.reorder_point / 2) return "High";
+    if (p.stock <= p.reorder_point) return "Medium";
     return "Low";
   };
 
@@ -219,12 +363,12 @@ function Dashboard() {
               checked={autoRefresh}
               onChange={() => setAutoRefresh(!autoRefresh)}
             />
-            <label className="form-check-label">Auto refresh</label>
+            <label className="form-check-label">Live updates</label>
           </div>
 
           <button
             className="btn btn-outline-secondary btn-sm"
-            onClick={fetchAllAnalytics}
+            onClick={() => fetchAllAnalytics()}
           >
             Refresh
           </button>
@@ -561,7 +705,7 @@ function Dashboard() {
             <div className="dashboard-card-header d-flex justify-content-between align-items-center mb-2">
               <h6 className="text-uppercase mb-0">Low Stock Alerts</h6>
               <span className="chip chip-warning">
-                {lowStock.length} at risk
+                {lowStockCount} at risk
               </span>
             </div>
 
@@ -585,7 +729,7 @@ function Dashboard() {
                   </thead>
                   <tbody>
                     {lowStock.map((p) => {
-                      const sev = stockSeverity(p.stock);
+                      const sev = stockSeverity(p);
                       const sevClass =
                         sev === "Critical"
                           ? "bg-danger-subtle text-danger"
@@ -604,7 +748,7 @@ function Dashboard() {
                               className={`badge ${sevClass}`}
                               style={{ minWidth: 52 }}
                             >
-                              {p.stock} · {sev}
+                              {p.stock} / {p.reorder_point} · {sev}
                             </span>
                           </td>
                         </tr>
@@ -27,6 +27,9 @@ function Forecast() {
   // toggle between top 10 and all items
   const [showAll, setShowAll] = useState(false);
 
+  // true while a background recompute is running
+  const [recalculating, setRecalculating] = useState(false);
+
   // fetches forecast from backend
   const loadForecast = async () => {
     setLoading(true);
@@ -43,10 +46,37 @@ function Forecast() {
     }
   };
 
-  // load on first render
+  // the forecast is precomputed by the job worker; ?fresh=1 queues a new
+  // run and we poll the job until it's done, then reload (without a worker
+  // the server runs it right away and the job comes back done)
+  const recalculate = async () => {
+    setRecalculating(true);
+    try {
+      const res = await API.get("analytics/demand-forecast/", {
+        params: { window: windowDays, horizon: horizonDays, fresh: 1 },
+      });
+      if (res.data.status === "done") return loadForecast();
+      for (let tries = 0; tries < 120; tries++) {
+        await new Promise((r) => setTimeout(r, 1000));
+        const job = (await API.get(`jobs/${res.data.job_id}/`)).data;
+        if (job.status === "done") return loadForecast();
+        if (job.status === "failed") throw new Error(job.error);
+      }
+      toast.info("Still recalculating, showing the last forecast");
+      loadForecast();
+    } catch (err) {
+      console.error(err);
+      toast.error("Failed to recalculate forecast");
+    } finally {
+      setRecalculating(false);
+    }
+  };
+
+  // load on first render and whenever the window / horizon changes
+  // (cheap now: the server answers from its latest snapshot)
   useEffect(() => {
     loadForecast();
-  }, []);
+  }, [windowDays, horizonDays]);
 
   // forecast item list
   const allItems = data?.items || [];
@@ -93,13 +123,27 @@ function Forecast() {
             <option value={60}>Forecast 2 months</option>
           </select>
 
-          {/* manually reload forecast */}
-          <button className="btn btn-outline-secondary btn-sm" onClick={loadForecast}>
-            Recalculate
+          {/* queue a fresh computation */}
+          <button
+            className="btn btn-outline-secondary btn-sm"
+            onClick={recalculate}
+            disabled={recalculating}
+          >
+            {recalculating ? "Recalculating…" : "Recalculate"}
           </button>
         </div>
       </div>
 
+      {/* when this snapshot was computed */}
+      {!loading && data?.generated_at && (
+        <small className="text-muted d-block mb-3">
+          Computed {new Date(data.generated_at).toLocaleString()}
+          {data.snapshot?.stale && (
+            <span className="badge bg-warning text-dark ms-2">Update pending</span>
+          )}
+        </small>
+      )}
+
       {/* top summary cards */}
       {!loading && data && (
         <div className="row mb-4 text-center">
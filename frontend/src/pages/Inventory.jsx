@@ -1,5 +1,6 @@
 import React, { useEffect, useState } from "react";
 import API from "../api";
+import { toast } from "react-toastify";
 import {
   BarChart,
   Bar,
@@ -124,6 +125,26 @@ function Inventory() {
     }
   };
 
+  // one click: restock every at-risk SKU by its recommendation (server side)
+  const autoRestock = async () => {
+    try {
+      const res = await API.post("products/auto_restock/", {
+        window: windowDays,
+        horizon: horizonDays,
+      });
+      if (res.data.restocked === 0) {
+        toast.info("Nothing needs restocking right now.");
+      } else {
+        toast.success(
+          `Restocked ${res.data.restocked} SKUs (${res.data.units} units)`
+        );
+      }
+      fetchInsights();
+    } catch {
+      toast.error("Auto restock failed");
+    }
+  };
+
   // load once on mount
   useEffect(() => {
     fetchInsights();
@@ -178,6 +199,13 @@ function Inventory() {
           >
             Recalculate
           </button>
+
+          <button
+            className="btn btn-primary btn-sm"
+            onClick={autoRestock}
+          >
+            Auto restock
+          </button>
         </div>
       </div>
 
@@ -20,9 +20,12 @@ function Products() {
   const [page, setPage] = useState(1);
   const [count, setCount] = useState(0);
 
-  // threshold for low stock highlight
+  // minimum stock the restock button brings items back to
   const LOW_STOCK = 10;
 
+  // low = at or below the product's own reorder point
+  const isLow = (p) => p.stock <= (p.reorder_point ?? LOW_STOCK);
+
   // ---------------------------------------------------
   // Load products + brands whenever filters/page change
   // ---------------------------------------------------
@@ -130,26 +133,29 @@ function Products() {
   // Auto-restock low-stock items on this page
   // ---------------------------------------------------
   const restockAllLowStock = async () => {
-    const lowItems = products.filter((p) => p.stock < LOW_STOCK);
+    const lowItems = products.filter(isLow);
 
     if (lowItems.length === 0) {
       return toast.info("No low-stock items on this page.");
     }
 
-    toast.info(`Restocking ${lowItems.length} items…`);
-
-    for (const item of lowItems) {
-      // simple rule: bring each item back to LOW_STOCK minimum
-      let amount = item.stock === 0 ? 20 : LOW_STOCK - item.stock;
+    // simple rule: bring each item back above its reorder point
+    // (and at least to LOW_STOCK)
+    const adjustments = lowItems.map((item) => {
+      const target = Math.max(LOW_STOCK, (item.reorder_point ?? 0) + 1);
+      return {
+        product_id: item.id,
+        delta: item.stock === 0 ? Math.max(20, target) : target - item.stock,
+      };
+    });
 
-      try {
-        await API.post(`products/${item.id}/adjust_stock/`, { amount });
-      } catch {
-        console.warn("Restock failed for item", item.id);
-      }
+    // one request, one transaction on the backend
+    try {
+      await API.post("products/bulk_adjust_stock/", { adjustments });
+      toast.success(`Restocked ${lowItems.length} items`);
+    } catch {
+      toast.error("Restock failed");
     }
-
-    toast.success("All low-stock items restocked");
     fetchAll();
   };
 
@@ -283,7 +289,7 @@ function Products() {
 
         <tbody>
           {products.map((p) => (
-            <tr key={p.id} className={p.stock < LOW_STOCK ? "table-danger" : ""}>
+            <tr key={p.id} className={isLow(p) ? "table-danger" : ""}>
               <td>{p.name}</td>
               <td>{p.brand_name}</td>
               <td>£{p.price}</td>
@@ -297,7 +303,7 @@ function Products() {
                     –
                   </button>
 
-                  <span className={p.stock < LOW_STOCK ? "text-danger fw-bold" : ""}>
+                  <span className={isLow(p) ? "text-danger fw-bold" : ""}>
                     {p.stock}
                   </span>
 